@@ -25,6 +25,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the other middleware too
+    "chat.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -55,11 +57,55 @@ TEMPLATES = [
 WSGI_APPLICATION = "ai_chat.wsgi.application"
 ASGI_APPLICATION = "ai_chat.asgi.application"
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Database profile: "sqlite" (default) or a server backend ("postgresql", "mysql")
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                # Seconds a writer waits for the lock instead of failing with "database is locked"
+                "timeout": float(os.environ.get("SQLITE_BUSY_TIMEOUT_S", "20")),
+                # Take the write lock when a transaction starts, so read-then-write
+                # transactions (Message.save) queue up instead of deadlocking on upgrade
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": f"django.db.backends.{DB_ENGINE}",
+            "NAME": os.environ.get("DB_NAME", "ai_chat"),
+            "USER": os.environ.get("DB_USER", ""),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", ""),
+            "PORT": os.environ.get("DB_PORT", ""),
+            # Persistent connections, checked before reuse after each request
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+            "OPTIONS": {},
+        }
     }
+    if DB_ENGINE == "postgresql" and os.environ.get("DB_POOL", "0") == "1":
+        # psycopg connection pool (requires psycopg[pool]); replaces persistent connections
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT_S", "10")),
+        }
+
+# Applied to every new SQLite connection by chat.db.configure_sqlite_connection
+SQLITE_PRAGMAS = {
+    # Readers no longer block the writer (and vice versa)
+    "journal_mode": "WAL",
+    # Safe with WAL; fsync at checkpoints instead of every commit
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    "busy_timeout": int(float(os.environ.get("SQLITE_BUSY_TIMEOUT_S", "20")) * 1000),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -80,6 +126,18 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 MESSAGE_RATE_LIMIT = os.environ.get("MESSAGE_RATE_LIMIT", "20/minute")
 INSIGHTS_RATE_LIMIT = os.environ.get("INSIGHTS_RATE_LIMIT", "5/minute")
+# Feedback summary cache lifetime; writes invalidate it, the TTL bounds cross-process staleness
+INSIGHTS_SUMMARY_TTL_S = int(os.environ.get("INSIGHTS_SUMMARY_TTL_S", "60"))
+# Actionable insights are memoized per summary fingerprint for this long
+ACTIONABLE_INSIGHTS_TTL_S = int(os.environ.get("ACTIONABLE_INSIGHTS_TTL_S", "3600"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        # Least recently used entries are culled past this size
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", "1000"))},
+    }
+}
 
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
@@ -92,3 +150,39 @@ REST_FRAMEWORK = {
 
 # Feature flags / Gemini
 GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "models/gemini-2.5-flash-lite")
+# Route the message and insights endpoints to the async views (serve via ASGI).
+CHAT_ASYNC_VIEWS = os.environ.get("CHAT_ASYNC_VIEWS", "0") == "1"
+# Live message events (GET /api/conversations/{id}/events/)
+CHAT_EVENTS_HEARTBEAT_S = float(os.environ.get("CHAT_EVENTS_HEARTBEAT_S", "15"))
+CHAT_EVENTS_RETRY_MS = int(os.environ.get("CHAT_EVENTS_RETRY_MS", "3000"))
+# Reply context: recent turns plus a rolling conversation summary, within a token budget
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.environ.get("CHAT_CONTEXT_TOKEN_BUDGET", "2000"))
+CHAT_CONTEXT_MAX_TURN_TOKENS = int(os.environ.get("CHAT_CONTEXT_MAX_TURN_TOKENS", "500"))
+CHAT_CONTEXT_SUMMARY_TOKENS = int(os.environ.get("CHAT_CONTEXT_SUMMARY_TOKENS", "300"))
+# Summarize once this many messages have dropped out of the recent window
+CHAT_CONTEXT_SUMMARY_BATCH = int(os.environ.get("CHAT_CONTEXT_SUMMARY_BATCH", "6"))
+# Queued replies (POST .../messages/?async=1): in-process worker threads, 0 to only
+# run them from `manage.py run_reply_worker`
+CHAT_JOB_WORKERS = int(os.environ.get("CHAT_JOB_WORKERS", "2"))
+CHAT_JOB_POLL_S = float(os.environ.get("CHAT_JOB_POLL_S", "2"))
+CHAT_JOB_LEASE_S = int(os.environ.get("CHAT_JOB_LEASE_S", "120"))
+CHAT_JOB_MAX_ATTEMPTS = int(os.environ.get("CHAT_JOB_MAX_ATTEMPTS", "3"))
+# Opt-in per-process cache of Gemini replies keyed on normalized prompt + history
+CHAT_REPLY_CACHE = os.environ.get("CHAT_REPLY_CACHE", "0") == "1"
+CHAT_REPLY_CACHE_TTL_S = int(os.environ.get("CHAT_REPLY_CACHE_TTL_S", "3600"))
+CHAT_REPLY_CACHE_MAX_ENTRIES = int(os.environ.get("CHAT_REPLY_CACHE_MAX_ENTRIES", "1000"))
+# Cosine similarity (0-1) above which a near-identical cached prompt is reused; 0 = exact only
+CHAT_REPLY_CACHE_SIMILARITY = float(os.environ.get("CHAT_REPLY_CACHE_SIMILARITY", "0"))
+# Request/Gemini histograms, served at /metrics
+CHAT_METRICS = os.environ.get("CHAT_METRICS", "1") == "1"
+# Write a sampled stack profile for requests slower than this (0 = off)
+CHAT_PROFILE_SLOW_MS = float(os.environ.get("CHAT_PROFILE_SLOW_MS", "0"))
+CHAT_PROFILE_INTERVAL_MS = float(os.environ.get("CHAT_PROFILE_INTERVAL_MS", "5"))
+CHAT_PROFILE_DIR = os.environ.get("CHAT_PROFILE_DIR", str(BASE_DIR / "profiles"))
+# Message search: "auto" uses SQLite FTS5 when available, "python" forces the in-process index
+CHAT_SEARCH_BACKEND = os.environ.get("CHAT_SEARCH_BACKEND", "auto")
+# DELETE hides a conversation and leaves purging its rows to a background thread
+# (or `manage.py purge_conversations`) instead of purging within the request
+CHAT_SOFT_DELETE = os.environ.get("CHAT_SOFT_DELETE", "0") == "1"
+# Default for `manage.py purge_conversations`: expire conversations idle this many days (0 = keep)
+CHAT_RETENTION_DAYS = int(os.environ.get("CHAT_RETENTION_DAYS", "0"))
@@ -2,9 +2,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
 
+from chat.metrics import metrics_view
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("chat.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path("", TemplateView.as_view(template_name="index.html"), name="index"),
 ]
@@ -0,0 +1,307 @@
+"""
+Latency and query counts for the chat API hot paths, through the full Django
+stack (middleware, views, serializers, renderers) on a throwaway SQLite file.
+
+Scenarios:
+    message_send         POST /api/conversations/{id}/messages/ (fake Gemini, see below)
+    message_list_since   GET  /api/conversations/{id}/messages/?since=
+    conversation_list    GET  /api/conversations/?limit=20
+    feedback_upsert      POST /api/conversations/{id}/messages/{id}/feedback/
+    insights_summary     GET  /api/insights/
+
+Each scenario runs at every data size (number of seeded conversations, each with
+--messages messages and feedback on half of the AI replies) and every concurrency
+level (client threads, standing in for WSGI worker threads). Gemini is a
+chat.testing.FakeGeminiModel with lognormal latency installed as the client, so
+the retry, breaker and limiter code paths are exercised as in production.
+
+Results are printed and written as JSON; pass an earlier file to --compare to
+see the change in p95 and queries per request, and to fail (exit 1) when any
+p95 grows by more than --max-regression or any query count grows.
+
+    uv run python benchmarks/api_suite.py --sizes 100 1000 --concurrency 1 8 --requests 200
+    uv run python benchmarks/api_suite.py --compare benchmarks/results/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ai_chat.settings")
+
+SCENARIOS = ("message_send", "message_list_since", "conversation_list", "feedback_upsert", "insights_summary")
+# Page size for the list scenarios
+PAGE = 20
+
+
+def _setup_django(db_path: str) -> None:
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {"message": None, "insights": None}
+    settings.ALLOWED_HOSTS = ["*"]
+    # Upstream errors must show up as errors, not as fallback replies
+    settings.DEBUG = False
+    settings.GEMINI_ALLOW_FALLBACK = False
+    settings.CHAT_JOB_WORKERS = 0
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def _install_fake_gemini(median_s: float, p95_s: float, max_concurrency: int) -> None:
+    from chat import testing
+    from chat.services import gemini
+
+    model = testing.FakeGeminiModel(testing.lognormal(median_s, p95_s), seed=1)
+    gemini._get_client = lambda: model
+    # Start the AIMD limiter wide enough that it is not what gets measured
+    gemini.concurrency_limiter = gemini.AIMDLimiter(initial=max_concurrency, maximum=max(64, max_concurrency))
+
+
+def _seed(start: int, stop: int, messages: int) -> None:
+    from chat.models import Conversation, Message, MessageFeedback
+    from chat.services.transcripts import import_transcript
+
+    for n in range(start, stop):
+        conv = Conversation.objects.create(title=f"bench {n}")
+        import_transcript(conv, (
+            {"role": "user" if i % 2 == 0 else "ai", "text": f"message {i} " + "lorem ipsum " * 10}
+            for i in range(messages)
+        ))
+        ai_ids = Message.objects.filter(conversation=conv, role="ai").values_list("id", flat=True)
+        for i, pk in enumerate(list(ai_ids)[::2]):
+            MessageFeedback.objects.create(message_id=pk, is_helpful=bool(i % 2), comment="ok")
+
+
+def _targets() -> dict:
+    from chat.models import Conversation, Message
+
+    return {
+        "conversations": list(Conversation.objects.values_list("id", "last_sequence")),
+        "ai_messages": list(Message.objects.filter(role="ai").values_list("conversation_id", "id")),
+    }
+
+
+def _request(client, scenario: str, rng: random.Random, targets: dict):
+    """Issue one request; returns (response, expected status codes)."""
+    if scenario == "message_send":
+        conv_id, _ = rng.choice(targets["conversations"])
+        resp = client.post(
+            f"/api/conversations/{conv_id}/messages/",
+            data=json.dumps({"text": f"benchmark question {rng.random()}"}),
+            content_type="application/json",
+        )
+        return resp, (201,)
+    if scenario == "message_list_since":
+        conv_id, last_sequence = rng.choice(targets["conversations"])
+        since = max(0, last_sequence - PAGE)
+        return client.get(f"/api/conversations/{conv_id}/messages/", {"since": since, "limit": PAGE}), (200,)
+    if scenario == "conversation_list":
+        return client.get("/api/conversations/", {"limit": PAGE}), (200,)
+    if scenario == "feedback_upsert":
+        conv_id, message_id = rng.choice(targets["ai_messages"])
+        resp = client.post(
+            f"/api/conversations/{conv_id}/messages/{message_id}/feedback/",
+            data=json.dumps({"is_helpful": rng.random() < 0.7, "comment": "benchmark"}),
+            content_type="application/json",
+        )
+        return resp, (200, 201)
+    if scenario == "insights_summary":
+        return client.get("/api/insights/"), (200,)
+    raise ValueError(f"Unknown scenario {scenario!r}")
+
+
+def _percentile(sorted_values: list[float], q: int) -> float:
+    if len(sorted_values) < 2:
+        return sorted_values[0] if sorted_values else 0.0
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[q - 1]
+
+
+def _run(scenario: str, targets: dict, requests: int, concurrency: int, warmup: int) -> dict:
+    from django.db import connection, connections
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    latencies: list[float] = []
+    queries: list[int] = []
+    errors: list[int] = []
+    lock = threading.Lock()
+    counter = iter(range(requests + warmup))
+
+    def worker(seed: int) -> None:
+        client = Client()
+        rng = random.Random(seed)
+        try:
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                # The connection is per thread, so this only sees this request's queries
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    resp, expected = _request(client, scenario, rng, targets)
+                    elapsed = time.perf_counter() - start
+                if i < warmup:
+                    continue
+                with lock:
+                    latencies.append(elapsed)
+                    queries.append(len(captured))
+                    if resp.status_code not in expected:
+                        errors.append(resp.status_code)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_statuses": sorted(set(errors)),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "queries_per_request": round(statistics.fmean(queries), 2) if queries else 0.0,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=5
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def _key(row: dict) -> tuple:
+    return row["scenario"], row["size"], row["concurrency"]
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> int:
+    """Print p95 and query-count changes against `baseline`; returns the number of regressions."""
+    previous = {_key(row): row for row in baseline["results"]}
+    regressions = 0
+    print(f"\ncompared with {baseline['meta'].get('revision') or '?'} ({baseline['meta'].get('started_at')}):")
+    for row in current["results"]:
+        old = previous.get(_key(row))
+        if old is None:
+            continue
+        p95_change = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+        query_change = row["queries_per_request"] - old["queries_per_request"]
+        flags = []
+        if p95_change > max_regression:
+            flags.append("p95")
+        # Query counts are deterministic per request, so any growth is a regression
+        if query_change > 0.5:
+            flags.append("queries")
+        regressions += bool(flags)
+        print(
+            f"  {row['scenario']:<19} size={row['size']:<6} c={row['concurrency']:<3} "
+            f"p95 {old['p95_ms']:>8.2f} -> {row['p95_ms']:>8.2f}ms ({p95_change:+.0%})  "
+            f"queries {old['queries_per_request']:>5.1f} -> {row['queries_per_request']:>5.1f}"
+            + (f"  REGRESSION ({', '.join(flags)})" if flags else "")
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="seeded conversations")
+    parser.add_argument("--messages", type=int, default=20, help="messages per seeded conversation")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8], help="client threads")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per run")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per run")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--gemini-median", type=float, default=0.05, help="fake Gemini median latency (s)")
+    parser.add_argument("--gemini-p95", type=float, default=0.2, help="fake Gemini p95 latency (s)")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    parser.add_argument(
+        "--max-regression", type=float, default=0.25, help="p95 growth that counts as a regression (0.25 = +25%%)"
+    )
+    args = parser.parse_args()
+
+    started_at = datetime.now(timezone.utc)
+    output = Path(args.output) if args.output else (
+        BASE_DIR / "benchmarks" / "results" / f"{started_at:%Y%m%d-%H%M%S}.json"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _setup_django(os.path.join(tmp, "bench.sqlite3"))
+        _install_fake_gemini(args.gemini_median, args.gemini_p95, max(args.concurrency))
+
+        import django
+        from django.db import connection
+        from chat.services import gemini
+
+        results = []
+        seeded = 0
+        print(f"{'scenario':<19} {'size':>6} {'c':>3} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>8} {'queries':>8} {'errors':>6}")
+        for size in sorted(args.sizes):
+            _seed(seeded, size, args.messages)
+            seeded = max(seeded, size)
+            for concurrency in args.concurrency:
+                for scenario in args.scenarios:
+                    # Refreshed per run so sends from earlier runs are visible to list scenarios
+                    stats = _run(scenario, _targets(), args.requests, concurrency, args.warmup)
+                    results.append({"scenario": scenario, "size": size, "concurrency": concurrency, **stats})
+                    print(
+                        f"{scenario:<19} {size:>6} {concurrency:>3} {stats['p50_ms']:>7.2f}ms "
+                        f"{stats['p95_ms']:>7.2f}ms {stats['p99_ms']:>7.2f}ms {stats['throughput_rps']:>8.1f} "
+                        f"{stats['queries_per_request']:>8.1f} {stats['errors']:>6}"
+                    )
+
+        report = {
+            "meta": {
+                "started_at": started_at.isoformat(),
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "args": vars(args),
+                "upstream": gemini.upstream_metrics(),
+            },
+            "results": results,
+        }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(baseline, report, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
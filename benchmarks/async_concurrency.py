@@ -0,0 +1,143 @@
+"""
+Concurrent message-send throughput: sync DRF view vs async view.
+
+Gemini is replaced by a stub that sleeps for --latency seconds (time.sleep for the
+sync path, asyncio.sleep for the async path). The sync view is driven by a pool of
+--workers threads, standing in for a fixed number of WSGI workers; the async view
+is driven by a single event loop through the ASGI handler.
+
+    uv run python benchmarks/async_concurrency.py --requests 200 --latency 0.5 --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ai_chat.settings")
+
+
+def _setup_django(db_path: str) -> None:
+    import django
+    from django.conf import settings
+
+    # The SQLite profile in settings (WAL, IMMEDIATE transactions, busy timeout) applies
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {"message": None, "insights": None}
+    settings.ALLOWED_HOSTS = ["*"]
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def _install_stubs(latency: float) -> None:
+    from chat.services import gemini
+
+    def slow_reply(history, prompt, timeout_s=10):
+        time.sleep(latency)
+        return f"echo: {prompt}"
+
+    async def slow_reply_async(history, prompt, timeout_s=10):
+        await asyncio.sleep(latency)
+        return f"echo: {prompt}"
+
+    gemini.generate_reply = slow_reply
+    gemini.generate_reply_async = slow_reply_async
+
+
+def _run_sync(conv_ids: list[int], workers: int) -> float:
+    from django.db import connections
+    from django.test import Client
+
+    def send(i: int) -> int:
+        try:
+            resp = Client().post(
+                f"/api/conversations/{conv_ids[i]}/messages/",
+                data=json.dumps({"text": f"hello {i}"}),
+                content_type="application/json",
+            )
+            return resp.status_code
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        codes = list(pool.map(send, range(len(conv_ids))))
+    elapsed = time.perf_counter() - start
+    assert all(code == 201 for code in codes), codes
+    return elapsed
+
+
+def _run_async(conv_ids: list[int]) -> float:
+    from django.test import AsyncClient
+    from chat import async_views
+
+    # Route the message endpoint to the async view without reloading the URLconf.
+    from chat import urls
+
+    for pattern in urls.urlpatterns:
+        if pattern.name == "message-list-create":
+            pattern.callback = async_views.AsyncMessageListCreateView.as_view()
+
+    async def send_all() -> list[int]:
+        client = AsyncClient()
+
+        async def send(i: int) -> int:
+            resp = await client.post(
+                f"/api/conversations/{conv_ids[i]}/messages/",
+                data=json.dumps({"text": f"hello {i}"}),
+                content_type="application/json",
+            )
+            return resp.status_code
+
+        return await asyncio.gather(*(send(i) for i in range(len(conv_ids))))
+
+    start = time.perf_counter()
+    codes = asyncio.run(send_all())
+    elapsed = time.perf_counter() - start
+    assert all(code == 201 for code in codes), codes
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="concurrent conversations / requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake Gemini latency in seconds")
+    parser.add_argument("--workers", type=int, default=8, help="sync worker threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _setup_django(os.path.join(tmp, "bench.sqlite3"))
+        _install_stubs(args.latency)
+
+        from chat.models import Conversation
+
+        results = {}
+        for label in ("sync", "async"):
+            conv_ids = [Conversation.objects.create(title=f"{label} {i}").id for i in range(args.requests)]
+            if label == "sync":
+                elapsed = _run_sync(conv_ids, args.workers)
+            else:
+                elapsed = _run_async(conv_ids)
+            results[label] = elapsed
+            print(
+                f"{label:>5}: {args.requests} requests in {elapsed:.2f}s "
+                f"-> {args.requests / elapsed:.1f} req/s"
+            )
+
+        print(f"speedup: {results['sync'] / results['async']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+"""
+Concurrent message writes against the database profile from ai_chat/settings.py.
+
+Each of --processes worker processes (standing in for gunicorn workers) runs
+--threads threads that each save --writes messages through Message.save, spread
+over --conversations conversations (fewer conversations = more contention on the
+per-conversation sequence counter). With SQLite, the "untuned" profile (default
+journal, deferred transactions, 5s timeout, no pragmas) runs alongside for comparison;
+server databases (DB_ENGINE=postgresql ...) run the configured profile only.
+
+    uv run python benchmarks/db_contention.py --processes 4 --threads 4 --writes 50 --conversations 2
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ai_chat.settings")
+
+
+def _setup_django(profile: str, db_path: str | None) -> None:
+    import django
+    from django.conf import settings
+
+    db = settings.DATABASES["default"]
+    if db["ENGINE"].endswith("sqlite3"):
+        db["NAME"] = db_path
+        if profile == "untuned":
+            db["OPTIONS"] = {"timeout": 5}
+            settings.SQLITE_PRAGMAS = {}
+    django.setup()
+
+
+def _prepare(profile: str, db_path: str | None, conversations: int, queue) -> None:
+    _setup_django(profile, db_path)
+    from django.core.management import call_command
+    from chat.models import Conversation
+
+    call_command("migrate", verbosity=0)
+    queue.put([Conversation.objects.create(title=f"bench {i}").id for i in range(conversations)])
+
+
+def _worker(profile: str, db_path: str | None, conv_ids: list[int], threads: int, writes: int, queue) -> None:
+    _setup_django(profile, db_path)
+    from django.db import OperationalError, connections
+    from chat.models import Message
+
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def write(offset: int) -> None:
+        nonlocal errors
+        try:
+            for i in range(writes):
+                conv_id = conv_ids[(offset + i) % len(conv_ids)]
+                start = time.perf_counter()
+                try:
+                    Message.objects.create(conversation_id=conv_id, role=Message.ROLE_USER, text=f"message {i}")
+                except OperationalError:
+                    with lock:
+                        errors += 1
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+
+    pool = [threading.Thread(target=write, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    queue.put((latencies, errors))
+
+
+def _run(profile: str, args) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite3")
+        prep = ctx.Process(target=_prepare, args=(profile, db_path, args.conversations, queue))
+        prep.start()
+        conv_ids = queue.get()
+        prep.join()
+
+        start = time.perf_counter()
+        procs = [
+            ctx.Process(target=_worker, args=(profile, db_path, conv_ids, args.threads, args.writes, queue))
+            for _ in range(args.processes)
+        ]
+        for p in procs:
+            p.start()
+        results = [queue.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(lat for lats, _ in results for lat in lats)
+    errors = sum(err for _, err in results)
+    pct = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "profile": profile,
+        "ok": len(latencies),
+        "errors": errors,
+        "writes_per_s": len(latencies) / elapsed,
+        "p50_ms": pct[49] * 1000,
+        "p95_ms": pct[94] * 1000,
+        "p99_ms": pct[98] * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4, help="writer threads per process")
+    parser.add_argument("--writes", type=int, default=50, help="messages per thread")
+    parser.add_argument("--conversations", type=int, default=2)
+    args = parser.parse_args()
+
+    sqlite = os.environ.get("DB_ENGINE", "sqlite") == "sqlite"
+    for profile in (("untuned", "configured") if sqlite else ("configured",)):
+        r = _run(profile, args)
+        print(
+            f"{r['profile']:>10}: {r['ok']} writes, {r['errors']} errors, {r['writes_per_s']:.0f} writes/s, "
+            f"p50 {r['p50_ms']:.1f} ms, p95 {r['p95_ms']:.1f} ms, p99 {r['p99_ms']:.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
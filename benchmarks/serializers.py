@@ -0,0 +1,100 @@
+"""
+Message-list serialization cost: DRF MessageSerializer + JSONRenderer vs the
+.values_list() fast path + FastJSONRenderer used by the list endpoints.
+
+Each run serializes and renders one page of messages (about a third with
+feedback) straight from the ORM, so the numbers cover query + serialize +
+render but not the HTTP stack.
+
+    uv run python benchmarks/serializers.py --sizes 50 200 --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ai_chat.settings")
+
+
+def _setup_django(db_path: str) -> None:
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def _seed(size: int) -> int:
+    from chat.models import Conversation, Message, MessageFeedback
+    from chat.services.transcripts import import_transcript
+
+    conv = Conversation.objects.create(title=f"bench {size}")
+    import_transcript(conv, (
+        {"role": "user" if i % 2 == 0 else "ai", "text": f"message {i} " + "lorem ipsum " * 20}
+        for i in range(size)
+    ))
+    ai_ids = list(Message.objects.filter(conversation=conv, role="ai").values_list("id", flat=True))
+    MessageFeedback.objects.bulk_create(
+        MessageFeedback(conversation=conv, message_id=pk, is_helpful=bool(i % 2), comment="ok")
+        for i, pk in enumerate(ai_ids[::2])
+    )
+    return conv.id
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200], help="page sizes")
+    parser.add_argument("--repeat", type=int, default=200, help="iterations per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _setup_django(os.path.join(tmp, "bench.sqlite3"))
+
+        from rest_framework.renderers import JSONRenderer
+        from chat.renderers import FastJSONRenderer, orjson
+        from chat.serializers import MessageSerializer, serialize_message_rows
+        from chat.views import _message_page_queryset
+
+        print(f"orjson: {'yes' if orjson is not None else 'no'}")
+        for size in args.sizes:
+            conv_id = _seed(size)
+
+            def drf() -> bytes:
+                rows = _message_page_queryset(conv_id, 0, size)
+                data = MessageSerializer(rows, many=True).data
+                return JSONRenderer().render({"results": data, "lastSeq": size})
+
+            def fast() -> bytes:
+                data = serialize_message_rows(_message_page_queryset(conv_id, 0, size))
+                return FastJSONRenderer().render({"results": data, "lastSeq": size})
+
+            assert drf() == fast()
+            slow_s = _time(drf, args.repeat)
+            fast_s = _time(fast, args.repeat)
+            print(
+                f"page {size:>4}: drf {slow_s * 1000:7.2f} ms  fast {fast_s * 1000:7.2f} ms  "
+                f"-> {slow_s / fast_s:.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,18 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save
 
 
 class ChatConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "chat"
 
+    def ready(self):
+        from .db import configure_sqlite_connection
+        from .metrics import instrument_connection
+        from .models import Message
+        from .services.search import index_saved_message
+
+        connection_created.connect(configure_sqlite_connection, dispatch_uid="chat.configure_sqlite_connection")
+        connection_created.connect(instrument_connection, dispatch_uid="chat.instrument_connection")
+        post_save.connect(index_saved_message, sender=Message, dispatch_uid="chat.index_saved_message")
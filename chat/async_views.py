@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpRequest, JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import metrics
+from .models import Conversation, Message
+from .serializers import MessageSerializer, CreateMessageSerializer, serialize_message_rows
+from .services import context, gemini, insights, reply_cache
+from .throttles import MessageRateThrottle, InsightsRateThrottle
+from .views import (
+    MESSAGE_LIST_VALIDATOR_FIELDS,
+    _accept_queued_reply,
+    _conditional,
+    _event_stream_response,
+    _message_list_etag,
+    _message_page_queryset,
+    _stream_reply_events,
+    _wants_queued_reply,
+)
+
+
+def _json(data, status: int = 200) -> JsonResponse:
+    # Use DRF's encoder so payloads match the sync APIViews byte for byte.
+    return JsonResponse(data, status=status, encoder=JSONEncoder)
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async base mirroring the bits of DRF's APIView the chat endpoints
+    rely on (JSON bodies, throttling and JSON error responses), since DRF views
+    cannot be awaited.
+    """
+
+    throttle_classes: list = []
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Same as DRF: session CSRF is not enforced for these JSON endpoints.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs):
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await sync_to_async(throttle.allow_request)(request, self):
+                wait = throttle.wait()
+                detail = "Request was throttled."
+                if wait is not None:
+                    detail += f" Expected available in {int(wait)} seconds."
+                return _json({"detail": detail}, status=429)
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except (Http404, exceptions.APIException) as exc:
+            return self.handle_exception(exc)
+
+    @staticmethod
+    def handle_exception(exc: Exception) -> JsonResponse:
+        # The same bodies as DRF's default exception_handler
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound(*exc.args)
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        return _json(data, status=exc.status_code)
+
+    @staticmethod
+    def parse_json(request: HttpRequest):
+        if not request.body:
+            return {}
+        try:
+            return json.loads(request.body)
+        except ValueError as e:
+            raise exceptions.ParseError(f"JSON parse error - {e}")
+
+
+class AsyncMessageListCreateView(AsyncAPIView):
+    throttle_classes = [MessageRateThrottle]
+
+    async def get(self, request: HttpRequest, pk: int) -> JsonResponse:
+        try:
+            since = int(request.GET.get("since", 0))
+        except ValueError:
+            since = 0
+        try:
+            limit = min(int(request.GET.get("limit", 50)), 200)
+        except ValueError:
+            limit = 50
+        validator = await Conversation.objects.filter(pk=pk).values_list(*MESSAGE_LIST_VALIDATOR_FIELDS).afirst()
+        if validator is None:
+            raise Http404("No Conversation matches the given query.")
+        etag = _message_list_etag(pk, validator, since, limit, "json")
+        not_modified = _conditional(request, etag)
+        if not_modified is not None:
+            return not_modified
+        results = await sync_to_async(serialize_message_rows)(_message_page_queryset(pk, since, limit))
+        return _conditional(request, etag, _json({
+            "results": results,
+            "lastSeq": (results[-1]["sequence"] if results else since),
+        }))
+
+    async def post(self, request: HttpRequest, pk: int):
+        conv = await aget_object_or_404(Conversation, pk=pk)
+        serializer = CreateMessageSerializer(data=self.parse_json(request))
+        if not serializer.is_valid():
+            return _json(serializer.errors, status=400)
+        text: str = serializer.validated_data["text"].strip()
+
+        if _wants_queued_reply(request.GET, request.headers):
+            payload, headers = await sync_to_async(_accept_queued_reply)(conv, text)
+            response = _json(payload, status=202)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        user_msg = await Message.objects.acreate(conversation=conv, role=Message.ROLE_USER, text=text)
+        history = await sync_to_async(context.build_history)(conv, text, before_sequence=user_msg.sequence)
+        user_data = await sync_to_async(lambda: MessageSerializer(user_msg).data)()
+
+        if request.GET.get("stream") in ("1", "true"):
+            return _event_stream_response(_stream_reply_events(conv, user_data, history, text))
+
+        try:
+            reply = await reply_cache.generate_reply_async(history=history, prompt=text, timeout_s=10)
+        except gemini.GeminiServiceError as e:
+            if gemini.fallback_allowed():
+                metrics.record_fallback("generate_reply")
+                reply = f"(Gemini unavailable) {e}"
+            else:
+                return _json({"detail": str(e)}, status=502)
+
+        ai_msg = await Message.objects.acreate(conversation=conv, role=Message.ROLE_AI, text=reply)
+        await sync_to_async(context.schedule_summary_refresh)(conv.pk)
+        ai_data = await sync_to_async(lambda: MessageSerializer(ai_msg).data)()
+        return _json({"user_message": user_data, "ai_message": ai_data}, status=201)
+
+
+class AsyncInsightsView(AsyncAPIView):
+    async def get(self, request: HttpRequest) -> JsonResponse:
+        return _json(await sync_to_async(insights.get_feedback_summary)())
+
+
+class AsyncActionableInsightsView(AsyncAPIView):
+    throttle_classes = [InsightsRateThrottle]
+
+    async def post(self, request: HttpRequest) -> JsonResponse:
+        summary = await sync_to_async(insights.get_feedback_summary)()
+        try:
+            text = await insights.get_actionable_insights_async(summary, timeout_s=15)
+        except gemini.GeminiServiceError as e:
+            if gemini.fallback_allowed():
+                metrics.record_fallback("generate_actionable_insights")
+                text = f"(Gemini unavailable) {e}"
+            else:
+                return _json({"detail": str(e)}, status=502)
+        return _json({"insights": text})
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.conf import settings
+
+
+def configure_sqlite_connection(sender, connection, **kwargs) -> None:
+    """
+    connection_created handler: apply settings.SQLITE_PRAGMAS to each new
+    SQLite connection (WAL, synchronous, mmap, busy timeout). journal_mode=WAL
+    is persistent in the database file; the others are per connection.
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
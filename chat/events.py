@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Set
+
+
+class Subscription:
+    """A single listener for new messages in one conversation, bound to an event loop."""
+
+    def __init__(self, conversation_id: int) -> None:
+        self.conversation_id = conversation_id
+        self.loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # Loop already closed; the subscriber is gone.
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for a notification; returns False if the timeout elapsed first."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        return True
+
+
+class ConversationEvents:
+    """
+    In-process pub/sub of "conversation has new messages" notifications.
+
+    Publishers may run on any thread (sync views, sync_to_async workers); each
+    subscriber is woken on its own event loop. Notifications carry no payload:
+    subscribers re-read messages after their last seen sequence.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, conversation_id: int) -> Subscription:
+        sub = Subscription(conversation_id)
+        with self._lock:
+            self._subscribers[conversation_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.conversation_id)
+            if subs is None:
+                return
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.conversation_id]
+
+    def publish(self, conversation_id: int) -> None:
+        with self._lock:
+            subs = list(self._subscribers.get(conversation_id, ()))
+        for sub in subs:
+            sub.notify()
+
+    def subscriber_count(self, conversation_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(conversation_id, ()))
+
+
+conversation_events = ConversationEvents()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.models import Conversation
+from chat.services.export import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    ExportError,
+    export_queryset,
+    parse_bound,
+    stream_export,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream one conversation, or every conversation created in a date range, as NDJSON "
+        "or CSV (messages with their feedback). Memory use does not grow with the export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--conversation", type=int, help="Export only this conversation.")
+        parser.add_argument("--since", help="Conversations created at or after this ISO 8601 date/datetime.")
+        parser.add_argument("--until", help="Conversations created before this ISO 8601 date/datetime.")
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--output", "-o", default="-", help="Output file, or - for stdout.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows fetched per cursor read.")
+
+    def handle(self, *args, conversation: int | None, since: str | None, until: str | None, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        try:
+            since_at, until_at = parse_bound(since), parse_bound(until)
+        except ExportError as e:
+            raise CommandError(str(e))
+        if conversation is not None and not Conversation.objects.filter(pk=conversation).exists():
+            raise CommandError(f"Conversation {conversation} does not exist.")
+
+        stream = stream_export(
+            export_queryset(conversation, since_at, until_at),
+            options["format"],
+            compress=options["gzip"],
+            chunk_size=options["chunk_size"],
+        )
+        output = options["output"]
+        if output == "-":
+            for block in stream:
+                sys.stdout.buffer.write(block)
+            sys.stdout.buffer.flush()
+            return
+        with open(output, "wb") as fp:
+            for block in stream:
+                fp.write(block)
+        self.stderr.write(f"Wrote {output}.")
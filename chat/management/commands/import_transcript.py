@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.models import Conversation
+from chat.services.transcripts import (
+    DEFAULT_BATCH_SIZE,
+    TranscriptError,
+    import_transcript,
+    iter_ndjson,
+    load_json_transcript,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a conversation transcript (JSON or NDJSON) with bulk inserts. "
+        "Messages are appended in file order; batches commit independently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Transcript file, or - for stdin.")
+        parser.add_argument("--conversation", type=int, help="Append to this conversation instead of creating one.")
+        parser.add_argument("--title", help="Title for the new conversation (overrides the transcript title).")
+        parser.add_argument(
+            "--format",
+            choices=["auto", "json", "ndjson"],
+            default="auto",
+            help="Input format; auto picks ndjson for .ndjson/.jsonl files, json otherwise.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, path: str, conversation: int | None, title: str | None, **options):
+        fmt = options["format"]
+        if fmt == "auto":
+            fmt = "ndjson" if Path(path).suffix in (".ndjson", ".jsonl") else "json"
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        if conversation is not None:
+            try:
+                conv = Conversation.objects.get(pk=conversation)
+            except Conversation.DoesNotExist:
+                raise CommandError(f"Conversation {conversation} does not exist.")
+        else:
+            conv = None
+
+        fp = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            if fmt == "ndjson":
+                messages = iter_ndjson(fp)
+            else:
+                transcript_title, messages = load_json_transcript(fp)
+                title = title or transcript_title
+            if conv is None:
+                conv = Conversation.objects.create(title=title or None)
+            imported = import_transcript(conv, messages, batch_size=options["batch_size"])
+        except TranscriptError as e:
+            raise CommandError(str(e))
+        finally:
+            if fp is not sys.stdin.buffer:
+                fp.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} messages into conversation {conv.pk}."))
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.services.retention import DEFAULT_CHUNK_SIZE, expire_conversations, purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire conversations with no activity for --older-than-days, then purge every "
+        "deleted conversation in bounded chunks, each its own short transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.CHAT_RETENTION_DAYS,
+            help="Expire conversations not updated for this many days (0 = only purge deleted ones).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per DELETE statement.")
+        parser.add_argument(
+            "--pause-ms",
+            type=float,
+            default=0,
+            help="Sleep between chunks so other writers can take the SQLite write lock.",
+        )
+        parser.add_argument("--limit", type=int, help="Purge at most this many conversations, then exit.")
+
+    def handle(self, *args, older_than_days: int, chunk_size: int, pause_ms: float, limit: int | None, **options):
+        if older_than_days < 0:
+            raise CommandError("--older-than-days must not be negative.")
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        if older_than_days:
+            expired = expire_conversations(older_than_days)
+            self.stdout.write(f"Expired {expired} conversations idle for {older_than_days}+ days.")
+        purged = purge_deleted(chunk_size=chunk_size, pause_s=pause_ms / 1000, limit=limit)
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} conversations."))
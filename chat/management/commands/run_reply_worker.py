@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.services.jobs import run_pending, worker_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued AI replies (POST .../messages/?async=1). Runs a pool of worker "
+        "threads until interrupted; --once drains due jobs on this thread and exits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=max(settings.CHAT_JOB_WORKERS, 1),
+            help="Worker threads, i.e. the cap on concurrent Gemini calls from this process.",
+        )
+        parser.add_argument("--once", action="store_true", help="Process due jobs, then exit.")
+
+    def handle(self, *args, workers: int, once: bool, **options):
+        if once:
+            processed = run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} reply jobs."))
+            return
+        if workers < 1:
+            raise CommandError("--workers must be positive.")
+
+        stopped = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stopped.set())
+        worker_pool.start(workers)
+        self.stdout.write(f"Running {workers} reply workers; Ctrl-C to stop.")
+        while not stopped.wait(1):
+            pass
+        worker_pool.stop(timeout=30)
+        self.stdout.write(self.style.SUCCESS("Reply workers stopped."))
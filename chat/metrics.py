@@ -0,0 +1,251 @@
+"""
+In-process request and upstream metrics, exposed in the Prometheus text format.
+
+MetricsMiddleware opens a RequestStats for each request; a database execute
+wrapper (installed on every connection) and the serialization() context
+manager add to it, and the middleware turns it into histogram observations
+labelled by URL name. Gemini calls are observed by the service layer. Values
+are per process: scrape every worker, or run one.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values, like prometheus_client's."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[2] if series else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, [list(value[0]), value[1], value[2]]) for key, value in self._series.items())
+        for label_values, (counts, total, count) in series:
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+request_seconds = Histogram(
+    "chat_request_duration_seconds", "Wall time per request.", ("endpoint", "method", "status"), SECONDS_BUCKETS
+)
+request_queries = Histogram(
+    "chat_request_db_queries", "Database queries per request.", ("endpoint", "method"), QUERY_BUCKETS
+)
+request_db_seconds = Histogram(
+    "chat_request_db_seconds", "Time spent in database queries per request.", ("endpoint", "method"), SECONDS_BUCKETS
+)
+request_serializer_seconds = Histogram(
+    "chat_request_serializer_seconds",
+    "Time spent serializing and rendering the response per request.",
+    ("endpoint", "method"),
+    SECONDS_BUCKETS,
+)
+gemini_seconds = Histogram(
+    "chat_gemini_call_seconds",
+    "Gemini call latency (including retries) by function and outcome.",
+    ("function", "outcome"),
+    SECONDS_BUCKETS,
+)
+HISTOGRAMS = (request_seconds, request_queries, request_db_seconds, request_serializer_seconds, gemini_seconds)
+
+_fallbacks: Dict[str, int] = {}
+_fallbacks_lock = threading.Lock()
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_s: float = 0.0
+    serializer_s: float = 0.0
+    _serializing: int = 0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("chat_request_stats", default=None)
+
+
+def start_request() -> Tuple[RequestStats, Any]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(token) -> None:
+    _current.reset(token)
+
+
+def current_request() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper: time queries run on behalf of the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_s += time.perf_counter() - start
+
+
+def instrument_connection(sender, connection, **kwargs) -> None:
+    """connection_created handler: install record_query once per connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serialization() -> Iterator[None]:
+    """Count the enclosed block as serializer time for the current request (nesting counts once)."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    stats._serializing += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats._serializing -= 1
+        if not stats._serializing:
+            stats.serializer_s += time.perf_counter() - start
+
+
+def observe_request(endpoint: str, method: str, status: int, elapsed_s: float, stats: RequestStats) -> None:
+    request_seconds.observe(elapsed_s, endpoint, method, str(status))
+    request_queries.observe(stats.queries, endpoint, method)
+    request_db_seconds.observe(stats.db_s, endpoint, method)
+    request_serializer_seconds.observe(stats.serializer_s, endpoint, method)
+
+
+def gemini_outcome(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "success"
+    from .services.gemini import GeminiUnavailableError
+
+    if isinstance(error, GeminiUnavailableError):
+        return "rejected"
+    message = str(error).lower()
+    if "deadline" in message or "timeout" in message or "timed out" in message or "504" in message:
+        return "timeout"
+    return "error"
+
+
+def observe_gemini(function: str, elapsed_s: float, error: Optional[BaseException]) -> None:
+    gemini_seconds.observe(elapsed_s, function, gemini_outcome(error))
+
+
+def record_fallback(function: str) -> None:
+    """A failed Gemini call was answered with the placeholder reply instead of an error."""
+    with _fallbacks_lock:
+        _fallbacks[function] = _fallbacks.get(function, 0) + 1
+
+
+def reset() -> None:
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+    with _fallbacks_lock:
+        _fallbacks.clear()
+
+
+def _gauge(name: str, documentation: str, value: float, kind: str = "gauge") -> List[str]:
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+
+def render() -> str:
+    from .services import gemini, reply_cache
+
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+
+    lines.extend([
+        "# HELP chat_gemini_fallbacks_total Failed Gemini calls answered with the placeholder reply.",
+        "# TYPE chat_gemini_fallbacks_total counter",
+    ])
+    with _fallbacks_lock:
+        fallbacks = sorted(_fallbacks.items())
+    lines.extend(f'chat_gemini_fallbacks_total{{function="{_escape(name)}"}} {count}' for name, count in fallbacks)
+
+    upstream = gemini.upstream_metrics()
+    circuit, concurrency = upstream["circuit"], upstream["concurrency"]
+    lines.extend(_gauge(
+        "chat_gemini_circuit_open", "1 while the Gemini circuit breaker is open.", int(circuit["state"] == "open")
+    ))
+    lines.extend(_gauge(
+        "chat_gemini_circuit_rejected_total", "Calls rejected by the open circuit.", circuit["rejected_total"], "counter"
+    ))
+    lines.extend(_gauge("chat_gemini_concurrency_limit", "Current AIMD in-flight limit.", concurrency["limit"]))
+    lines.extend(_gauge("chat_gemini_in_flight", "Gemini calls in flight.", concurrency["in_flight"]))
+    lines.extend(_gauge(
+        "chat_gemini_limit_rejected_total",
+        "Calls rejected by the in-flight limit.",
+        concurrency["rejected_total"],
+        "counter",
+    ))
+
+    cache = reply_cache.get_reply_cache()
+    if cache is not None:
+        snapshot = cache.snapshot()
+        lines.extend(_gauge("chat_reply_cache_size", "Entries in the reply cache.", snapshot["size"]))
+        for key in ("hits", "similar_hits", "misses", "evictions"):
+            lines.extend(_gauge(f"chat_reply_cache_{key}_total", f"Reply cache {key.replace('_', ' ')}.", snapshot[key], "counter"))
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request) -> HttpResponse:
+    if not settings.CHAT_METRICS:
+        raise Http404("Metrics are disabled.")
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, profiling
+
+
+class _TimedBody:
+    """
+    Wraps a streaming response body and calls `finish` once: when the body is
+    exhausted or fails, or when the server closes the response (e.g. the
+    client went away).
+    """
+
+    def __init__(self, content, finish) -> None:
+        self._content = content
+        self._finish = finish
+
+    def close(self) -> None:
+        finish, self._finish = self._finish, None
+        if finish is not None:
+            finish()
+
+
+class _TimedSyncBody(_TimedBody):
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._content)
+        except BaseException:
+            self.close()
+            raise
+
+
+class _TimedAsyncBody(_TimedBody):
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._content.__anext__()
+        except BaseException:
+            self.close()
+            raise
+
+
+def _endpoint(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.view_name or "unnamed"
+
+
+class MetricsMiddleware:
+    """
+    Per-request wall time, database query count and time, and serializer time,
+    recorded as histograms labelled by URL name (see chat/metrics.py). With
+    CHAT_PROFILE_SLOW_MS set, requests slower than that also leave a sampled
+    profile in CHAT_PROFILE_DIR. Streaming responses are timed until their body
+    is exhausted or closed; queries made while the body streams are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _begin(self):
+        stats, token = metrics.start_request()
+        sampler = profiling.start(settings.CHAT_PROFILE_INTERVAL_MS) if settings.CHAT_PROFILE_SLOW_MS > 0 else None
+        return stats, token, sampler, time.perf_counter()
+
+    def _end(self, request, response, stats, token, sampler, start) -> None:
+        metrics.finish_request(token)
+        finish = partial(self._observe, request, response, stats, sampler, start)
+        if response is not None and response.streaming:
+            timed = _TimedAsyncBody if response.is_async else _TimedSyncBody
+            response.streaming_content = timed(response.streaming_content, finish)
+            return
+        finish()
+
+    def _observe(self, request, response, stats, sampler, start) -> None:
+        elapsed = time.perf_counter() - start
+        endpoint = _endpoint(request)
+        status = response.status_code if response is not None else 500
+        metrics.observe_request(endpoint, request.method, status, elapsed, stats)
+        if sampler is not None:
+            sampler.stop()
+            if elapsed * 1000 >= settings.CHAT_PROFILE_SLOW_MS:
+                profiling.dump(sampler, settings.CHAT_PROFILE_DIR, endpoint, elapsed)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.CHAT_METRICS:
+            return self.get_response(request)
+        stats, token, sampler, start = self._begin()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            self._end(request, response, stats, token, sampler, start)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.CHAT_METRICS:
+            return await self.get_response(request)
+        # Under ASGI the sampler sees the event loop thread, i.e. async views
+        stats, token, sampler, start = self._begin()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._end(request, response, stats, token, sampler, start)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook; time the rendering too
+        stats = metrics.current_request()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.serializer_s += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
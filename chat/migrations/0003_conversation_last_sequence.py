@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_last_sequence(apps, schema_editor):
+    Conversation = apps.get_model("chat", "Conversation")
+    Message = apps.get_model("chat", "Message")
+    last = (
+        Message.objects.filter(conversation=OuterRef("pk"))
+        .values("conversation")
+        .annotate(last=Max("sequence"))
+        .values("last")
+    )
+    Conversation.objects.update(last_sequence=Coalesce(Subquery(last), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0002_messagefeedback"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="last_sequence",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_last_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_feedback_counters(apps, schema_editor):
+    Conversation = apps.get_model("chat", "Conversation")
+    MessageFeedback = apps.get_model("chat", "MessageFeedback")
+    per_conversation = MessageFeedback.objects.filter(conversation=OuterRef("pk")).values("conversation")
+    Conversation.objects.update(
+        feedback_count=Coalesce(Subquery(per_conversation.annotate(n=Count("id")).values("n")), 0),
+        helpful_feedback_count=Coalesce(
+            Subquery(per_conversation.annotate(n=Count("id", filter=Q(is_helpful=True))).values("n")), 0
+        ),
+        last_feedback_at=Subquery(per_conversation.annotate(last=Max("created_at")).values("last")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0004_alter_message_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="feedback_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="helpful_feedback_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_feedback_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(fields=["-feedback_count", "-last_feedback_at"], name="chat_conv_feedback_rank_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="messagefeedback",
+            index=models.Index(fields=["-created_at"], name="chat_mfb_created_idx"),
+        ),
+        migrations.RunPython(backfill_feedback_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0006_conversation_updated_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="context_summary",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="context_summary_sequence",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
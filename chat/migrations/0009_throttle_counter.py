@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0008_reply_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=250, unique=True)),
+                ("count", models.IntegerField(default=0)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+# External-content FTS5 index over chat_message.text. Triggers keep it in sync
+# with every insert, update and delete, including bulk_create and cascades.
+CREATE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE chat_message_fts USING fts5("
+    "text, content='chat_message', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER chat_message_fts_ai AFTER INSERT ON chat_message BEGIN "
+    "INSERT INTO chat_message_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER chat_message_fts_ad AFTER DELETE ON chat_message BEGIN "
+    "INSERT INTO chat_message_fts(chat_message_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER chat_message_fts_au AFTER UPDATE OF text ON chat_message BEGIN "
+    "INSERT INTO chat_message_fts(chat_message_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO chat_message_fts(rowid, text) VALUES (new.id, new.text); END",
+    # Index the messages that already exist
+    "INSERT INTO chat_message_fts(chat_message_fts) VALUES ('rebuild')",
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS chat_message_fts_au",
+    "DROP TRIGGER IF EXISTS chat_message_fts_ad",
+    "DROP TRIGGER IF EXISTS chat_message_fts_ai",
+    "DROP TABLE IF EXISTS chat_message_fts",
+]
+
+
+def fts5_supported(connection) -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_fts_index(apps, schema_editor):
+    # Other databases (and SQLite builds without FTS5) use the in-process index
+    if not fts5_supported(schema_editor.connection):
+        return
+    for statement in CREATE_STATEMENTS:
+        schema_editor.execute(statement)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_STATEMENTS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0009_throttle_counter"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0010_message_fts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="feedback_revision",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+
+PREVIEW_LENGTH = 120
+
+
+def backfill(apps, schema_editor):
+    Conversation = apps.get_model("chat", "Conversation")
+    Message = apps.get_model("chat", "Message")
+    messages = Message.objects.filter(conversation=OuterRef("pk"))
+    newest = messages.order_by("-sequence")
+    counts = messages.order_by().values("conversation").annotate(n=Count("id")).values("n")
+    Conversation.objects.update(
+        message_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)),
+        last_message_preview=Coalesce(Subquery(newest.values(preview=Substr("text", 1, PREVIEW_LENGTH))[:1]), Value("")),
+        last_message_role=Coalesce(Subquery(newest.values("role")[:1]), Value("")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0011_conversation_feedback_revision"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="message_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_preview",
+            field=models.CharField(blank=True, default="", editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_role",
+            field=models.CharField(blank=True, default="", editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
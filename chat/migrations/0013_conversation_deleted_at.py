@@ -0,0 +1,36 @@
+import django.db.models.manager
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0012_conversation_read_model"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="conversation",
+            options={"base_manager_name": "all_objects", "ordering": ["-updated_at", "id"]},
+        ),
+        migrations.AlterModelManagers(
+            name="conversation",
+            managers=[
+                ("objects", django.db.models.manager.Manager()),
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="chat_conv_deleted_idx",
+            ),
+        ),
+    ]
@@ -1,20 +1,170 @@
 from __future__ import annotations
 
-from django.db import models, transaction
+from functools import partial
+
+from django.db import connection, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Substr
 from django.utils import timezone
 
+from .events import conversation_events
+
+
+# Characters of the newest message kept on Conversation for the sidebar
+MESSAGE_PREVIEW_LENGTH = 120
+
+
+def _update_returning_supported() -> bool:
+    # PostgreSQL, and SQLite from 3.35; Django's feature flag tracks the SQLite
+    # version (MariaDB sets it too, but only for INSERT)
+    return connection.vendor in ("sqlite", "postgresql") and connection.features.can_return_columns_from_insert
+
+
+class ConversationManager(models.Manager):
+    def get_queryset(self):
+        # Deleted conversations stay hidden until services/retention.py purges them
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Conversation(models.Model):
     title = models.CharField(max_length=200, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Highest Message.sequence handed out so far; only ever moves forward.
+    last_sequence = models.PositiveIntegerField(default=0, editable=False)
+    # Sidebar read model, maintained on message create and delete
+    message_count = models.PositiveIntegerField(default=0, editable=False)
+    last_message_preview = models.CharField(max_length=MESSAGE_PREVIEW_LENGTH, blank=True, default="", editable=False)
+    last_message_role = models.CharField(max_length=10, blank=True, default="", editable=False)
+    # Feedback counters, maintained by MessageFeedback.save/delete
+    feedback_count = models.PositiveIntegerField(default=0, editable=False)
+    helpful_feedback_count = models.PositiveIntegerField(default=0, editable=False)
+    last_feedback_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Bumped by every feedback write, including comment edits; part of the message-list ETag
+    feedback_revision = models.PositiveIntegerField(default=0, editable=False)
+    # Rolling summary of messages older than the reply context window, see services/context.py
+    context_summary = models.TextField(blank=True, default="", editable=False)
+    # Messages up to this sequence are folded into context_summary
+    context_summary_sequence = models.PositiveIntegerField(default=0, editable=False)
+    # Set by DELETE; the rows are removed afterwards in chunks
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ConversationManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["-updated_at", "id"]
+        base_manager_name = "all_objects"
+        indexes = [
+            # Matches ordering; serves keyset pagination of the conversation list
+            models.Index(fields=["-updated_at", "id"], name="chat_conv_updated_id_idx"),
+            models.Index(fields=["-feedback_count", "-last_feedback_at"], name="chat_conv_feedback_rank_idx"),
+            # Only the few rows awaiting purge
+            models.Index(fields=["deleted_at"], condition=Q(deleted_at__isnull=False), name="chat_conv_deleted_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return self.title or f"Conversation {self.pk}"
 
+    @classmethod
+    def allocate_sequence(cls, conversation_id: int, last_message: Message, count: int = 1) -> int:
+        """
+        Atomically reserve the next `count` message sequences for messages being
+        inserted, bump updated_at and message_count, and record `last_message`
+        (the last of them) as the preview; returns the last reserved sequence.
+        Must run inside the transaction that inserts the messages, so a failed
+        insert rolls the counters back and leaves no gap.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        preview = last_message.text[:MESSAGE_PREVIEW_LENGTH]
+        with connection.cursor() as cursor:
+            if _update_returning_supported():
+                # Single statement: increment, touch and read back the counter
+                cursor.execute(
+                    f"UPDATE {table} SET last_sequence = last_sequence + %s, updated_at = %s, "
+                    f"message_count = message_count + %s, last_message_preview = %s, last_message_role = %s "
+                    f"WHERE id = %s RETURNING last_sequence",
+                    [count, now, count, preview, last_message.role, conversation_id],
+                )
+                row = cursor.fetchone()
+            else:
+                # The UPDATE row lock makes the follow-up read consistent
+                cls.objects.filter(pk=conversation_id).update(
+                    last_sequence=F("last_sequence") + count,
+                    updated_at=timezone.now(),
+                    message_count=F("message_count") + count,
+                    last_message_preview=preview,
+                    last_message_role=last_message.role,
+                )
+                cursor.execute(f"SELECT last_sequence FROM {table} WHERE id = %s", [conversation_id])
+                row = cursor.fetchone()
+        if row is None:
+            raise cls.DoesNotExist(f"Conversation {conversation_id} does not exist.")
+        return row[0]
+
+    @classmethod
+    def messages_deleted(cls, deleted_per_conversation: dict) -> None:
+        """
+        Update the read model after messages were deleted: {conversation_id: count}.
+        The preview is re-read from the newest remaining message, one indexed
+        lookup per conversation.
+        """
+        newest = Message.objects.filter(conversation=OuterRef("pk")).order_by("-sequence")
+        for conversation_id, deleted in deleted_per_conversation.items():
+            cls.objects.filter(pk=conversation_id).update(
+                message_count=Greatest(F("message_count") - deleted, Value(0)),
+                last_message_preview=Coalesce(
+                    Subquery(newest.values(preview=Substr("text", 1, MESSAGE_PREVIEW_LENGTH))[:1]), Value("")
+                ),
+                last_message_role=Coalesce(Subquery(newest.values("role")[:1]), Value("")),
+            )
+
+    @classmethod
+    def feedback_deleted(cls, deleted_per_conversation: dict) -> None:
+        """
+        Update the feedback counters after feedback was deleted, directly or by
+        cascade from its message: {conversation_id: (count, helpful_count)}.
+        """
+        for conversation_id, (deleted, helpful) in deleted_per_conversation.items():
+            cls.objects.filter(pk=conversation_id).update(
+                feedback_count=F("feedback_count") - deleted,
+                helpful_feedback_count=F("helpful_feedback_count") - helpful,
+                feedback_revision=F("feedback_revision") + 1,
+            )
+        if deleted_per_conversation:
+            _invalidate_feedback_summary()
+
+
+def _feedback_per_conversation(feedback: models.QuerySet) -> dict:
+    rows = (
+        feedback.order_by()
+        .values("conversation_id")
+        .annotate(n=Count("id"), helpful=Count("id", filter=Q(is_helpful=True)))
+        .values_list("conversation_id", "n", "helpful")
+    )
+    return {conversation_id: (n, helpful) for conversation_id, n, helpful in rows}
+
+
+class MessageQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete, then bring the affected conversations' read model and feedback counters up to date."""
+        with transaction.atomic():
+            deleted_per_conversation = dict(
+                self.order_by().values("conversation_id").annotate(n=Count("id")).values_list("conversation_id", "n")
+            )
+            # Their feedback goes with them by cascade, bypassing MessageFeedback.delete
+            feedback_per_conversation = _feedback_per_conversation(
+                MessageFeedback.objects.filter(message__in=self.order_by().values("pk"))
+            )
+            result = super().delete()
+            Conversation.messages_deleted(deleted_per_conversation)
+            Conversation.feedback_deleted(feedback_per_conversation)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Message(models.Model):
     ROLE_USER = "user"
@@ -27,9 +177,12 @@ class Message(models.Model):
     conversation = models.ForeignKey(Conversation, related_name="messages", on_delete=models.CASCADE)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add, so imported transcripts can keep their original timestamps
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     sequence = models.PositiveIntegerField()
 
+    objects = MessageQuerySet.as_manager()
+
     class Meta:
         ordering = ["sequence", "id"]
         unique_together = ("conversation", "sequence")
@@ -38,21 +191,40 @@ class Message(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         if self.sequence is None:
-            # Ensure sequence increments per conversation
+            # Allocating the sequence also bumps conversation updated_at
             with transaction.atomic():
-                last = (
-                    Message.objects.select_for_update()
-                    .filter(conversation=self.conversation)
-                    .order_by("-sequence")
-                    .first()
-                )
-                self.sequence = 1 if last is None else last.sequence + 1
+                self.sequence = Conversation.allocate_sequence(self.conversation_id, last_message=self)
                 super().save(*args, **kwargs)
         else:
             super().save(*args, **kwargs)
-        # Bump conversation updated_at
-        Conversation.objects.filter(pk=self.conversation_id).update(updated_at=timezone.now())
+            # Bump conversation updated_at, keeping the counter ahead of explicit sequences
+            updates = {"updated_at": timezone.now(), "last_sequence": Greatest(F("last_sequence"), self.sequence)}
+            if adding:
+                # The preview follows the newest message, which may not be this one
+                newest = When(last_sequence__lte=self.sequence, then=Value(self.text[:MESSAGE_PREVIEW_LENGTH]))
+                updates.update(
+                    message_count=F("message_count") + 1,
+                    last_message_preview=Case(newest, default=F("last_message_preview")),
+                    last_message_role=Case(
+                        When(last_sequence__lte=self.sequence, then=Value(self.role)), default=F("last_message_role")
+                    ),
+                )
+            Conversation.objects.filter(pk=self.conversation_id).update(**updates)
+        if adding:
+            # A new message cannot have feedback yet; spare serializers the reverse lookup
+            Message.feedback.related.set_cached_value(self, None)
+        # Wake live subscribers once the row is visible to their queries
+        transaction.on_commit(partial(conversation_events.publish, self.conversation_id))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            feedback_per_conversation = _feedback_per_conversation(MessageFeedback.objects.filter(message_id=self.pk))
+            result = super().delete(*args, **kwargs)
+            Conversation.messages_deleted({self.conversation_id: 1})
+            Conversation.feedback_deleted(feedback_per_conversation)
+        return result
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.conversation_id}#{self.sequence}:{self.role}"
@@ -75,14 +247,101 @@ class MessageFeedback(models.Model):
         indexes = [
             models.Index(fields=["conversation", "created_at"]),
             models.Index(fields=["conversation", "is_helpful"]),
+            models.Index(fields=["-created_at"], name="chat_mfb_created_idx"),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored vote so save() can adjust counters by the delta
+        instance._stored_is_helpful = instance.__dict__.get("is_helpful")
+        return instance
+
     def save(self, *args, **kwargs):
         if self.message.role != Message.ROLE_AI:
             raise ValueError("Feedback can only be attached to AI messages.")
         self.conversation = self.message.conversation
-        super().save(*args, **kwargs)
+        previous = getattr(self, "_stored_is_helpful", None) if self.pk is not None else None
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous is None:
+                Conversation.objects.filter(pk=self.conversation_id).update(
+                    feedback_count=F("feedback_count") + 1,
+                    helpful_feedback_count=F("helpful_feedback_count") + int(self.is_helpful),
+                    last_feedback_at=Greatest(Coalesce(F("last_feedback_at"), Value(self.created_at)), Value(self.created_at)),
+                    feedback_revision=F("feedback_revision") + 1,
+                )
+            else:
+                Conversation.objects.filter(pk=self.conversation_id).update(
+                    helpful_feedback_count=F("helpful_feedback_count") + (self.is_helpful - previous),
+                    feedback_revision=F("feedback_revision") + 1,
+                )
+            self._stored_is_helpful = self.is_helpful
+            _invalidate_feedback_summary()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Conversation.feedback_deleted({self.conversation_id: (1, int(self.is_helpful))})
+        return result
 
     def __str__(self) -> str:  # pragma: no cover
         status = "helpful" if self.is_helpful else "not helpful"
         return f"Feedback on message {self.message_id} ({status})"
+
+
+def _invalidate_feedback_summary() -> None:
+    from .services.insights import invalidate_feedback_summary
+
+    # Now for this process, and again once committed so no reader caches
+    # a summary computed before the write became visible.
+    invalidate_feedback_summary()
+    transaction.on_commit(invalidate_feedback_summary)
+
+
+class ReplyJob(models.Model):
+    """A queued AI reply to a user message, processed by services/jobs.py workers."""
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    conversation = models.ForeignKey(Conversation, related_name="reply_jobs", on_delete=models.CASCADE)
+    message = models.OneToOneField(Message, related_name="reply_job", on_delete=models.CASCADE)
+    reply = models.ForeignKey(Message, null=True, blank=True, related_name="+", on_delete=models.SET_NULL)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Not claimable before this time (retry backoff)
+    available_at = models.DateTimeField(default=timezone.now)
+    # When a worker took the job; running jobs past their lease can be reclaimed
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["available_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="chat_job_claim_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"ReplyJob {self.pk} for message {self.message_id} ({self.status})"
+
+
+class ThrottleCounter(models.Model):
+    """Rate-limit window counter, used by throttles when the cache is the database backend."""
+
+    key = models.CharField(max_length=250, unique=True)
+    count = models.IntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.key}={self.count}"
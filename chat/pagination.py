@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+from .models import Conversation
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("Cursor is not an object.")
+    return data
+
+
+def encode_cursor(updated_at: datetime, pk: int) -> str:
+    return _encode({"u": updated_at.isoformat(), "i": pk})
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        data = _decode(token)
+        updated_at = parse_datetime(data["u"])
+        pk = int(data["i"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor.")
+    if updated_at is None:
+        raise InvalidCursor("Invalid cursor.")
+    return updated_at, pk
+
+
+def encode_rank_cursor(rank: float, pk: int) -> str:
+    # JSON floats round-trip exactly, so the next page resumes right after (rank, pk)
+    return _encode({"r": rank, "i": pk})
+
+
+def decode_rank_cursor(token: str) -> Tuple[float, int]:
+    try:
+        data = _decode(token)
+        rank = float(data["r"])
+        pk = int(data["i"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor.")
+    return rank, pk
+
+
+def conversation_page(
+    qs: QuerySet[Conversation], cursor: Optional[str], limit: int, fields: Tuple[str, ...]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset page over Conversation.Meta.ordering (-updated_at, id), served by the
+    matching composite index. Returns (.values(*fields) rows, next_cursor);
+    next_cursor is None on the last page. Rows touched while a client pages are
+    not skipped or repeated: they move ahead of the cursor.
+    """
+    fields = tuple(dict.fromkeys((*fields, "id", "updated_at")))
+    qs = qs.order_by("-updated_at", "id")
+    if cursor:
+        updated_at, pk = decode_cursor(cursor)
+        # The leading range bound lets the index seek straight to the cursor
+        qs = qs.filter(Q(updated_at__lte=updated_at), Q(updated_at__lt=updated_at) | Q(id__gt=pk))
+    rows = list(qs.values(*fields)[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["updated_at"], rows[-1]["id"])
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from rest_framework.parsers import BaseParser
+
+from .services.transcripts import iter_ndjson
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON lazily: request.data is an iterator of
+    decoded objects, so large uploads are never held in memory at once.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return iter_ndjson(stream)
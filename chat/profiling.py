@@ -0,0 +1,67 @@
+"""
+Opt-in sampling profiler for slow requests (CHAT_PROFILE_SLOW_MS > 0).
+
+While a request runs, a sampler thread records the handling thread's Python
+stack every CHAT_PROFILE_INTERVAL_MS. If the request turns out slower than the
+threshold, the samples are written to CHAT_PROFILE_DIR in the "folded" format
+(one `frame;frame;frame count` line per distinct stack), which flamegraph.pl,
+speedscope and inferno read directly. Fast requests are discarded.
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval_s: float) -> None:
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="chat-profiler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def start(interval_ms: float) -> StackSampler:
+    return StackSampler(threading.get_ident(), interval_ms / 1000).start()
+
+
+def dump(sampler: StackSampler, directory: str, endpoint: str, elapsed_s: float) -> Optional[str]:
+    """Write the folded stacks to `directory`; returns the path, or None if nothing was sampled."""
+    if not sampler.samples:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    safe_endpoint = re.sub(r"[^A-Za-z0-9_.-]+", "_", endpoint)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_endpoint}-{int(elapsed_s * 1000)}ms"
+    path = os.path.join(directory, f"{name}-{os.getpid()}-{sampler.thread_id}.folded")
+    with open(path, "w") as fp:
+        fp.write(sampler.folded())
+    return path
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Lets clients asking for a streamed media type through content negotiation.
+    Streaming views return the stream themselves; this only renders error
+    payloads (404, 429, ...) as a single JSON document.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, cls=JSONEncoder).encode(self.charset)
+
+
+class EventStreamRenderer(StreamingRenderer):
+    """`Accept: text/event-stream` (EventSource) for the live message events."""
+
+    media_type = "text/event-stream"
+    format = "sse"
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer for the high-volume read endpoints. Their payloads are
+    pre-built from plain dicts/strings, so they can skip DRF's encoder class and
+    go through orjson when it is installed. Output is byte-identical to
+    JSONRenderer's compact form; pretty-printing requests fall back to it.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            if orjson is not None and not self.ensure_ascii:
+                ret = orjson.dumps(data)
+                # Same JavaScript-safe escaping as JSONRenderer
+                return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+            ret = json.dumps(
+                data, ensure_ascii=self.ensure_ascii, allow_nan=not self.strict, separators=(",", ":")
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
@@ -1,12 +1,23 @@
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Conversation, Message, MessageFeedback
+from . import metrics
+from .models import Conversation, Message, MessageFeedback, ReplyJob
 
 
 class ConversationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Conversation
-        fields = ["id", "title", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "title",
+            "created_at",
+            "updated_at",
+            "message_count",
+            "last_sequence",
+            "last_message_preview",
+            "last_message_role",
+        ]
 
 
 class MessageFeedbackSerializer(serializers.ModelSerializer):
@@ -28,6 +39,13 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "sequence", "conversation", "role", "feedback"]
 
 
+class ReplyJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReplyJob
+        fields = ["id", "conversation", "message", "reply", "status", "attempts", "error", "created_at", "finished_at"]
+        read_only_fields = fields
+
+
 class CreateMessageSerializer(serializers.Serializer):
     text = serializers.CharField(max_length=1000, allow_blank=False, trim_whitespace=True)
 
@@ -49,3 +67,102 @@ class CreateFeedbackSerializer(serializers.Serializer):
 
     def validate_comment(self, value: str) -> str:
         return value.strip()
+
+
+# Fast paths for the high-volume list endpoints. They read .values() rows and
+# build exactly what ConversationSerializer / MessageSerializer would return,
+# without per-row serializer and field instances.
+
+def _datetime_repr(value):
+    # Mirrors DRF's DateTimeField.to_representation for ISO 8601 output
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+CONVERSATION_VALUES = (
+    "id",
+    "title",
+    "created_at",
+    "updated_at",
+    "message_count",
+    "last_sequence",
+    "last_message_preview",
+    "last_message_role",
+)
+
+MESSAGE_VALUES = (
+    "id",
+    "conversation_id",
+    "role",
+    "text",
+    "created_at",
+    "sequence",
+    "feedback__id",
+    "feedback__is_helpful",
+    "feedback__comment",
+    "feedback__created_at",
+)
+
+
+def serialize_conversation_rows(rows) -> list:
+    """Same output as ConversationSerializer(many=True), from .values(*CONVERSATION_VALUES) rows."""
+    rows = list(rows)
+    with metrics.serialization():
+        return [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "created_at": _datetime_repr(row["created_at"]),
+                "updated_at": _datetime_repr(row["updated_at"]),
+                "message_count": row["message_count"],
+                "last_sequence": row["last_sequence"],
+                "last_message_preview": row["last_message_preview"],
+                "last_message_role": row["last_message_role"],
+            }
+            for row in rows
+        ]
+
+
+def serialize_message_rows(queryset) -> list:
+    """Same output as MessageSerializer(many=True), from one joined values query."""
+    rows = queryset.values_list(*MESSAGE_VALUES)
+    # Fetch first, so the query is not counted as serializer time
+    len(rows)
+    results = []
+    with metrics.serialization():
+        for (
+            pk,
+            conversation_id,
+            role,
+            text,
+            created_at,
+            sequence,
+            feedback_id,
+            feedback_is_helpful,
+            feedback_comment,
+            feedback_created_at,
+        ) in rows:
+            feedback = None
+            if feedback_id is not None:
+                feedback = {
+                    "id": feedback_id,
+                    "conversation": conversation_id,
+                    "message": pk,
+                    "is_helpful": feedback_is_helpful,
+                    "comment": feedback_comment,
+                    "created_at": _datetime_repr(feedback_created_at),
+                }
+            results.append({
+                "id": pk,
+                "conversation": conversation_id,
+                "role": role,
+                "text": text,
+                "created_at": _datetime_repr(created_at),
+                "sequence": sequence,
+                "feedback": feedback,
+            })
+    return results
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.functions import Substr
+
+from ..models import Conversation, Message
+from . import gemini
+
+
+# Rough token estimate; close enough for budgeting English text without a tokenizer
+CHARS_PER_TOKEN = 4
+# Upper bound on recent messages considered for the context window
+MAX_RECENT_TURNS = 50
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[: max_chars - 1].rstrip() + "…"
+
+
+def _recent_turns(conversation_id: int, after: int, before: int, limit: int) -> List[Dict]:
+    """Newest-first messages in (after, before), texts cut at the per-turn limit in SQL."""
+    max_chars = settings.CHAT_CONTEXT_MAX_TURN_TOKENS * CHARS_PER_TOKEN
+    rows = (
+        Message.objects.filter(conversation_id=conversation_id, sequence__gt=after, sequence__lt=before)
+        .order_by("-sequence")
+        .annotate(head=Substr("text", 1, max_chars + 1))
+        .values("sequence", "role", "head")[:limit]
+    )
+    return [
+        {
+            "sequence": row["sequence"],
+            "role": row["role"],
+            "text": _clip(row["head"], settings.CHAT_CONTEXT_MAX_TURN_TOKENS),
+        }
+        for row in rows
+    ]
+
+
+def _refresh_summary(conversation: Conversation, upto: int) -> None:
+    """
+    Fold the messages between the stored summary and `upto` (inclusive) into
+    the summary. Only the newest turns that fit one context budget are read,
+    so a long backlog (e.g. an imported transcript) costs a single bounded
+    call. Concurrent refreshes race on context_summary_sequence; the loser's
+    result is not stored.
+    """
+    start = conversation.context_summary_sequence
+    turns = _recent_turns(conversation.pk, start, upto + 1, MAX_RECENT_TURNS)
+    budget = settings.CHAT_CONTEXT_TOKEN_BUDGET
+    fold = []
+    for turn in turns:
+        budget -= estimate_tokens(turn["text"])
+        if budget < 0 and fold:
+            break
+        fold.append({"role": turn["role"], "text": turn["text"]})
+    fold.reverse()
+    try:
+        summary = gemini.summarize_conversation(
+            conversation.context_summary,
+            fold,
+            # Words run a little over one token each
+            max_words=settings.CHAT_CONTEXT_SUMMARY_TOKENS * 3 // 4,
+        )
+    except gemini.GeminiServiceError:
+        # Keep the previous summary; the next reply retries
+        return
+    summary = _clip(summary, settings.CHAT_CONTEXT_SUMMARY_TOKENS)
+    Conversation.objects.filter(pk=conversation.pk, context_summary_sequence=start).update(
+        context_summary=summary, context_summary_sequence=upto
+    )
+    conversation.context_summary = summary
+    conversation.context_summary_sequence = upto
+
+
+def _select_turns(conversation: Conversation, budget: int, before_sequence: int) -> List[Dict]:
+    """Newest-first unsummarized turns before `before_sequence` that fit `budget` next to the summary."""
+    remaining = budget - estimate_tokens(conversation.context_summary)
+    turns = []
+    after = conversation.context_summary_sequence
+    for turn in _recent_turns(conversation.pk, after, before_sequence, MAX_RECENT_TURNS):
+        remaining -= estimate_tokens(turn["text"])
+        if remaining < 0:
+            break
+        turns.append(turn)
+    return turns
+
+
+def build_history(conversation: Conversation, prompt: str, before_sequence: int) -> List[Dict[str, str]]:
+    """
+    History for gemini.generate_reply: the stored conversation summary (if any)
+    plus as many of the most recent messages before `before_sequence` as fit in
+    CHAT_CONTEXT_TOKEN_BUDGET alongside the prompt. Long messages are clipped
+    to CHAT_CONTEXT_MAX_TURN_TOKENS. Never calls Gemini: the summary is brought
+    up to date after replies, see schedule_summary_refresh.
+    """
+    budget = settings.CHAT_CONTEXT_TOKEN_BUDGET - estimate_tokens(prompt)
+    turns = _select_turns(conversation, budget, before_sequence)
+    history = [{"role": turn["role"], "text": turn["text"]} for turn in reversed(turns)]
+    if conversation.context_summary:
+        history.insert(0, {"role": gemini.SUMMARY_ROLE, "text": conversation.context_summary})
+    return history
+
+
+def refresh_summary_if_due(conversation_id: int) -> bool:
+    """
+    Once CHAT_CONTEXT_SUMMARY_BATCH messages have fallen out of the next
+    reply's window unsummarized, fold them into the stored summary. Returns
+    whether a refresh was attempted.
+    """
+    conversation = Conversation.objects.filter(pk=conversation_id).first()
+    if conversation is None:
+        return False
+    before_sequence = conversation.last_sequence + 1
+    turns = _select_turns(conversation, settings.CHAT_CONTEXT_TOKEN_BUDGET, before_sequence)
+    oldest_kept = turns[-1]["sequence"] if turns else before_sequence
+    if oldest_kept - 1 - conversation.context_summary_sequence < settings.CHAT_CONTEXT_SUMMARY_BATCH:
+        return False
+    _refresh_summary(conversation, oldest_kept - 1)
+    return True
+
+
+# One background thread keeps summary calls off the request path and serializes them
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary-refresh")
+_refresh_pending: set = set()
+_refresh_lock = threading.Lock()
+
+
+def _run_refresh(conversation_id: int) -> None:
+    with _refresh_lock:
+        _refresh_pending.discard(conversation_id)
+    close_old_connections()
+    try:
+        refresh_summary_if_due(conversation_id)
+    except Exception:
+        # The next reply schedules another attempt
+        pass
+    finally:
+        close_old_connections()
+
+
+def _submit_refresh(conversation_id: int) -> None:
+    with _refresh_lock:
+        if conversation_id in _refresh_pending:
+            return
+        _refresh_pending.add(conversation_id)
+    _refresh_executor.submit(_run_refresh, conversation_id)
+
+
+def schedule_summary_refresh(conversation_id: int) -> None:
+    """Call after storing a reply: refresh the summary in the background once the caller commits."""
+    transaction.on_commit(partial(_submit_refresh, conversation_id))
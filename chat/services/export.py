@@ -0,0 +1,180 @@
+"""
+Streaming transcript export for compliance and analytics.
+
+Messages are read with one query, joined with their conversation and feedback,
+through QuerySet.iterator(chunk_size=...), and encoded row by row as NDJSON or
+CSV, optionally gzipped. Nothing holds more than one chunk of rows plus one
+output block, so memory stays flat however large the export is. NDJSON records
+carry role, text and created_at, so a single-conversation export can be fed
+back to `import_transcript`.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import zlib
+from datetime import datetime, time, timezone as dt_timezone
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ..models import Message
+from ..serializers import _datetime_repr
+
+
+FORMATS = ("ndjson", "csv")
+# Rows fetched from the database cursor at a time
+DEFAULT_CHUNK_SIZE = 2000
+# Encoded rows are joined into blocks of about this many bytes before being written
+BLOCK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+
+EXPORT_COLUMNS = (
+    "conversation_id",
+    "conversation_title",
+    "message_id",
+    "sequence",
+    "role",
+    "text",
+    "created_at",
+    "feedback_is_helpful",
+    "feedback_comment",
+    "feedback_created_at",
+)
+_EXPORT_VALUES = (
+    "conversation_id",
+    "conversation__title",
+    "id",
+    "sequence",
+    "role",
+    "text",
+    "created_at",
+    "feedback__is_helpful",
+    "feedback__comment",
+    "feedback__created_at",
+)
+_DATETIME_COLUMNS = (EXPORT_COLUMNS.index("created_at"), EXPORT_COLUMNS.index("feedback_created_at"))
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_bound(value: Optional[str]) -> Optional[datetime]:
+    """An ISO 8601 date or datetime (naive means UTC); a date means its midnight."""
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day is not None else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ExportError(f"'{value}' is not an ISO 8601 date or datetime.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def export_queryset(
+    conversation_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None
+) -> QuerySet:
+    """
+    Messages of one conversation, or of every conversation created in
+    [since, until), in conversation and sequence order.
+    """
+    qs = Message.objects.filter(conversation__deleted_at__isnull=True)
+    if conversation_id is not None:
+        qs = qs.filter(conversation_id=conversation_id)
+    if since is not None:
+        qs = qs.filter(conversation__created_at__gte=since)
+    if until is not None:
+        qs = qs.filter(conversation__created_at__lt=until)
+    return qs.order_by("conversation_id", "sequence")
+
+
+def iter_rows(queryset: QuerySet, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Export rows in EXPORT_COLUMNS order, datetimes as ISO 8601 strings."""
+    for row in queryset.values_list(*_EXPORT_VALUES).iterator(chunk_size=chunk_size):
+        row = list(row)
+        for index in _DATETIME_COLUMNS:
+            row[index] = _datetime_repr(row[index])
+        yield row
+
+
+def ndjson_lines(rows: Iterable[tuple]) -> Iterator[bytes]:
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+class _Echo:
+    # csv.writer only needs write(); hand each formatted line straight back
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(rows: Iterable[tuple]) -> Iterator[bytes]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS).encode()
+    helpful = EXPORT_COLUMNS.index("feedback_is_helpful")
+    for row in rows:
+        if row[helpful] is not None:
+            row[helpful] = "true" if row[helpful] else "false"
+        yield writer.writerow(row).encode()
+
+
+def blocks(chunks: Iterable[bytes], size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Coalesce small chunks so each write or network send carries about `size` bytes."""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= size:
+            yield b"".join(pending)
+            pending, pending_size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+def gzipped(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(
+    queryset: QuerySet, fmt: str = "ndjson", compress: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """The encoded export of `queryset` (see export_queryset) as a stream of byte blocks."""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown export format '{fmt}'.")
+    encode = ndjson_lines if fmt == "ndjson" else csv_lines
+    stream = blocks(encode(iter_rows(queryset, chunk_size)))
+    return gzipped(stream) if compress else stream
+
+
+async def aiter_blocks(stream: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    stream_export() for ASGI responses. Django would drain a sync iterator into
+    a list before sending it; this pulls one block at a time on the request's
+    sync thread, where the database cursor lives.
+    """
+    done = object()
+    try:
+        while True:
+            block = await sync_to_async(next)(stream, done)
+            if block is done:
+                return
+            yield block
+    finally:
+        # Release the cursor if the client went away mid-export
+        await sync_to_async(stream.close)()
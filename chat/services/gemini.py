@@ -1,74 +1,681 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import inspect
 import json
 import os
-from typing import List, Dict, Any
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Awaitable, Callable, List, Dict, Any, Iterator, Optional, Tuple
+
+from django.conf import settings
+
+from .. import metrics
 
 
 class GeminiServiceError(RuntimeError):
     pass
 
 
+class GeminiUnavailableError(GeminiServiceError):
+    """Rejected locally, without calling Gemini: circuit open or concurrency limit reached."""
+
+
+class GeminiEmptyResponseError(GeminiServiceError):
+    """
+    Gemini answered, but with no usable text (empty, or blocked by its safety
+    filters). The prompt is at fault, not the upstream, so it is not retried
+    and does not count against the circuit breaker.
+    """
+
+
+def fallback_allowed() -> bool:
+    """Whether a failed reply may be answered with a "(Gemini unavailable)" placeholder instead of an error."""
+    return settings.DEBUG or getattr(settings, "GEMINI_ALLOW_FALLBACK", False)
+
+
 def _get_model_name() -> str:
     return os.environ.get("GEMINI_MODEL", "models/gemini-2.5-flash-lite")
 
 
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while the upstream is unhealthy.
+
+    closed: calls pass; `failure_threshold` consecutive failures open the circuit.
+    open: calls are rejected until `reset_timeout_s` has passed.
+    half_open: one probe call at a time is let through; success closes the
+    circuit, failure reopens it for another `reset_timeout_s`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened_total = 0
+        self.rejected_total = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout_s:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now; a True in half_open reserves the probe slot."""
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout_s:
+                self._state = self.HALF_OPEN
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected_total += 1
+            return False
+
+    def cancel(self) -> None:
+        """Give back a slot from allow() when the call never reached the upstream."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened_total += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened_total": self.opened_total,
+                "rejected_total": self.rejected_total,
+            }
+
+
+class AIMDLimiter:
+    """
+    Adaptive cap on in-flight upstream calls. Each fast success raises the
+    limit by 1/limit (about +1 per round of calls); a failure or a call slower
+    than `latency_threshold_s` halves it. Calls over the limit are rejected
+    immediately rather than queued, so callers never pile up behind a slow
+    upstream.
+    """
+
+    def __init__(
+        self,
+        initial: float = 8,
+        minimum: float = 1,
+        maximum: float = 64,
+        latency_threshold_s: float = 8.0,
+        backoff: float = 0.5,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_threshold_s = latency_threshold_s
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._limit = float(initial)
+        self._in_flight = 0
+        self.rejected_total = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                self.rejected_total += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, latency_s: float, ok: Optional[bool]) -> None:
+        """Free a slot; ok=None frees it without adjusting the limit."""
+        with self._lock:
+            self._in_flight -= 1
+            if ok is None:
+                return
+            if ok and latency_s <= self.latency_threshold_s:
+                self._limit = min(self.maximum, self._limit + 1 / self._limit)
+            else:
+                self._limit = max(self.minimum, self._limit * self.backoff)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "rejected_total": self.rejected_total,
+            }
+
+
+# Shared by every Gemini call in this process
+circuit_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get("GEMINI_BREAKER_FAILURES", "5")),
+    reset_timeout_s=_env_float("GEMINI_BREAKER_RESET_S", 30),
+)
+concurrency_limiter = AIMDLimiter(
+    initial=_env_float("GEMINI_LIMIT_INITIAL", 8),
+    minimum=_env_float("GEMINI_LIMIT_MIN", 1),
+    maximum=_env_float("GEMINI_LIMIT_MAX", 64),
+    latency_threshold_s=_env_float("GEMINI_LIMIT_LATENCY_S", 8),
+)
+
+
+def upstream_metrics() -> Dict[str, Any]:
+    """Circuit breaker and concurrency limiter state, for metrics endpoints."""
+    return {"circuit": circuit_breaker.snapshot(), "concurrency": concurrency_limiter.snapshot()}
+
+
+@contextmanager
+def _upstream_call():
+    """
+    Guard one call to Gemini: reject it up front if the circuit is open or the
+    in-flight limit is reached, and feed its outcome back to both.
+    """
+    if not circuit_breaker.allow():
+        raise GeminiUnavailableError("Gemini is unavailable (circuit open); try again shortly")
+    if not concurrency_limiter.acquire():
+        circuit_breaker.cancel()
+        raise GeminiUnavailableError("Gemini is overloaded (too many requests in flight)")
+    start = time.monotonic()
+    try:
+        yield
+    except GeminiEmptyResponseError:
+        # Gemini answered; the content was unusable
+        concurrency_limiter.release(time.monotonic() - start, ok=True)
+        circuit_breaker.record_success()
+        raise
+    except Exception:
+        concurrency_limiter.release(time.monotonic() - start, ok=False)
+        circuit_breaker.record_failure()
+        raise
+    except BaseException:
+        # Caller went away (stream closed early, task cancelled): says nothing about Gemini
+        concurrency_limiter.release(time.monotonic() - start, ok=None)
+        circuit_breaker.cancel()
+        raise
+    concurrency_limiter.release(time.monotonic() - start, ok=True)
+    circuit_breaker.record_success()
+
+
+# Process-wide model cache keyed by (api key, model name). GenerativeModel keeps
+# its transport (and so its open connections) after the first call, so reusing
+# the instance avoids re-running configure/model init and new TLS handshakes.
+# genai.configure() is global, so the cache only ever holds entries for the
+# most recently configured key.
+_clients: Dict[Tuple[str, str], Any] = {}
+_clients_lock = threading.Lock()
+_configured_api_key: Optional[str] = None
+
+
+def invalidate_client_cache() -> None:
+    """Drop cached Gemini models, e.g. after rotating GEMINI_API_KEY or GEMINI_MODEL."""
+    global _configured_api_key
+    with _clients_lock:
+        _clients.clear()
+        _configured_api_key = None
+
+
 def _get_client():
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise GeminiServiceError("Gemini API key is missing; set GEMINI_API_KEY in .env")
-    try:
-        import google.generativeai as genai
-    except Exception as e:  # pragma: no cover - import error path
-        raise GeminiServiceError(f"Gemini client not available: {e}")
-    genai.configure(api_key=api_key)
     model_name = _get_model_name()
-    try:
-        model = genai.GenerativeModel(model_name)
-    except Exception as e:
-        raise GeminiServiceError(f"Gemini model init failed: {e}")
+    key = (api_key, model_name)
+    model = _clients.get(key)
+    if model is not None:
+        return model
+
+    global _configured_api_key
+    with _clients_lock:
+        model = _clients.get(key)
+        if model is not None:
+            return model
+        try:
+            import google.generativeai as genai
+        except Exception as e:  # pragma: no cover - import error path
+            raise GeminiServiceError(f"Gemini client not available: {e}")
+        if api_key != _configured_api_key:
+            _clients.clear()
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+        try:
+            model = genai.GenerativeModel(model_name)
+        except Exception as e:
+            raise GeminiServiceError(f"Gemini model init failed: {e}")
+        _clients[key] = model
     return model
 
 
-def generate_reply(history: List[Dict[str, str]], prompt: str, timeout_s: int = 10) -> str:
+SUMMARY_ROLE = "summary"
+
+
+def _build_messages(history: List[Dict[str, str]], prompt: str) -> List[Dict[str, Any]]:
+    # Build messages in Gemini format
+    messages = []
+    for msg in history:
+        role = msg.get("role", "user")
+        content = msg.get("text", "")
+        if role == SUMMARY_ROLE:
+            # Rolling summary of turns that no longer fit the context window
+            messages.append({"role": "user", "parts": [f"Summary of the earlier conversation:\n{content}"]})
+            continue
+        # Gemini expects role: "user" or "model"
+        messages.append({
+            "role": "user" if role == "user" else "model",
+            "parts": [content],
+        })
+    # Append current prompt as user
+    messages.append({"role": "user", "parts": [prompt]})
+    return messages
+
+
+def _response_text(resp) -> str:
+    try:
+        return getattr(resp, "text", None) or ""
+    except ValueError:
+        # .text raises when the candidate has no parts, e.g. a safety block
+        return ""
+
+
+def _extract_text(resp) -> str:
+    text = _response_text(resp).strip()
+    if not text:
+        raise GeminiEmptyResponseError("Empty response from Gemini")
+    return text
+
+
+class LatencyTracker:
+    """Sliding window of recent successful reply latencies, for hedging decisions."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: deque = deque(maxlen=size)
+
+    def record(self, latency_s: float) -> None:
+        with self._lock:
+            self._samples.append(latency_s)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-quantile (0..1) of the window, or None until min_samples are in."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+reply_latency = LatencyTracker()
+# Runs hedged attempts; the slower of a pair keeps its thread until Gemini answers
+_hedge_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("GEMINI_HEDGE_WORKERS", "8")), thread_name_prefix="gemini-hedge"
+)
+HEDGE_QUANTILE = 0.95
+
+
+def _retry_settings(retries: Optional[int], hedge: Optional[bool]) -> Tuple[int, bool]:
+    if retries is None:
+        retries = int(os.environ.get("GEMINI_RETRIES", "2"))
+    if hedge is None:
+        hedge = os.environ.get("GEMINI_HEDGE", "0") == "1"
+    return retries, hedge
+
+
+def _backoff_s(retry: int) -> float:
+    # "Full jitter": uniform in [0, min(cap, base * 2^retry)]
+    base = _env_float("GEMINI_RETRY_BASE_S", 0.2)
+    cap = _env_float("GEMINI_RETRY_MAX_S", 2)
+    return random.uniform(0, min(cap, base * 2**retry))
+
+
+def _deadline_exceeded(last_error: Optional[BaseException]) -> GeminiServiceError:
+    detail = f": {last_error}" if last_error else ""
+    return GeminiServiceError(f"Gemini request deadline exceeded{detail}")
+
+
+def _call_with_retries(attempt: Callable[[float], str], timeout_s: float, retries: int) -> str:
+    """
+    Run attempt(remaining_s) until it succeeds, retrying failures after a
+    jittered backoff. All attempts and sleeps share one `timeout_s` deadline.
+    Local rejections (GeminiUnavailableError) are not retried: the breaker or
+    limiter already decided. Nor are empty or blocked responses, which would
+    come back the same.
+    """
+    deadline = time.monotonic() + timeout_s
+    for retry in range(retries + 1):
+        try:
+            return attempt(deadline - time.monotonic())
+        except (GeminiUnavailableError, GeminiEmptyResponseError):
+            raise
+        except Exception as e:
+            if retry == retries:
+                raise
+            delay = _backoff_s(retry)
+            if time.monotonic() + delay >= deadline:
+                raise _deadline_exceeded(e)
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def _call_with_retries_async(
+    attempt: Callable[[float], Awaitable[str]], timeout_s: float, retries: int
+) -> str:
+    deadline = time.monotonic() + timeout_s
+    for retry in range(retries + 1):
+        try:
+            return await attempt(deadline - time.monotonic())
+        except (GeminiUnavailableError, GeminiEmptyResponseError):
+            raise
+        except Exception as e:
+            if retry == retries:
+                raise
+            delay = _backoff_s(retry)
+            if time.monotonic() + delay >= deadline:
+                raise _deadline_exceeded(e)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def _hedged(attempt: Callable[[float], str]) -> Callable[[float], str]:
+    """
+    Wrap attempt so that, once the p95 reply latency is known, a second
+    identical request is sent if the first has not answered by then; the
+    first success wins.
+    """
+
+    def run(timeout_s: float) -> str:
+        delay = reply_latency.percentile(HEDGE_QUANTILE)
+        if delay is None or delay >= timeout_s:
+            return attempt(timeout_s)
+        deadline = time.monotonic() + timeout_s
+        pending = {_hedge_pool.submit(attempt, timeout_s)}
+        done, pending = wait(pending, timeout=delay)
+        if not done:
+            pending.add(_hedge_pool.submit(attempt, deadline - time.monotonic()))
+        error: Optional[BaseException] = None
+        while done or pending:
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                break
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                raise _deadline_exceeded(error)
+        raise error
+
+    return run
+
+
+def _hedged_async(attempt: Callable[[float], Awaitable[str]]) -> Callable[[float], Awaitable[str]]:
+    async def run(timeout_s: float) -> str:
+        delay = reply_latency.percentile(HEDGE_QUANTILE)
+        if delay is None or delay >= timeout_s:
+            return await attempt(timeout_s)
+        deadline = time.monotonic() + timeout_s
+        pending = {asyncio.ensure_future(attempt(timeout_s))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                pending.add(asyncio.ensure_future(attempt(deadline - time.monotonic())))
+            error: Optional[BaseException] = None
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise _deadline_exceeded(error)
+            raise error
+        finally:
+            # The loser is cancelled, which frees its limiter slot
+            for task in pending:
+                task.cancel()
+
+    return run
+
+
+def _observed(function: str):
+    """
+    Record each call's latency and outcome in metrics.gemini_seconds under
+    `function`. Generators are timed from the first chunk requested until the
+    stream ends or fails; a stream the caller abandons is not recorded.
+    """
+
+    def decorate(fn):
+        if inspect.isgeneratorfunction(fn):
+
+            @functools.wraps(fn)
+            def run_stream(*args, **kwargs):
+                start = time.monotonic()
+                try:
+                    yield from fn(*args, **kwargs)
+                except GeminiServiceError as e:
+                    metrics.observe_gemini(function, time.monotonic() - start, e)
+                    raise
+                metrics.observe_gemini(function, time.monotonic() - start, None)
+
+            return run_stream
+
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def run_async(*args, **kwargs):
+                start = time.monotonic()
+                try:
+                    result = await fn(*args, **kwargs)
+                except GeminiServiceError as e:
+                    metrics.observe_gemini(function, time.monotonic() - start, e)
+                    raise
+                metrics.observe_gemini(function, time.monotonic() - start, None)
+                return result
+
+            return run_async
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except GeminiServiceError as e:
+                metrics.observe_gemini(function, time.monotonic() - start, e)
+                raise
+            metrics.observe_gemini(function, time.monotonic() - start, None)
+            return result
+
+        return run
+
+    return decorate
+
+
+@_observed("generate_reply")
+def generate_reply(
+    history: List[Dict[str, str]],
+    prompt: str,
+    timeout_s: int = 10,
+    retries: Optional[int] = None,
+    hedge: Optional[bool] = None,
+) -> str:
     """
     Minimal wrapper around google-generativeai.
     - history: list of {"role": "user"|"ai", "text": "..."}
     - prompt: the latest user input
+    - timeout_s: overall deadline, shared by retries and hedged requests
+    - retries / hedge: default to GEMINI_RETRIES (2) and GEMINI_HEDGE (off)
     Returns plain text reply or raises GeminiServiceError on failure.
     """
+    retries, hedge = _retry_settings(retries, hedge)
     try:
         model = _get_client()
-        # Build messages in Gemini format
-        messages = []
-        for msg in history:
-            role = msg.get("role", "user")
-            content = msg.get("text", "")
-            # Gemini expects role: "user" or "model"
-            messages.append({
-                "role": "user" if role == "user" else "model",
-                "parts": [content],
-            })
-        # Append current prompt as user
-        messages.append({"role": "user", "parts": [prompt]})
-
-        # Synchronous call
-        resp = model.generate_content(messages, request_options={"timeout": timeout_s})
-        text = getattr(resp, "text", None) or ""
-        text = text.strip()
-        if not text:
-            raise GeminiServiceError("Empty response from Gemini")
-        return text
+        messages = _build_messages(history, prompt)
+
+        def attempt(remaining_s: float) -> str:
+            if remaining_s <= 0:
+                raise _deadline_exceeded(None)
+            start = time.monotonic()
+            # Synchronous call
+            with _upstream_call():
+                resp = model.generate_content(messages, request_options={"timeout": remaining_s})
+                text = _extract_text(resp)
+            reply_latency.record(time.monotonic() - start)
+            return text
+
+        return _call_with_retries(_hedged(attempt) if hedge else attempt, timeout_s, retries)
+    except GeminiServiceError:
+        raise
     except Exception as e:
         raise GeminiServiceError(f"Gemini request failed: {e}")
 
 
-def generate_actionable_insights(summary: Dict[str, Any], timeout_s: int = 15) -> str:
+@_observed("generate_reply")
+async def generate_reply_async(
+    history: List[Dict[str, str]],
+    prompt: str,
+    timeout_s: int = 10,
+    retries: Optional[int] = None,
+    hedge: Optional[bool] = None,
+) -> str:
     """
-    Generate actionable insights based on aggregated feedback summary data.
+    Non-blocking counterpart of generate_reply for async views; awaits
+    generate_content_async so the event loop can serve other requests meanwhile.
+    """
+    retries, hedge = _retry_settings(retries, hedge)
+    try:
+        model = _get_client()
+        messages = _build_messages(history, prompt)
+
+        async def attempt(remaining_s: float) -> str:
+            if remaining_s <= 0:
+                raise _deadline_exceeded(None)
+            start = time.monotonic()
+            with _upstream_call():
+                resp = await model.generate_content_async(messages, request_options={"timeout": remaining_s})
+                text = _extract_text(resp)
+            reply_latency.record(time.monotonic() - start)
+            return text
+
+        return await _call_with_retries_async(_hedged_async(attempt) if hedge else attempt, timeout_s, retries)
+    except GeminiServiceError:
+        raise
+    except Exception as e:
+        raise GeminiServiceError(f"Gemini request failed: {e}")
+
+
+@_observed("stream_reply")
+def stream_reply(history: List[Dict[str, str]], prompt: str, timeout_s: int = 10) -> Iterator[str]:
+    """
+    Streaming variant of generate_reply.
+    Yields text chunks as Gemini produces them; raises GeminiServiceError on failure
+    (possibly after some chunks were already yielded) or if nothing was produced.
     """
+    try:
+        model = _get_client()
+        messages = _build_messages(history, prompt)
+        produced = False
+        # Held until the stream is exhausted, so slow streams count against the limit
+        with _upstream_call():
+            resp = model.generate_content(messages, stream=True, request_options={"timeout": timeout_s})
+            for chunk in resp:
+                text = _response_text(chunk)
+                if text:
+                    produced = True
+                    yield text
+            if not produced:
+                raise GeminiEmptyResponseError("Empty response from Gemini")
+    except GeminiServiceError:
+        raise
+    except Exception as e:
+        raise GeminiServiceError(f"Gemini request failed: {e}")
+
+
+def _summary_prompt(previous: str, messages: List[Dict[str, str]], max_words: int) -> str:
+    transcript = "\n".join(
+        f"{'User' if msg.get('role') == 'user' else 'Assistant'}: {msg.get('text', '')}" for msg in messages
+    )
+    return (
+        "You maintain a running summary of a chat between a user and an AI assistant.\n"
+        "Update the summary with the new messages below. Keep facts, decisions, open "
+        "questions and user preferences; drop small talk.\n\n"
+        f"Current summary:\n{previous or '(none)'}\n\n"
+        f"New messages:\n{transcript}\n\n"
+        f"Respond with the updated summary only, in at most {max_words} words."
+    )
+
+
+@_observed("summarize_conversation")
+def summarize_conversation(
+    previous: str, messages: List[Dict[str, str]], max_words: int = 200, timeout_s: int = 10
+) -> str:
+    """
+    Fold messages (same shape as generate_reply's history) into an existing
+    conversation summary and return the updated summary.
+    """
+    prompt = _summary_prompt(previous, messages, max_words)
+
+    try:
+        model = _get_client()
+        with _upstream_call():
+            resp = model.generate_content(
+                [{"role": "user", "parts": [prompt]}],
+                request_options={"timeout": timeout_s},
+            )
+            return _extract_text(resp)
+    except GeminiServiceError:
+        raise
+    except Exception as e:
+        raise GeminiServiceError(f"Gemini request failed: {e}")
+
+
+def _actionable_insights_prompt(summary: Dict[str, Any]) -> str:
     summary_json = json.dumps(summary, default=str, indent=2)
-    prompt = (
+    return (
         "You are a product operations analyst reviewing user feedback for an AI assistant.\n"
         "Using the structured data below, produce three concise, actionable recommendations "
         "for improving the assistant. Focus on clear next steps grounded in the data trends.\n\n"
@@ -76,17 +683,43 @@ def generate_actionable_insights(summary: Dict[str, Any], timeout_s: int = 15) -
         "Respond with a markdown bullet list (max 4 bullets). Start each bullet with a strong verb."
     )
 
+
+@_observed("generate_actionable_insights")
+def generate_actionable_insights(summary: Dict[str, Any], timeout_s: int = 15) -> str:
+    """
+    Generate actionable insights based on aggregated feedback summary data.
+    """
+    prompt = _actionable_insights_prompt(summary)
+
+    try:
+        model = _get_client()
+        with _upstream_call():
+            resp = model.generate_content(
+                [{"role": "user", "parts": [prompt]}],
+                request_options={"timeout": timeout_s},
+            )
+            return _extract_text(resp)
+    except GeminiServiceError:
+        raise
+    except Exception as e:
+        raise GeminiServiceError(f"Gemini request failed: {e}")
+
+
+@_observed("generate_actionable_insights")
+async def generate_actionable_insights_async(summary: Dict[str, Any], timeout_s: int = 15) -> str:
+    """
+    Async counterpart of generate_actionable_insights.
+    """
+    prompt = _actionable_insights_prompt(summary)
+
     try:
         model = _get_client()
-        resp = model.generate_content(
-            [{"role": "user", "parts": [prompt]}],
-            request_options={"timeout": timeout_s},
-        )
-        text = getattr(resp, "text", None) or ""
-        text = text.strip()
-        if not text:
-            raise GeminiServiceError("Empty response from Gemini")
-        return text
+        with _upstream_call():
+            resp = await model.generate_content_async(
+                [{"role": "user", "parts": [prompt]}],
+                request_options={"timeout": timeout_s},
+            )
+            return _extract_text(resp)
     except GeminiServiceError:
         raise
     except Exception as e:
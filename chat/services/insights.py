@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from typing import Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import Substr
+
+from ..models import Conversation, MessageFeedback
+from . import gemini
+
+
+SUMMARY_CACHE_KEY = "insights:feedback-summary"
+ACTIONABLE_CACHE_KEY = "insights:actionable:{fingerprint}"
+# Extra time a follower waits beyond the leader's own Gemini timeout
+FOLLOWER_GRACE_S = 5
+
+
+def build_feedback_summary() -> dict:
+    """
+    Aggregate feedback from the per-conversation counters maintained by
+    MessageFeedback.save, so no query scans the feedback table.
+    """
+    totals = Conversation.objects.aggregate(
+        total=Sum("feedback_count"),
+        helpful=Sum("helpful_feedback_count"),
+    )
+    total = totals["total"] or 0
+    helpful = totals["helpful"] or 0
+    not_helpful = total - helpful
+    helpful_rate = helpful / total if total else 0.0
+
+    per_conversation_raw = (
+        Conversation.objects.filter(feedback_count__gt=0)
+        .order_by("-feedback_count", "-last_feedback_at")
+        .values("id", "title", "feedback_count", "helpful_feedback_count", "last_feedback_at")[:20]
+    )
+
+    per_conversation = [
+        {
+            "conversation_id": row["id"],
+            "title": row["title"],
+            "feedback_count": row["feedback_count"],
+            "helpful_count": row["helpful_feedback_count"],
+            "not_helpful_count": row["feedback_count"] - row["helpful_feedback_count"],
+            "helpful_rate": row["helpful_feedback_count"] / row["feedback_count"],
+            "last_feedback_at": row["last_feedback_at"],
+        }
+        for row in per_conversation_raw
+    ]
+
+    recent_feedback = list(
+        MessageFeedback.objects.filter(conversation__deleted_at__isnull=True)
+        .order_by("-created_at")
+        .annotate(title=F("conversation__title"), message_preview=Substr("message__text", 1, 200))
+        .values(
+            "id",
+            "conversation_id",
+            "message_id",
+            "title",
+            "is_helpful",
+            "comment",
+            "created_at",
+            "message_preview",
+        )[:10]
+    )
+
+    return {
+        "total_feedback": total,
+        "helpful_count": helpful,
+        "not_helpful_count": not_helpful,
+        "helpful_rate": helpful_rate,
+        "per_conversation": per_conversation,
+        "recent_feedback": recent_feedback,
+    }
+
+
+def get_feedback_summary() -> dict:
+    """
+    Cached rollup for the insights endpoints. Feedback writes invalidate it;
+    INSIGHTS_SUMMARY_TTL_S bounds staleness for caches not shared across processes.
+    """
+    summary = cache.get(SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = build_feedback_summary()
+        cache.set(SUMMARY_CACHE_KEY, summary, settings.INSIGHTS_SUMMARY_TTL_S)
+    return summary
+
+
+def invalidate_feedback_summary() -> None:
+    cache.delete(SUMMARY_CACHE_KEY)
+
+
+def summary_fingerprint(summary: dict) -> str:
+    """Stable hash of a feedback summary; equal data gives an equal fingerprint."""
+    payload = json.dumps(summary, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Generations currently running in this process, by summary fingerprint
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+# Async generations outliving a cancelled leader; referenced so they are not collected
+_detached: set[asyncio.Task] = set()
+
+
+class _LeaderGone(Exception):
+    """The leader stopped without an outcome (cancelled, interrupted); a follower takes over."""
+
+
+def _claim(fingerprint: str) -> Tuple[Future, bool]:
+    """Return the in-flight future for a fingerprint and whether the caller owns it."""
+    with _inflight_lock:
+        future = _inflight.get(fingerprint)
+        if future is not None:
+            return future, False
+        future = Future()
+        # A running future cannot be cancelled, so a follower that gives up
+        # (timeout, client disconnect) never cancels it for the others
+        future.set_running_or_notify_cancel()
+        _inflight[fingerprint] = future
+        return future, True
+
+
+def _finish(fingerprint: str, future: Future, result=None, error: BaseException | None = None) -> None:
+    """Unregister the leader's future, then publish its outcome to the waiters."""
+    # Unregistered first, so a follower woken by _LeaderGone claims a fresh future
+    with _inflight_lock:
+        _inflight.pop(fingerprint, None)
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _forget(task: asyncio.Task) -> None:
+    _detached.discard(task)
+    if not task.cancelled():
+        # Already published to the followers; mark it retrieved
+        task.exception()
+
+
+def _actionable_cache_key(fingerprint: str) -> str:
+    return ACTIONABLE_CACHE_KEY.format(fingerprint=fingerprint)
+
+
+def get_actionable_insights(summary: dict, timeout_s: int = 15) -> str:
+    """
+    Memoized gemini.generate_actionable_insights. Results are cached by summary
+    fingerprint; concurrent callers with the same fingerprint wait for the one
+    generation already running instead of starting their own. Failures are not
+    cached and are re-raised to every waiting caller; if the caller running the
+    generation is interrupted instead, a waiting caller starts it again.
+    """
+    fingerprint = summary_fingerprint(summary)
+    while True:
+        cached = cache.get(_actionable_cache_key(fingerprint))
+        if cached is not None:
+            return cached
+        future, leader = _claim(fingerprint)
+        if leader:
+            break
+        try:
+            return future.result(timeout=timeout_s + FOLLOWER_GRACE_S)
+        except FutureTimeoutError:
+            raise gemini.GeminiServiceError("Timed out waiting for insights generation")
+        except _LeaderGone:
+            continue
+
+    try:
+        text = gemini.generate_actionable_insights(summary, timeout_s=timeout_s)
+        cache.set(_actionable_cache_key(fingerprint), text, settings.ACTIONABLE_INSIGHTS_TTL_S)
+    except Exception as e:
+        _finish(fingerprint, future, error=e)
+        raise
+    except BaseException:
+        _finish(fingerprint, future, error=_LeaderGone())
+        raise
+    _finish(fingerprint, future, text)
+    return text
+
+
+async def _generate_async(fingerprint: str, future: Future, summary: dict, timeout_s: int) -> str:
+    try:
+        text = await gemini.generate_actionable_insights_async(summary, timeout_s=timeout_s)
+        await cache.aset(_actionable_cache_key(fingerprint), text, settings.ACTIONABLE_INSIGHTS_TTL_S)
+    except Exception as e:
+        _finish(fingerprint, future, error=e)
+        raise
+    except BaseException:
+        _finish(fingerprint, future, error=_LeaderGone())
+        raise
+    _finish(fingerprint, future, text)
+    return text
+
+
+async def get_actionable_insights_async(summary: dict, timeout_s: int = 15) -> str:
+    """
+    Async counterpart of get_actionable_insights; shares the same in-flight
+    registry, so sync and async callers coalesce onto one generation. The
+    generation runs in its own task, so it still finishes for the others
+    (and the cache) if the request that started it is cancelled.
+    """
+    fingerprint = summary_fingerprint(summary)
+    while True:
+        cached = await cache.aget(_actionable_cache_key(fingerprint))
+        if cached is not None:
+            return cached
+        future, leader = _claim(fingerprint)
+        if leader:
+            break
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout_s + FOLLOWER_GRACE_S)
+        except asyncio.TimeoutError:
+            raise gemini.GeminiServiceError("Timed out waiting for insights generation")
+        except _LeaderGone:
+            continue
+
+    task = asyncio.ensure_future(_generate_async(fingerprint, future, summary, timeout_s))
+    _detached.add(task)
+    task.add_done_callback(_forget)
+    return await asyncio.shield(task)
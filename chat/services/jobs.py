@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import threading
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .. import metrics
+from ..models import Message, ReplyJob
+from . import context, gemini, reply_cache
+
+
+# Delay before retrying a failed Gemini call; doubles per attempt
+RETRY_BACKOFF_S = 5
+# Claimable candidates read per poll; a worker that loses a race tries the next one
+CLAIM_BATCH = 10
+
+
+def enqueue_reply(user_message: Message) -> ReplyJob:
+    """Queue an AI reply to `user_message`; workers are woken once the caller commits."""
+    job = ReplyJob.objects.create(conversation_id=user_message.conversation_id, message=user_message)
+    transaction.on_commit(worker_pool.notify)
+    return job
+
+
+def _claimable(now, stale_before) -> Q:
+    return Q(status=ReplyJob.STATUS_PENDING, available_at__lte=now) | Q(
+        status=ReplyJob.STATUS_RUNNING, claimed_at__lt=stale_before
+    )
+
+
+def claim_next_job() -> Optional[ReplyJob]:
+    """
+    Take the oldest claimable job: pending and due, or running past its lease
+    (its worker died). The conditional UPDATE is the lock, so any number of
+    workers in any number of processes can poll the same table.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.CHAT_JOB_LEASE_S)
+    candidates = ReplyJob.objects.filter(_claimable(now, stale_before)).values_list("id", flat=True)
+    for job_id in candidates[:CLAIM_BATCH]:
+        won = ReplyJob.objects.filter(_claimable(now, stale_before), pk=job_id).update(
+            status=ReplyJob.STATUS_RUNNING, claimed_at=now, attempts=F("attempts") + 1
+        )
+        if not won:
+            continue
+        job = ReplyJob.objects.select_related("conversation", "message").get(pk=job_id)
+        if job.attempts > settings.CHAT_JOB_MAX_ATTEMPTS:
+            # Abandoned too often (worker crashes or unexpected errors)
+            ReplyJob.objects.filter(pk=job_id).update(
+                status=ReplyJob.STATUS_FAILED, error=job.error or "Worker lease expired.", finished_at=now
+            )
+            continue
+        return job
+    return None
+
+
+def run_job(job: ReplyJob) -> None:
+    """
+    Generate and store the reply for a claimed job. Gemini failures are retried
+    with backoff up to CHAT_JOB_MAX_ATTEMPTS, then fall back like the
+    synchronous endpoint or mark the job failed. Empty or blocked replies
+    would come back the same and fail the job at once.
+    """
+    user_msg = job.message
+    history = context.build_history(job.conversation, user_msg.text, before_sequence=user_msg.sequence)
+    try:
+        reply = reply_cache.generate_reply(history=history, prompt=user_msg.text, timeout_s=10)
+    except gemini.GeminiServiceError as e:
+        mine = ReplyJob.objects.filter(pk=job.pk, status=ReplyJob.STATUS_RUNNING, claimed_at=job.claimed_at)
+        if gemini.fallback_allowed():
+            metrics.record_fallback("generate_reply")
+            reply = f"(Gemini unavailable) {e}"
+        elif job.attempts < settings.CHAT_JOB_MAX_ATTEMPTS and not isinstance(e, gemini.GeminiEmptyResponseError):
+            delay = RETRY_BACKOFF_S * 2 ** (job.attempts - 1)
+            mine.update(
+                status=ReplyJob.STATUS_PENDING,
+                error=str(e),
+                available_at=timezone.now() + timedelta(seconds=delay),
+            )
+            return
+        else:
+            mine.update(status=ReplyJob.STATUS_FAILED, error=str(e), finished_at=timezone.now())
+            return
+
+    with transaction.atomic():
+        # Only the current lease holder may finish the job, so a reclaimed job
+        # never produces two replies
+        finished = ReplyJob.objects.filter(
+            pk=job.pk, status=ReplyJob.STATUS_RUNNING, claimed_at=job.claimed_at
+        ).update(status=ReplyJob.STATUS_DONE, error="", finished_at=timezone.now())
+        if not finished:
+            return
+        ai_msg = Message.objects.create(conversation=job.conversation, role=Message.ROLE_AI, text=reply)
+        ReplyJob.objects.filter(pk=job.pk).update(reply=ai_msg)
+        context.schedule_summary_refresh(job.conversation_id)
+
+
+def run_pending(limit: Optional[int] = None) -> int:
+    """Process due jobs on the calling thread until none are left; returns how many ran."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+class WorkerPool:
+    """
+    Threads in this process that drain the ReplyJob table. The pool size caps
+    concurrent outbound Gemini calls per process. Workers sleep until notify()
+    (a job was enqueued here) or CHAT_JOB_POLL_S elapses, which picks up jobs
+    enqueued by other processes and retries that became due.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self, workers: Optional[int] = None) -> None:
+        workers = settings.CHAT_JOB_WORKERS if workers is None else workers
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            self._stop.clear()
+            for i in range(len(self._threads), workers):
+                thread = threading.Thread(target=self._run, name=f"reply-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def notify(self) -> None:
+        if settings.CHAT_JOB_WORKERS > 0:
+            self.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                job = claim_next_job()
+            except DatabaseError:
+                job = None
+            if job is None:
+                self._wake.wait(settings.CHAT_JOB_POLL_S)
+                self._wake.clear()
+                continue
+            try:
+                run_job(job)
+            except Exception as e:
+                # Keep the worker alive; the job is retried once its lease expires
+                ReplyJob.objects.filter(pk=job.pk).update(error=str(e))
+            finally:
+                close_old_connections()
+
+
+worker_pool = WorkerPool()
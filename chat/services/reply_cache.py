@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+
+from . import gemini
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speedup
+    np = None
+
+
+# Hashed character trigram vectors; collisions only blur similarity slightly
+VECTOR_DIM = 256
+_TRAILING_PUNCTUATION = "?!.,;: "
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive form of a prompt, ignoring trailing punctuation."""
+    return " ".join(prompt.casefold().split()).rstrip(_TRAILING_PUNCTUATION)
+
+
+def history_hash(history: Sequence[Dict[str, str]]) -> str:
+    payload = json.dumps([[msg.get("role"), msg.get("text")] for msg in history], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def vectorize(text: str) -> List[float]:
+    """Unit-length hashed trigram counts of the (normalized) text."""
+    padded = f"  {text} "
+    counts = [0.0] * VECTOR_DIM
+    for i in range(len(padded) - 2):
+        counts[zlib.crc32(padded[i : i + 3].encode("utf-8")) % VECTOR_DIM] += 1.0
+    norm = math.sqrt(sum(c * c for c in counts)) or 1.0
+    return [c / norm for c in counts]
+
+
+def _best_match(query: List[float], vectors: List[List[float]]) -> Tuple[int, float]:
+    """Index and cosine similarity of the closest vector (all are unit length)."""
+    if np is not None:
+        scores = np.asarray(vectors) @ np.asarray(query)
+        best = int(scores.argmax())
+        return best, float(scores[best])
+    scores = [sum(a * b for a, b in zip(query, vector)) for vector in vectors]
+    best = max(range(len(scores)), key=scores.__getitem__)
+    return best, scores[best]
+
+
+@dataclass
+class _Entry:
+    reply: str
+    expires_at: float
+    vector: Optional[List[float]]
+
+
+class ReplyCache:
+    """
+    In-process LRU + TTL cache of Gemini replies, keyed on the normalized
+    prompt and a hash of the history sent with it. Optionally, a miss falls
+    back to the most similar cached prompt with the same history, by cosine
+    similarity of trigram vectors, if it scores at least `similarity`.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_s: float = 3600, similarity: float = 0.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        # history_key -> prompts cached for it, for nearest-neighbour lookups
+        self._by_history: Dict[str, Set[str]] = defaultdict(set)
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+        prompts = self._by_history.get(key[0])
+        if prompts is not None:
+            prompts.discard(key[1])
+            if not prompts:
+                del self._by_history[key[0]]
+
+    def get(self, history: Sequence[Dict[str, str]], prompt: str) -> Optional[str]:
+        history_key, normalized = history_hash(history), normalize_prompt(prompt)
+        now = time.monotonic()
+        with self._lock:
+            key = (history_key, normalized)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._drop(key)
+                entry = None
+            if entry is None and self.similarity > 0:
+                key, entry = self._nearest(history_key, normalized, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if key[1] == normalized:
+                self.hits += 1
+            else:
+                self.similar_hits += 1
+            return entry.reply
+
+    def _nearest(self, history_key: str, normalized: str, now: float):
+        candidates = [
+            (history_key, prompt)
+            for prompt in self._by_history.get(history_key, ())
+            if self._entries[(history_key, prompt)].expires_at > now
+        ]
+        if not candidates:
+            return None, None
+        vectors = [self._entries[key].vector for key in candidates]
+        best, score = _best_match(vectorize(normalized), vectors)
+        if score < self.similarity:
+            return None, None
+        return candidates[best], self._entries[candidates[best]]
+
+    def set(self, history: Sequence[Dict[str, str]], prompt: str, reply: str) -> None:
+        history_key, normalized = history_hash(history), normalize_prompt(prompt)
+        key = (history_key, normalized)
+        vector = vectorize(normalized) if self.similarity > 0 else None
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _Entry(reply, time.monotonic() + self.ttl_s, vector)
+            self._by_history[history_key].add(normalized)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_history.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[ReplyCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_reply_cache() -> Optional[ReplyCache]:
+    """The process-wide cache, or None unless CHAT_REPLY_CACHE is enabled."""
+    global _cache
+    if not settings.CHAT_REPLY_CACHE:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReplyCache(
+                    max_entries=settings.CHAT_REPLY_CACHE_MAX_ENTRIES,
+                    ttl_s=settings.CHAT_REPLY_CACHE_TTL_S,
+                    similarity=settings.CHAT_REPLY_CACHE_SIMILARITY,
+                )
+    return _cache
+
+
+def reset_reply_cache() -> None:
+    """Drop the process-wide cache so the next use picks up current settings."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def generate_reply(history: List[Dict[str, str]], prompt: str, timeout_s: int = 10) -> str:
+    """gemini.generate_reply behind the reply cache (a plain pass-through when disabled)."""
+    cache = get_reply_cache()
+    if cache is not None:
+        reply = cache.get(history, prompt)
+        if reply is not None:
+            return reply
+    reply = gemini.generate_reply(history=history, prompt=prompt, timeout_s=timeout_s)
+    if cache is not None:
+        cache.set(history, prompt, reply)
+    return reply
+
+
+async def generate_reply_async(history: List[Dict[str, str]], prompt: str, timeout_s: int = 10) -> str:
+    cache = get_reply_cache()
+    if cache is not None:
+        reply = cache.get(history, prompt)
+        if reply is not None:
+            return reply
+    reply = await gemini.generate_reply_async(history=history, prompt=prompt, timeout_s=timeout_s)
+    if cache is not None:
+        cache.set(history, prompt, reply)
+    return reply
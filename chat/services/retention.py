@@ -0,0 +1,196 @@
+"""
+Conversation deletion and retention.
+
+Deleting a conversation first marks it (deleted_at), which hides it from every
+read, then purges its rows in bounded chunks. Each chunk is one set-based
+DELETE in its own transaction, so SQLite's write lock is only held briefly and
+nothing loads the conversation's messages into Python, unlike Model.delete(),
+whose cascade collector fetches every related row first. With CHAT_SOFT_DELETE
+the purge runs later on a background thread (or `manage.py purge_conversations`)
+instead of inside the DELETE request.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from ..models import Conversation, Message, MessageFeedback, ReplyJob
+
+
+# Rows removed per DELETE statement
+DEFAULT_CHUNK_SIZE = 500
+# Conversations marked per UPDATE when expiring old conversations
+EXPIRE_BATCH = 100
+
+
+def _delete_where(model, column: str, value: int, limit: Optional[int] = None) -> int:
+    """
+    DELETE the rows of `model` whose `column` equals `value`, at most `limit`
+    of them (lowest ids first), in one statement. Unlike QuerySet.delete(),
+    nothing is collected or cascaded; callers delete children before parents.
+    """
+    qn = connection.ops.quote_name
+    table, pk, column = qn(model._meta.db_table), qn(model._meta.pk.column), qn(column)
+    with connection.cursor() as cursor:
+        if limit is None:
+            cursor.execute(f"DELETE FROM {table} WHERE {column} = %s", [value])
+        elif connection.features.allow_sliced_subqueries_with_in:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {pk} IN "
+                f"(SELECT {pk} FROM {table} WHERE {column} = %s ORDER BY {pk} LIMIT %s)",
+                [value, limit],
+            )
+        else:
+            # MySQL cannot LIMIT a subquery under IN
+            cursor.execute(f"SELECT {pk} FROM {table} WHERE {column} = %s ORDER BY {pk} LIMIT %s", [value, limit])
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return 0
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(ids))})", ids)
+        return cursor.rowcount
+
+
+def _delete_in_chunks(model, conversation_id: int, chunk_size: int, pause_s: float = 0) -> int:
+    total = 0
+    while True:
+        with transaction.atomic():
+            deleted = _delete_where(model, "conversation_id", conversation_id, chunk_size)
+        total += deleted
+        if deleted < chunk_size:
+            return total
+        if pause_s:
+            # Let other writers take the lock between chunks
+            time.sleep(pause_s)
+
+
+def _invalidate_feedback_summary() -> None:
+    from .insights import invalidate_feedback_summary
+
+    invalidate_feedback_summary()
+    transaction.on_commit(invalidate_feedback_summary)
+
+
+def mark_deleted(conversation_id: int) -> bool:
+    """Hide a conversation from every read; False if it does not exist or is already deleted."""
+    marked = Conversation.objects.filter(pk=conversation_id).update(deleted_at=timezone.now())
+    if marked:
+        # Its feedback no longer counts towards insights
+        _invalidate_feedback_summary()
+    return bool(marked)
+
+
+def purge_conversation(conversation_id: int, chunk_size: int = DEFAULT_CHUNK_SIZE, pause_s: float = 0) -> int:
+    """
+    Remove a conversation and everything attached to it, chunk by chunk;
+    returns the number of messages removed. Safe to call again after an
+    interruption. The FTS5 triggers keep the search index in step.
+    """
+    for model in (ReplyJob, MessageFeedback):
+        _delete_in_chunks(model, conversation_id, chunk_size, pause_s)
+    messages = _delete_in_chunks(Message, conversation_id, chunk_size, pause_s)
+    with transaction.atomic():
+        # Whatever a straggling writer (e.g. a reply worker) added meanwhile
+        _delete_where(ReplyJob, "conversation_id", conversation_id)
+        _delete_where(MessageFeedback, "conversation_id", conversation_id)
+        messages += _delete_where(Message, "conversation_id", conversation_id)
+        _delete_where(Conversation, "id", conversation_id)
+    return messages
+
+
+def purge_deleted(chunk_size: int = DEFAULT_CHUNK_SIZE, pause_s: float = 0, limit: Optional[int] = None) -> int:
+    """Purge conversations marked deleted, oldest mark first; returns how many were purged."""
+    purged = 0
+    while limit is None or purged < limit:
+        conversation_id = (
+            Conversation.all_objects.filter(deleted_at__isnull=False)
+            .order_by("deleted_at")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if conversation_id is None:
+            break
+        purge_conversation(conversation_id, chunk_size, pause_s)
+        purged += 1
+    return purged
+
+
+def expire_conversations(older_than_days: int, batch_size: int = EXPIRE_BATCH) -> int:
+    """Mark conversations with no activity for `older_than_days` as deleted; returns how many."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    expired = 0
+    while True:
+        ids = list(
+            Conversation.objects.filter(updated_at__lt=cutoff).order_by("updated_at").values_list("pk", flat=True)[
+                :batch_size
+            ]
+        )
+        if not ids:
+            break
+        expired += Conversation.objects.filter(pk__in=ids).update(deleted_at=timezone.now())
+    if expired:
+        _invalidate_feedback_summary()
+    return expired
+
+
+def delete_conversation(conversation_id: int) -> bool:
+    """
+    The DELETE endpoint: mark, then purge now, or after the caller commits on
+    the background purger with CHAT_SOFT_DELETE. False if there was nothing to delete.
+    """
+    if not mark_deleted(conversation_id):
+        return False
+    if settings.CHAT_SOFT_DELETE:
+        transaction.on_commit(purger.notify)
+    else:
+        purge_conversation(conversation_id)
+    return True
+
+
+class Purger:
+    """
+    A background thread that purges deleted conversations. It is started by
+    notify() and exits once nothing is left to purge.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def notify(self) -> None:
+        with self._lock:
+            self._wake.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="conversation-purger", daemon=True)
+                self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                self._wake.clear()
+                close_old_connections()
+                try:
+                    purge_deleted()
+                except DatabaseError:
+                    # Left marked; the next notify or purge_conversations retries
+                    pass
+                with self._lock:
+                    if not self._wake.is_set():
+                        self._thread = None
+                        return
+        finally:
+            close_old_connections()
+
+
+purger = Purger()
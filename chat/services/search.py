@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from ..models import Message
+from ..pagination import decode_rank_cursor, encode_rank_cursor
+from ..serializers import _datetime_repr
+
+
+FTS_TABLE = "chat_message_fts"
+SNIPPET_OPEN = "["
+SNIPPET_CLOSE = "]"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 12
+# Query terms beyond this are ignored
+MAX_QUERY_TERMS = 16
+# BM25 parameters, as used by FTS5
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Rows read per query while the fallback index catches up with the table
+INDEX_CHUNK_SIZE = 2000
+
+# Same token rules as FTS5's unicode61 tokenizer: runs of letters and digits
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _fold(token: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", token)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Case- and diacritic-folded terms of `text`."""
+    return [_fold(match.group()) for match in _TOKEN_RE.finditer(text)]
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct terms of a search query, in order. Every term must match."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def _use_fts() -> bool:
+    if settings.CHAT_SEARCH_BACKEND == "python" or connection.vendor != "sqlite":
+        return False
+    name = str(connection.settings_dict["NAME"])
+    if name not in _fts_tables:
+        _fts_tables[name] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_tables[name]
+
+
+_fts_tables: Dict[str, bool] = {}
+
+
+def _fts_page(
+    terms: List[str], conversation_id: Optional[int], after: Optional[Tuple[float, int]], limit: int
+) -> List[Tuple[float, int, str]]:
+    # Terms are letters and digits only, so quoting them is enough to keep FTS5
+    # query syntax out of user input
+    match = " ".join(f'"{term}"' for term in terms)
+    sql = [
+        f"SELECT {FTS_TABLE}.rank, {FTS_TABLE}.rowid, snippet({FTS_TABLE}, 0, %s, %s, %s, %s)",
+        f"FROM {FTS_TABLE}",
+    ]
+    params: List[Any] = [SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS, SNIPPET_TOKENS]
+    if conversation_id is not None:
+        sql.append(f"JOIN chat_message ON chat_message.id = {FTS_TABLE}.rowid")
+    sql.append(f"WHERE {FTS_TABLE} MATCH %s")
+    params.append(match)
+    if conversation_id is not None:
+        sql.append("AND chat_message.conversation_id = %s")
+        params.append(conversation_id)
+    if after is not None:
+        sql.append(f"AND ({FTS_TABLE}.rank > %s OR ({FTS_TABLE}.rank = %s AND {FTS_TABLE}.rowid > %s))")
+        params.extend([after[0], after[0], after[1]])
+    sql.append(f"ORDER BY {FTS_TABLE}.rank, {FTS_TABLE}.rowid LIMIT %s")
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(sql), params)
+        return cursor.fetchall()
+
+
+def make_snippet(text: str, terms: List[str]) -> str:
+    """Up to SNIPPET_TOKENS tokens around the first hit, with hits marked like FTS5's snippet()."""
+    tokens = list(_TOKEN_RE.finditer(text))
+    wanted = set(terms)
+    hits = [i for i, token in enumerate(tokens) if _fold(token.group()) in wanted]
+    if not hits:
+        return text[:200]
+    start = max(0, min(hits[0] - SNIPPET_TOKENS // 4, len(tokens) - SNIPPET_TOKENS))
+    end = min(len(tokens), start + SNIPPET_TOKENS)
+    parts = [SNIPPET_ELLIPSIS] if start > 0 else []
+    position = tokens[start].start()
+    for i in range(start, end):
+        token = tokens[i]
+        parts.append(text[position : token.start()])
+        if i in hits:
+            parts.append(f"{SNIPPET_OPEN}{token.group()}{SNIPPET_CLOSE}")
+        else:
+            parts.append(token.group())
+        position = token.end()
+    if end < len(tokens):
+        parts.append(SNIPPET_ELLIPSIS)
+    return "".join(parts)
+
+
+class InvertedIndex:
+    """
+    In-process inverted index over Message.text, for databases without FTS5.
+    It is built on first use and catches up with newer message ids before each
+    search, which covers bulk imports and other processes; this process's
+    saves are added as they happen. Deleted messages are dropped when a search
+    runs into them. Ranking is BM25, as in FTS5 (lower rank is better).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # term -> {message id: term frequency}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._conversations: Dict[int, int] = {}
+        self._total_length = 0
+        self._last_id = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, message_id: int, conversation_id: int, text: str) -> None:
+        terms = tokenize(text)
+        with self._lock:
+            if message_id in self._lengths:
+                return
+            for term in terms:
+                postings = self._postings.setdefault(term, {})
+                postings[message_id] = postings.get(message_id, 0) + 1
+            self._lengths[message_id] = len(terms)
+            self._conversations[message_id] = conversation_id
+            self._total_length += len(terms)
+
+    def discard(self, message_id: int) -> None:
+        with self._lock:
+            length = self._lengths.pop(message_id, None)
+            if length is not None:
+                self._conversations.pop(message_id, None)
+                self._total_length -= length
+            # Postings are pruned lazily by search()
+
+    def catch_up(self) -> None:
+        rows = (
+            Message.objects.filter(id__gt=self._last_id)
+            .order_by("id")
+            .values_list("id", "conversation_id", "text")
+        )
+        for message_id, conversation_id, text in rows.iterator(chunk_size=INDEX_CHUNK_SIZE):
+            self.add(message_id, conversation_id, text)
+            self._last_id = max(self._last_id, message_id)
+
+    def search(self, terms: List[str], conversation_id: Optional[int] = None) -> List[Tuple[float, int]]:
+        """(rank, message id) of messages containing every term, best first."""
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not postings or not all(postings):
+                return []
+            documents = len(self._lengths)
+            average_length = self._total_length / documents if documents else 0.0
+            candidates = set(min(postings, key=len))
+            for term_postings in postings:
+                candidates.intersection_update(term_postings)
+            idfs = []
+            for term_postings in postings:
+                # Postings may still list deleted messages, so clamp like FTS5 does
+                ratio = (documents - len(term_postings) + 0.5) / (len(term_postings) + 0.5)
+                idfs.append(math.log(ratio) if ratio > 1 else 1e-6)
+            norm_base = 1 - BM25_B
+            ranked = []
+            for message_id in candidates:
+                length = self._lengths.get(message_id)
+                if length is None:
+                    for term_postings in postings:
+                        term_postings.pop(message_id, None)
+                    continue
+                if conversation_id is not None and self._conversations[message_id] != conversation_id:
+                    continue
+                norm = norm_base + BM25_B * (length / average_length if average_length else 0.0)
+                score = 0.0
+                for term_postings, idf in zip(postings, idfs):
+                    frequency = term_postings[message_id]
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                ranked.append((-score, message_id))
+        ranked.sort()
+        return ranked
+
+
+_index: Optional[InvertedIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_fallback_index() -> InvertedIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = InvertedIndex()
+        _index.catch_up()
+        return _index
+
+
+def reset_fallback_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def index_saved_message(sender, instance: Message, created: bool, **kwargs) -> None:
+    """post_save receiver: keep an already built fallback index current."""
+    if created and _index is not None:
+        _index.add(instance.pk, instance.conversation_id, instance.text)
+
+
+def _fallback_page(
+    terms: List[str], conversation_id: Optional[int], after: Optional[Tuple[float, int]], limit: int
+) -> Tuple[List[Tuple[float, int]], Dict[int, str]]:
+    index = get_fallback_index()
+    ranked = index.search(terms, conversation_id)
+    if after is not None:
+        ranked = [entry for entry in ranked if entry > after]
+    # Read a little past the page in case some hits were deleted meanwhile
+    page: List[Tuple[float, int]] = []
+    texts: Dict[int, str] = {}
+    while ranked and len(page) < limit:
+        batch, ranked = ranked[: limit - len(page) + 10], ranked[limit - len(page) + 10 :]
+        found = dict(Message.objects.filter(id__in=[pk for _, pk in batch]).values_list("id", "text"))
+        for rank, pk in batch:
+            if pk not in found:
+                index.discard(pk)
+                continue
+            if len(page) < limit:
+                page.append((rank, pk))
+                texts[pk] = found[pk]
+    return page, texts
+
+
+def search_messages(
+    query: str, conversation_id: Optional[int] = None, cursor: Optional[str] = None, limit: int = 20
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Ranked full-text search over message text, best match first. Returns
+    (results, next_cursor); next_cursor is None on the last page. Raises
+    InvalidCursor for a malformed cursor.
+    """
+    after = decode_rank_cursor(cursor) if cursor else None
+    terms = query_terms(query)
+    if not terms:
+        return [], None
+
+    if _use_fts():
+        rows = _fts_page(terms, conversation_id, after, limit + 1)
+        page = [(rank, pk) for rank, pk, _ in rows]
+        snippets = {pk: snippet for _, pk, snippet in rows}
+    else:
+        page, texts = _fallback_page(terms, conversation_id, after, limit + 1)
+        snippets = {pk: make_snippet(text, terms) for pk, text in texts.items()}
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_rank_cursor(*page[-1])
+
+    fields = ("id", "conversation_id", "conversation__title", "role", "sequence", "created_at")
+    # Hits in deleted conversations awaiting purge are dropped here
+    found = Message.objects.filter(id__in=[pk for _, pk in page], conversation__deleted_at__isnull=True)
+    messages = {row["id"]: row for row in found.values(*fields)}
+    results = []
+    for rank, pk in page:
+        row = messages.get(pk)
+        if row is None:
+            continue
+        results.append({
+            "id": pk,
+            "conversation": row["conversation_id"],
+            "conversation_title": row["conversation__title"],
+            "role": row["role"],
+            "sequence": row["sequence"],
+            "created_at": _datetime_repr(row["created_at"]),
+            "snippet": snippets[pk],
+            "score": -rank,
+        })
+    return results, next_cursor
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+from datetime import timezone as dt_timezone
+from functools import partial
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..events import conversation_events
+from ..models import Conversation, Message
+
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_TEXT_LENGTH = 100_000
+
+
+class TranscriptError(ValueError):
+    pass
+
+
+def iter_ndjson(lines: Iterable[bytes | str]) -> Iterator[Dict[str, Any]]:
+    """Decode one JSON object per line, skipping blank lines."""
+    for lineno, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8")
+            except UnicodeDecodeError:
+                raise TranscriptError(f"Line {lineno}: not valid UTF-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise TranscriptError(f"Line {lineno}: invalid JSON ({e})")
+
+
+def load_json_transcript(fp: IO) -> tuple[str | None, List[Dict[str, Any]]]:
+    """
+    Parse a JSON transcript: either a list of messages or
+    {"title": "...", "messages": [...]}. Returns (title, messages).
+    """
+    try:
+        data = json.load(fp)
+    except ValueError as e:
+        raise TranscriptError(f"Invalid JSON: {e}")
+    if isinstance(data, list):
+        return None, data
+    if isinstance(data, dict) and isinstance(data.get("messages"), list):
+        return data.get("title"), data["messages"]
+    raise TranscriptError('Transcript must be a list of messages or {"messages": [...]}.')
+
+
+def _build_message(conversation_id: int, index: int, item: Any) -> Message:
+    if not isinstance(item, dict):
+        raise TranscriptError(f"Message {index}: expected an object.")
+    role = item.get("role")
+    if role not in (Message.ROLE_USER, Message.ROLE_AI):
+        raise TranscriptError(f"Message {index}: role must be 'user' or 'ai'.")
+    text = item.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise TranscriptError(f"Message {index}: text must be a non-empty string.")
+    if len(text) > MAX_TEXT_LENGTH:
+        raise TranscriptError(f"Message {index}: text exceeds {MAX_TEXT_LENGTH} characters.")
+    created_at = timezone.now()
+    if item.get("created_at"):
+        try:
+            created_at = parse_datetime(str(item["created_at"]))
+        except ValueError:
+            created_at = None
+        if created_at is None:
+            raise TranscriptError(f"Message {index}: created_at is not an ISO 8601 datetime.")
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at, dt_timezone.utc)
+    return Message(conversation_id=conversation_id, role=role, text=text.strip(), created_at=created_at)
+
+
+def import_transcript(
+    conversation: Conversation,
+    messages: Iterable[Any],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Append messages to a conversation in input order, bypassing the per-row
+    Message.save path: each batch reserves its sequence block with one counter
+    update (which also bumps updated_at) and is written with one bulk_create.
+
+    Batches commit independently so huge imports never hold a long write lock;
+    wrap the call in transaction.atomic() to make the whole import all-or-nothing.
+    Returns the number of messages imported.
+    """
+    imported = 0
+    items = iter(messages)
+    while True:
+        batch = [
+            _build_message(conversation.pk, imported + offset, item)
+            for offset, item in enumerate(islice(items, batch_size))
+        ]
+        if not batch:
+            break
+        with transaction.atomic():
+            last = Conversation.allocate_sequence(conversation.pk, last_message=batch[-1], count=len(batch))
+            for offset, msg in enumerate(batch):
+                msg.sequence = last - len(batch) + 1 + offset
+            Message.objects.bulk_create(batch, batch_size=batch_size)
+            transaction.on_commit(partial(conversation_events.publish, conversation.pk))
+        imported += len(batch)
+    return imported
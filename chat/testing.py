@@ -0,0 +1,107 @@
+"""
+Fake Gemini upstream for tests and benchmarks.
+
+FakeGeminiModel stands in for genai.GenerativeModel: each call sleeps for a
+latency drawn from a configurable distribution, honours the request timeout
+like the real client (raising after `timeout` seconds), and can fail a given
+fraction of calls. Install it by replacing gemini._get_client:
+
+    monkeypatch.setattr(gemini, "_get_client", lambda: FakeGeminiModel(lognormal(0.2, 1.0)))
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Union
+
+Latency = Callable[[random.Random], float]
+
+
+def fixed(seconds: float) -> Latency:
+    return lambda rng: seconds
+
+
+def lognormal(median_s: float, p95_s: float) -> Latency:
+    """Right-skewed latencies with the given median and 95th percentile."""
+    sigma = math.log(p95_s / median_s) / 1.6449
+    return lambda rng: rng.lognormvariate(math.log(median_s), sigma)
+
+
+def long_tail(fast_s: float, slow_s: float, slow_fraction: float) -> Latency:
+    """Mostly `fast_s`, with `slow_fraction` of calls taking `slow_s`."""
+    return lambda rng: slow_s if rng.random() < slow_fraction else fast_s
+
+
+def sequence(values: Iterable[float]) -> Latency:
+    """Latencies in the given order, repeating; for deterministic tests."""
+    values = itertools.cycle(list(values))
+    return lambda rng: next(values)
+
+
+@dataclass
+class FakeResponse:
+    text: str
+
+
+class FakeGeminiModel:
+    def __init__(
+        self,
+        latency: Union[Latency, float] = 0.0,
+        failure_rate: float = 0.0,
+        fail_first: int = 0,
+        reply: str = "fake reply",
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency if callable(latency) else fixed(latency)
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.reply = reply
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _start(self, request_options: Optional[dict]) -> tuple[float, Optional[Exception]]:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            latency = self.latency(self._rng)
+            failing = self.calls <= self.fail_first or self._rng.random() < self.failure_rate
+        timeout = (request_options or {}).get("timeout")
+        if timeout is not None and latency > timeout:
+            return timeout, TimeoutError("504 Deadline Exceeded")
+        return latency, RuntimeError("503 Service Unavailable") if failing else None
+
+    def _finish(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _chunks(self) -> List[FakeResponse]:
+        return [FakeResponse(word + " ") for word in self.reply.split()]
+
+    def generate_content(self, messages, stream: bool = False, request_options: Optional[dict] = None):
+        latency, error = self._start(request_options)
+        try:
+            time.sleep(latency)
+            if error is not None:
+                raise error
+        finally:
+            self._finish()
+        return iter(self._chunks()) if stream else FakeResponse(self.reply)
+
+    async def generate_content_async(self, messages, request_options: Optional[dict] = None):
+        latency, error = self._start(request_options)
+        try:
+            await asyncio.sleep(latency)
+            if error is not None:
+                raise error
+        finally:
+            self._finish()
+        return FakeResponse(self.reply)
@@ -1,9 +1,154 @@
 from __future__ import annotations
 
+import os
+import random
+import zlib
+from datetime import timedelta
+
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
 from rest_framework.throttling import SimpleRateThrottle
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class CacheCounterStore:
+    """
+    Counters as plain cache entries. add + incr are atomic on the local-memory
+    backend (within its process) and on memcached/redis (across processes).
+    """
+
+    def __init__(self, cache) -> None:
+        self.cache = cache
+
+    def get(self, key: str) -> int:
+        return self.cache.get(key, 0)
+
+    def incr(self, key: str, delta: int, ttl: int) -> int:
+        if self.cache.add(key, delta, ttl):
+            return delta
+        try:
+            return self.cache.incr(key, delta)
+        except ValueError:
+            # Expired between add and incr
+            return self.incr(key, delta, ttl)
+
+
+class FileCounterStore(CacheCounterStore):
+    """
+    Counters in a file-based cache. Django's incr there is a plain read/write,
+    so each update holds an exclusive flock shared by every process using the
+    cache directory. Keys are striped over a fixed set of lock files.
+    """
+
+    LOCK_STRIPES = 64
+
+    def incr(self, key: str, delta: int, ttl: int) -> int:
+        os.makedirs(self.cache._dir, exist_ok=True)
+        stripe = zlib.crc32(key.encode("utf-8")) % self.LOCK_STRIPES
+        with open(os.path.join(self.cache._dir, f"throttle-{stripe}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                value = self.cache.get(key, 0) + delta
+                self.cache.set(key, value, ttl)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return value
+
+
+class DatabaseCounterStore:
+    """
+    Counters in the ThrottleCounter table, for deployments whose shared cache is
+    the database backend. UPDATE count = count + n is atomic in every database;
+    expired rows are purged now and then.
+    """
+
+    PURGE_PROBABILITY = 0.01
+
+    def get(self, key: str) -> int:
+        from .models import ThrottleCounter
+
+        row = ThrottleCounter.objects.filter(key=key, expires_at__gt=timezone.now()).values_list("count", flat=True)
+        return row.first() or 0
+
+    def incr(self, key: str, delta: int, ttl: int) -> int:
+        from .models import ThrottleCounter
+
+        now = timezone.now()
+        counter = ThrottleCounter.objects.filter(key=key)
+        with transaction.atomic():
+            if not counter.update(count=F("count") + delta):
+                try:
+                    with transaction.atomic():
+                        ThrottleCounter.objects.create(key=key, count=delta, expires_at=now + timedelta(seconds=ttl))
+                except IntegrityError:
+                    # Another process created it first
+                    counter.update(count=F("count") + delta)
+            # Our UPDATE's row lock is held until commit, so this reads a consistent value
+            value = counter.values_list("count", flat=True).get()
+        if random.random() < self.PURGE_PROBABILITY:
+            ThrottleCounter.objects.filter(expires_at__lte=now).delete()
+        return value
+
+
+def get_counter_store(cache):
+    if isinstance(cache, FileBasedCache) and fcntl is not None:
+        return FileCounterStore(cache)
+    if isinstance(cache, DatabaseCache):
+        return DatabaseCounterStore()
+    return CacheCounterStore(cache)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with constant memory per client. Instead of a list of
+    timestamps, it keeps one counter per fixed window and estimates the
+    sliding-window count as current + previous * (share of the previous window
+    still inside the sliding window). Counters are updated with atomic
+    increments, so concurrent workers sharing the cache see each other's
+    requests. Rejected requests are not counted.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        store = get_counter_store(self.cache)
+        window = int(self.now // self.duration)
+        self.elapsed = self.now - window * self.duration
+        current_key = f"{self.key}:{window}"
+        self.previous = store.get(f"{self.key}:{window - 1}")
+        # Counters must outlive the following window, where they are "previous"
+        self.current = store.incr(current_key, 1, 2 * self.duration)
+        estimated = self.previous * (1 - self.elapsed / self.duration) + self.current
+        if estimated > self.num_requests:
+            store.incr(current_key, -1, 2 * self.duration)
+            self.current -= 1
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        remaining_in_window = self.duration - self.elapsed
+        if self.current >= self.num_requests or not self.previous:
+            # Only the next window helps; its estimate also counts this window
+            return remaining_in_window
+        # Time for the previous window's weight to decay enough for one more request
+        excess = self.previous * (1 - self.elapsed / self.duration) + self.current + 1 - self.num_requests
+        return min(remaining_in_window, excess / self.previous * self.duration)
+
 
-class MessageRateThrottle(SimpleRateThrottle):
+class MessageRateThrottle(SlidingWindowRateThrottle):
     scope = "message"
 
     def get_cache_key(self, request, view):
@@ -18,7 +163,7 @@ class MessageRateThrottle(SimpleRateThrottle):
         return f"throttle:{self.scope}:{ident}"
 
 
-class InsightsRateThrottle(SimpleRateThrottle):
+class InsightsRateThrottle(SlidingWindowRateThrottle):
     scope = "insights"
 
     def get_cache_key(self, request, view):
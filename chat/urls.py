@@ -1,17 +1,37 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+
+if settings.CHAT_ASYNC_VIEWS:
+    message_list_create_view = async_views.AsyncMessageListCreateView
+    insights_view = async_views.AsyncInsightsView
+    actionable_insights_view = async_views.AsyncActionableInsightsView
+else:
+    message_list_create_view = views.MessageListCreateView
+    insights_view = views.InsightsView
+    actionable_insights_view = views.ActionableInsightsView
 
 
 urlpatterns = [
     path("conversations/", views.ConversationListCreateView.as_view(), name="conversation-list-create"),
     path("conversations/<int:pk>/", views.ConversationDetailView.as_view(), name="conversation-detail"),
-    path("conversations/<int:pk>/messages/", views.MessageListCreateView.as_view(), name="message-list-create"),
+    path("conversations/<int:pk>/messages/", message_list_create_view.as_view(), name="message-list-create"),
+    path("conversations/<int:pk>/messages/import/", views.MessageImportView.as_view(), name="message-import"),
+    path(
+        "conversations/<int:pk>/jobs/<int:job_id>/",
+        views.ReplyJobDetailView.as_view(),
+        name="reply-job-detail",
+    ),
+    path("conversations/<int:pk>/events/", views.MessageEventsView.as_view(), name="message-events"),
     path(
         "conversations/<int:pk>/messages/<int:message_id>/feedback/",
         views.MessageFeedbackView.as_view(),
         name="message-feedback",
     ),
-    path("insights/", views.InsightsView.as_view(), name="insights"),
-    path("insights/actionable/", views.ActionableInsightsView.as_view(), name="insights-actionable"),
+    path("search/", views.MessageSearchView.as_view(), name="message-search"),
+    path("export/", views.ExportView.as_view(), name="export"),
+    path("insights/", insights_view.as_view(), name="insights"),
+    path("insights/actionable/", actionable_insights_view.as_view(), name="insights-actionable"),
 ]
@@ -1,97 +1,260 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from collections.abc import Iterator
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import QuerySet, Count, Q, Max
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.db import connection, transaction
+from django.db.models import QuerySet
 from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from .models import Conversation, Message, MessageFeedback
+from . import metrics
+from .events import conversation_events
+from .models import Conversation, Message, MessageFeedback, ReplyJob
+from .pagination import InvalidCursor, conversation_page
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, EventStreamRenderer, FastJSONRenderer, NDJSONRenderer
 from .serializers import (
     ConversationSerializer,
     MessageSerializer,
     CreateMessageSerializer,
     MessageFeedbackSerializer,
     CreateFeedbackSerializer,
+    ReplyJobSerializer,
+    CONVERSATION_VALUES,
+    serialize_conversation_rows,
+    serialize_message_rows,
 )
-from .services import gemini
+from .services import context, export, gemini, insights, jobs, reply_cache, retention, search
+from .services.transcripts import TranscriptError, import_transcript
 from .throttles import MessageRateThrottle, InsightsRateThrottle
 
 
-def _build_feedback_summary() -> dict:
-    feedback_qs = MessageFeedback.objects.select_related("conversation", "message")
-    total = feedback_qs.count()
-    helpful = feedback_qs.filter(is_helpful=True).count()
-    not_helpful = total - helpful
-    helpful_rate = helpful / total if total else 0.0
-
-    per_conversation_raw = (
-        feedback_qs.values("conversation_id", "conversation__title")
-        .annotate(
-            feedback_count=Count("id"),
-            helpful_count=Count("id", filter=Q(is_helpful=True)),
-            not_helpful_count=Count("id", filter=Q(is_helpful=False)),
-            last_feedback_at=Max("created_at"),
-        )
-        .order_by("-feedback_count", "-last_feedback_at")[:20]
-    )
-
-    per_conversation = [
-        {
-            "conversation_id": row["conversation_id"],
-            "title": row["conversation__title"],
-            "feedback_count": row["feedback_count"],
-            "helpful_count": row["helpful_count"],
-            "not_helpful_count": row["not_helpful_count"],
-            "helpful_rate": (
-                row["helpful_count"] / row["feedback_count"] if row["feedback_count"] else 0.0
-            ),
-            "last_feedback_at": row["last_feedback_at"],
-        }
-        for row in per_conversation_raw
-    ]
-
-    recent_feedback = [
-        {
-            "id": fb.id,
-            "conversation_id": fb.conversation_id,
-            "message_id": fb.message_id,
-            "title": fb.conversation.title,
-            "is_helpful": fb.is_helpful,
-            "comment": fb.comment,
-            "created_at": fb.created_at,
-            "message_preview": fb.message.text[:200],
-        }
-        for fb in feedback_qs.order_by("-created_at")[:10]
-    ]
+def _sse_event(event: str, data: dict, event_id: int | None = None) -> str:
+    frame = f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+    if event_id is not None:
+        frame = f"id: {event_id}\n" + frame
+    return frame
+
+
+def _event_stream_response(stream) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def _stream_reply_events(conv: Conversation, user_data: dict, history: list, text: str):
+    """
+    Async generator of SSE frames for a streamed reply. Gemini chunks are pulled
+    off-thread so an ASGI worker is never blocked, and the AI Message is only
+    persisted once the stream has completed.
+    """
+    yield _sse_event("user_message", user_data)
+    cache = reply_cache.get_reply_cache()
+    cached = cache.get(history, text) if cache is not None else None
+    parts: list[str] = []
+    try:
+        if cached is not None:
+            yield _sse_event("chunk", {"text": cached})
+            reply = cached
+        else:
+            chunks = gemini.stream_reply(history=history, prompt=text, timeout_s=10)
+            while True:
+                chunk = await sync_to_async(next, thread_sensitive=False)(chunks, None)
+                if chunk is None:
+                    break
+                parts.append(chunk)
+                yield _sse_event("chunk", {"text": chunk})
+            reply = "".join(parts).strip()
+            if cache is not None:
+                cache.set(history, text, reply)
+    except gemini.GeminiServiceError as e:
+        if not gemini.fallback_allowed():
+            yield _sse_event("error", {"detail": str(e)})
+            return
+        metrics.record_fallback("stream_reply")
+        reply = f"(Gemini unavailable) {e}"
+
+    def _save_reply() -> dict:
+        ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text=reply)
+        context.schedule_summary_refresh(conv.pk)
+        return MessageSerializer(ai_msg).data
+
+    yield _sse_event("ai_message", await sync_to_async(_save_reply)())
+
+
+def _wants_queued_reply(query_params, headers) -> bool:
+    return query_params.get("async") in ("1", "true") or "respond-async" in headers.get("Prefer", "")
+
+
+def _accept_queued_reply(conv: Conversation, text: str) -> tuple[dict, dict]:
+    """
+    Store the user message and queue its reply in one transaction. Returns the
+    202 payload and headers; the AI message arrives later via `since`/events.
+    """
+    with transaction.atomic():
+        user_msg = Message.objects.create(conversation=conv, role=Message.ROLE_USER, text=text)
+        job = jobs.enqueue_reply(user_msg)
+    payload = {"user_message": MessageSerializer(user_msg).data, "job": ReplyJobSerializer(job).data}
+    location = reverse("reply-job-detail", kwargs={"pk": conv.pk, "job_id": job.pk})
+    return payload, {"Location": location}
+
+
+EVENT_BATCH_SIZE = 200
+
+
+# Conversation columns that change whenever a message page's content can: new
+# messages bump updated_at and last_sequence, deletes change message_count, and
+# feedback writes bump feedback_revision
+MESSAGE_LIST_VALIDATOR_FIELDS = ("updated_at", "last_sequence", "message_count", "feedback_revision")
 
-    return {
-        "total_feedback": total,
-        "helpful_count": helpful,
-        "not_helpful_count": not_helpful,
-        "helpful_rate": helpful_rate,
-        "per_conversation": per_conversation,
-        "recent_feedback": recent_feedback,
-    }
+
+def _etag(*parts) -> str:
+    """Strong validator for a representation fully determined by `parts`."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _conditional(request, etag: str, response=None):
+    """
+    With response=None: a 304 if If-None-Match already names `etag`, else None.
+    Otherwise tag `response`. Either way browsers may keep the body but must
+    revalidate before reuse.
+    """
+    if response is None:
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            return None
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _message_list_etag(pk: int, validator: tuple, since: int, limit: int, fmt: str) -> str:
+    return _etag("messages", pk, *validator, since, limit, fmt)
+
+
+def _message_page_queryset(conversation_id: int, since: int, limit: int) -> QuerySet[Message]:
+    """
+    One query for a page of messages with their feedback joined in, so
+    MessageSerializer's nested feedback never triggers per-row lookups
+    (serialize_message_rows reads the same join through .values_list()).
+    """
+    qs = Message.objects.filter(conversation_id=conversation_id).select_related("feedback")
+    if since:
+        qs = qs.filter(sequence__gt=since)
+    return qs.order_by("sequence")[:limit]
+
+
+def _messages_after(conversation_id: int, since: int) -> list:
+    return serialize_message_rows(_message_page_queryset(conversation_id, since, EVENT_BATCH_SIZE))
+
+
+def _poll_messages_after(conversation_id: int, since: int) -> list:
+    """
+    _messages_after for the live event stream. Runs on a shared pool thread,
+    not the request's own sync thread, which an open stream would otherwise
+    pin (with its database connection) until the client disconnects; the
+    connection is closed again after each read.
+    """
+    try:
+        return _messages_after(conversation_id, since)
+    finally:
+        connection.close()
+
+
+def _message_event_backlog(conversation_id: int, since: int):
+    yield f"retry: {settings.CHAT_EVENTS_RETRY_MS}\n\n"
+    for data in _messages_after(conversation_id, since):
+        yield _sse_event("message", data, event_id=data["sequence"])
+
+
+async def _message_event_stream(conversation_id: int, since: int):
+    """
+    Async generator of SSE frames for new messages in a conversation. Sends the
+    backlog after `since`, then sleeps until Message.save publishes a change in
+    this process. Each heartbeat also re-checks, which picks up messages written
+    by other worker processes.
+    """
+    sub = conversation_events.subscribe(conversation_id)
+    try:
+        yield f"retry: {settings.CHAT_EVENTS_RETRY_MS}\n\n"
+        last_seq = since
+        while True:
+            batch = await sync_to_async(_poll_messages_after, thread_sensitive=False)(conversation_id, last_seq)
+            for data in batch:
+                last_seq = data["sequence"]
+                yield _sse_event("message", data, event_id=last_seq)
+            if len(batch) == EVENT_BATCH_SIZE:
+                continue
+            if not await sub.wait(settings.CHAT_EVENTS_HEARTBEAT_S):
+                yield ": keep-alive\n\n"
+    finally:
+        conversation_events.unsubscribe(sub)
 
 
 class ConversationListCreateView(APIView):
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
     def get(self, request: Request) -> Response:
-        qs: QuerySet[Conversation] = Conversation.objects.all().order_by("-updated_at")
-        # Manual pagination using limit/offset to align with plan
+        qs: QuerySet[Conversation] = Conversation.objects.all()
         try:
             limit = min(int(request.query_params.get("limit", 20)), 100)
         except ValueError:
             limit = 20
+        if "offset" in request.query_params:
+            # Legacy offset pagination; cost grows with the offset
+            try:
+                offset = int(request.query_params.get("offset", 0))
+            except ValueError:
+                offset = 0
+            rows = list(qs.order_by("-updated_at", "id").values(*CONVERSATION_VALUES)[offset : offset + limit])
+            count = qs.count()
+            # The rows are all the representation depends on, so hashing them skips serialization
+            etag = _etag("conversations", rows, count, offset, limit, request.accepted_renderer.format)
+            not_modified = _conditional(request, etag)
+            if not_modified is not None:
+                return not_modified
+            data = serialize_conversation_rows(rows)
+            return _conditional(
+                request, etag, Response({"results": data, "count": count, "offset": offset, "limit": limit})
+            )
+
         try:
-            offset = int(request.query_params.get("offset", 0))
-        except ValueError:
-            offset = 0
-        items = qs[offset : offset + limit]
-        data = ConversationSerializer(items, many=True).data
-        return Response({"results": data, "count": qs.count(), "offset": offset, "limit": limit})
+            rows, next_cursor = conversation_page(
+                qs, request.query_params.get("cursor"), limit, CONVERSATION_VALUES
+            )
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Counting scans the table, so it is opt-in
+        count = qs.count() if request.query_params.get("count") in ("1", "true") else None
+        etag = _etag("conversations", rows, next_cursor, count, limit, request.accepted_renderer.format)
+        not_modified = _conditional(request, etag)
+        if not_modified is not None:
+            return not_modified
+        payload = {
+            "results": serialize_conversation_rows(rows),
+            "next_cursor": next_cursor,
+            "limit": limit,
+        }
+        if count is not None:
+            payload["count"] = count
+        return _conditional(request, etag, Response(payload))
 
     def post(self, request: Request) -> Response:
         title = (request.data or {}).get("title")
@@ -101,19 +264,26 @@ class ConversationListCreateView(APIView):
 
 class ConversationDetailView(APIView):
     def get(self, request: Request, pk: int) -> Response:
-        conv = get_object_or_404(Conversation, pk=pk)
-        return Response(ConversationSerializer(conv).data)
+        row = Conversation.objects.filter(pk=pk).values(*CONVERSATION_VALUES).first()
+        if row is None:
+            raise Http404("No Conversation matches the given query.")
+        etag = _etag("conversation", row, request.accepted_renderer.format)
+        not_modified = _conditional(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return _conditional(request, etag, Response(serialize_conversation_rows([row])[0]))
 
     def delete(self, request: Request, pk: int) -> Response:
-        conv = get_object_or_404(Conversation, pk=pk)
-        conv.delete()
+        if not retention.delete_conversation(pk):
+            raise Http404("No Conversation matches the given query.")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class MessageListCreateView(APIView):
     throttle_classes = [MessageRateThrottle]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
     def get(self, request: Request, pk: int) -> Response:
-        conv = get_object_or_404(Conversation, pk=pk)
         try:
             since = int(request.query_params.get("since", 0))
         except ValueError:
@@ -122,15 +292,19 @@ class MessageListCreateView(APIView):
             limit = min(int(request.query_params.get("limit", 50)), 200)
         except ValueError:
             limit = 50
-        qs = conv.messages.all()
-        if since:
-            qs = qs.filter(sequence__gt=since)
-        qs = qs.order_by("sequence")[:limit]
-        results = list(qs)
-        return Response({
-            "results": MessageSerializer(results, many=True).data,
-            "lastSeq": (results[-1].sequence if results else since),
-        })
+        # One indexed row answers both "does it exist" and "has anything changed"
+        validator = Conversation.objects.filter(pk=pk).values_list(*MESSAGE_LIST_VALIDATOR_FIELDS).first()
+        if validator is None:
+            raise Http404("No Conversation matches the given query.")
+        etag = _message_list_etag(pk, validator, since, limit, request.accepted_renderer.format)
+        not_modified = _conditional(request, etag)
+        if not_modified is not None:
+            return not_modified
+        results = serialize_message_rows(_message_page_queryset(pk, since, limit))
+        return _conditional(request, etag, Response({
+            "results": results,
+            "lastSeq": (results[-1]["sequence"] if results else since),
+        }))
 
     def post(self, request: Request, pk: int) -> Response:
         conv = get_object_or_404(Conversation, pk=pk)
@@ -138,29 +312,85 @@ class MessageListCreateView(APIView):
         serializer.is_valid(raise_exception=True)
         text: str = serializer.validated_data["text"].strip()
 
+        if _wants_queued_reply(request.query_params, request.headers):
+            payload, headers = _accept_queued_reply(conv, text)
+            return Response(payload, status=status.HTTP_202_ACCEPTED, headers=headers)
+
         # Persist user message
         user_msg = Message.objects.create(conversation=conv, role=Message.ROLE_USER, text=text)
 
-        # Build short history context (last 10 messages)
-        history = list(
-            conv.messages.order_by("-sequence").values("role", "text")[:10]
-        )[::-1]
+        # Summary + recent turns that fit the context token budget
+        history = context.build_history(conv, text, before_sequence=user_msg.sequence)
+
+        if request.query_params.get("stream") in ("1", "true"):
+            return _event_stream_response(
+                _stream_reply_events(conv, MessageSerializer(user_msg).data, history, text)
+            )
 
         try:
-            reply = gemini.generate_reply(history=history, prompt=text, timeout_s=10)
+            reply = reply_cache.generate_reply(history=history, prompt=text, timeout_s=10)
         except gemini.GeminiServiceError as e:
-            if settings.DEBUG or getattr(settings, "GEMINI_ALLOW_FALLBACK", False):
+            if gemini.fallback_allowed():
+                metrics.record_fallback("generate_reply")
                 reply = f"(Gemini unavailable) {e}"
             else:
                 return Response({"detail": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
 
         ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text=reply)
+        context.schedule_summary_refresh(conv.pk)
         return Response({
             "user_message": MessageSerializer(user_msg).data,
             "ai_message": MessageSerializer(ai_msg).data,
         }, status=status.HTTP_201_CREATED)
 
 
+class ReplyJobDetailView(APIView):
+    def get(self, request: Request, pk: int, job_id: int) -> Response:
+        job = get_object_or_404(ReplyJob, pk=job_id, conversation_id=pk, conversation__deleted_at__isnull=True)
+        return Response(ReplyJobSerializer(job).data)
+
+
+class MessageImportView(APIView):
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request: Request, pk: int) -> Response:
+        conv = get_object_or_404(Conversation, pk=pk)
+        data = request.data
+        # JSON: a list of messages or {"messages": [...]}; NDJSON: one message per line
+        messages = data.get("messages") if isinstance(data, dict) else data
+        if not isinstance(messages, (list, Iterator)):
+            return Response({"detail": "Expected a list of messages."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                imported = import_transcript(conv, messages)
+        except TranscriptError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        conv.refresh_from_db(fields=["last_sequence"])
+        return Response(
+            {"imported": imported, "last_sequence": conv.last_sequence},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class MessageEventsView(APIView):
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
+    def get(self, request: Request, pk: int) -> StreamingHttpResponse:
+        conv = get_object_or_404(Conversation, pk=pk)
+        # EventSource resends the last `id:` it saw when it reconnects
+        try:
+            since = int(request.headers.get("Last-Event-ID") or request.query_params.get("since", 0))
+        except ValueError:
+            since = 0
+        if isinstance(request._request, ASGIRequest):
+            stream = _message_event_stream(conv.pk, since)
+        else:
+            # A WSGI worker cannot idle on a subscription without being pinned to it:
+            # send the backlog and let EventSource reconnect after `retry`.
+            stream = _message_event_backlog(conv.pk, since)
+        return _event_stream_response(stream)
+
+
 class MessageFeedbackView(APIView):
     def post(self, request: Request, pk: int, message_id: int) -> Response:
         conv = get_object_or_404(Conversation, pk=pk)
@@ -187,20 +417,80 @@ class MessageFeedbackView(APIView):
         )
 
 
+class MessageSearchView(APIView):
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request: Request) -> Response:
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"detail": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 20)), 100))
+        except ValueError:
+            limit = 20
+        conversation_id = request.query_params.get("conversation") or None
+        try:
+            conversation_id = int(conversation_id) if conversation_id is not None else None
+        except ValueError:
+            return Response({"detail": "conversation must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            results, next_cursor = search.search_messages(
+                query, conversation_id=conversation_id, cursor=request.query_params.get("cursor"), limit=limit
+            )
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": results, "next_cursor": next_cursor, "limit": limit})
+
+
+class ExportView(APIView):
+    # ?format=ndjson (the default) or ?format=csv, or the matching Accept header
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        conversation_id = request.query_params.get("conversation") or None
+        try:
+            conversation_id = int(conversation_id) if conversation_id is not None else None
+        except ValueError:
+            return Response({"detail": "conversation must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            since = export.parse_bound(request.query_params.get("since"))
+            until = export.parse_bound(request.query_params.get("until"))
+        except export.ExportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if conversation_id is not None and not Conversation.objects.filter(pk=conversation_id).exists():
+            raise Http404("No Conversation matches the given query.")
+
+        fmt = request.accepted_renderer.format
+        compress = request.query_params.get("gzip") in ("1", "true")
+        stream = export.stream_export(export.export_queryset(conversation_id, since, until), fmt, compress)
+        if isinstance(request._request, ASGIRequest):
+            stream = export.aiter_blocks(stream)
+        filename = f"conversation-{conversation_id}.{fmt}" if conversation_id is not None else f"conversations.{fmt}"
+        content_type = f"{request.accepted_renderer.media_type}; charset=utf-8"
+        if compress:
+            content_type = "application/gzip"
+            filename += ".gz"
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 class InsightsView(APIView):
     def get(self, request: Request) -> Response:
-        return Response(_build_feedback_summary())
+        return Response(insights.get_feedback_summary())
 
 
 class ActionableInsightsView(APIView):
     throttle_classes = [InsightsRateThrottle]
 
     def post(self, request: Request) -> Response:
-        summary = _build_feedback_summary()
+        summary = insights.get_feedback_summary()
         try:
-            text = gemini.generate_actionable_insights(summary, timeout_s=15)
+            text = insights.get_actionable_insights(summary, timeout_s=15)
         except gemini.GeminiServiceError as e:
-            if settings.DEBUG or getattr(settings, "GEMINI_ALLOW_FALLBACK", False):
+            if gemini.fallback_allowed():
+                metrics.record_fallback("generate_actionable_insights")
                 text = f"(Gemini unavailable) {e}"
             else:
                 return Response({"detail": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
@@ -1,7 +1,16 @@
 // Chat client with feedback collection and insights view
 import '../tailwind.css'
 
-type Conversation = { id: number; title: string | null; created_at: string; updated_at: string }
+type Conversation = {
+  id: number
+  title: string | null
+  created_at: string
+  updated_at: string
+  message_count: number
+  last_sequence: number
+  last_message_preview: string
+  last_message_role: '' | 'user' | 'ai'
+}
 
 type Feedback = {
   id: number
@@ -61,7 +70,7 @@ const state = {
   current: null as Conversation | null,
   messages: [] as Message[],
   lastSeq: 0,
-  pollTimer: 0 as any,
+  eventSource: null as EventSource | null,
   feedbackDrafts: {} as Record<number, string>,
   feedbackChoices: {} as Record<number, 'helpful' | 'not' | null>,
   feedbackSubmitting: {} as Record<number, boolean>,
@@ -130,6 +139,7 @@ async function deleteConversation(conversationId: number) {
   const next = state.conversations[0] ?? null
 
   if (wasCurrent) {
+    unsubscribeFromMessages()
     state.current = null
     state.messages = []
     state.lastSeq = 0
@@ -160,25 +170,77 @@ function selectConversation(conversationId: number) {
   state.feedbackSubmitting = {}
   state.showInsights = false
   render()
-  loadMessages()
+  subscribeToMessages()
 }
 
-async function loadMessages() {
+// New messages are pushed over SSE; the server replays everything after
+// `since` (or the Last-Event-ID on reconnect) before streaming live updates.
+function subscribeToMessages() {
+  unsubscribeFromMessages()
   if (!state.current) return
-  const data = await api<{ results: Message[]; lastSeq: number }>(
-    `conversations/${state.current.id}/messages/?since=${state.lastSeq}`
-  )
-  if (data.results.length) {
-    state.messages.push(...data.results)
-    state.lastSeq = data.lastSeq
+  const conversationId = state.current.id
+  const source = new EventSource(`/api/conversations/${conversationId}/events/?since=${state.lastSeq}`)
+  source.addEventListener('message', (event) => {
+    if (state.current?.id !== conversationId) return
+    upsertMessage(JSON.parse((event as MessageEvent).data) as Message)
     render()
     scrollChatToBottom()
+  })
+  state.eventSource = source
+}
+
+function unsubscribeFromMessages() {
+  state.eventSource?.close()
+  state.eventSource = null
+}
+
+async function readEventStream(
+  body: ReadableStream<Uint8Array>,
+  onEvent: (event: string, data: any) => void
+) {
+  const reader = body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary >= 0) {
+      const frame = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      const dataLines: string[] = []
+      frame.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart())
+      })
+      if (dataLines.length) onEvent(event, JSON.parse(dataLines.join('\n')))
+      boundary = buffer.indexOf('\n\n')
+    }
+  }
+}
+
+// Both the live event stream and a streamed POST can deliver the same message;
+// keep one copy and drop the optimistic placeholder it replaces.
+function upsertMessage(message: Message, tempId?: string) {
+  const existing = state.messages.findIndex((m) => m.id === message.id)
+  const temp = tempId ? state.messages.findIndex((m) => m.tempId === tempId) : -1
+  if (existing >= 0) {
+    state.messages.splice(existing, 1, message)
+    if (temp >= 0) state.messages.splice(temp, 1)
+  } else if (temp >= 0) {
+    state.messages.splice(temp, 1, message)
+  } else {
+    state.messages.push(message)
   }
+  state.lastSeq = Math.max(state.lastSeq, message.sequence)
 }
 
 async function sendMessage(text: string) {
   if (!state.current) return
   const tempId = `tmp-${Date.now()}`
+  const aiTempId = `${tempId}-ai`
   const optimistic: Message = {
     id: -1,
     conversation: state.current.id,
@@ -194,26 +256,51 @@ async function sendMessage(text: string) {
   scrollChatToBottom()
 
   try {
-    const res = await api<{ user_message: Message; ai_message: Message }>(
-      `conversations/${state.current.id}/messages/`,
-      {
-        method: 'POST',
-        body: JSON.stringify({ text }),
+    const resp = await fetch(`/api/conversations/${state.current.id}/messages/?stream=1`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'same-origin',
+      body: JSON.stringify({ text }),
+    })
+    if (!resp.ok || !resp.body) {
+      throw new Error((await resp.text()) || resp.statusText)
+    }
+    let streamError = ''
+    await readEventStream(resp.body, (event, data) => {
+      if (event === 'user_message') {
+        upsertMessage(data as Message, tempId)
+      } else if (event === 'chunk') {
+        const streaming = state.messages.find((m) => m.tempId === aiTempId)
+        if (streaming) {
+          streaming.text += data.text
+        } else {
+          state.messages.push({
+            id: -1,
+            conversation: optimistic.conversation,
+            role: 'ai',
+            text: data.text,
+            created_at: new Date().toISOString(),
+            sequence: 0,
+            tempId: aiTempId,
+            pending: true,
+          })
+        }
+      } else if (event === 'ai_message') {
+        upsertMessage(data as Message, aiTempId)
+      } else if (event === 'error') {
+        streamError = data.detail ?? 'Failed to generate a reply.'
       }
-    )
-    const idx = state.messages.findIndex((m) => m.tempId === tempId)
-    if (idx >= 0) {
-      state.messages.splice(idx, 1, res.user_message)
-    } else {
-      state.messages.push(res.user_message)
+      render()
+      scrollChatToBottom()
+    })
+    if (streamError) {
+      const idx = state.messages.findIndex((m) => m.tempId === aiTempId)
+      if (idx >= 0) state.messages.splice(idx, 1)
+      render()
+      alert(`AI reply failed: ${streamError}`)
     }
-    state.messages.push(res.ai_message)
-    state.lastSeq = res.ai_message.sequence
-    render()
-    scrollChatToBottom()
   } catch (err) {
-    const idx = state.messages.findIndex((m) => m.tempId === tempId)
-    if (idx >= 0) state.messages.splice(idx, 1)
+    state.messages = state.messages.filter((m) => m.tempId !== tempId && m.tempId !== aiTempId)
     render()
     alert('Failed to send message. Please try again.')
   }
@@ -292,14 +379,6 @@ async function generateActionableInsights() {
   }
 }
 
-function startPolling() {
-  stopPolling()
-  state.pollTimer = setInterval(loadMessages, 3000)
-}
-function stopPolling() {
-  if (state.pollTimer) clearInterval(state.pollTimer)
-}
-
 function ensureFeedbackState() {
   state.messages.forEach((m) => {
     if (m.role !== 'ai') return
@@ -363,8 +442,12 @@ function render() {
             <div class="flex items-start justify-between gap-2">
               <button data-cid="${c.id}" class="flex-1 text-left">
                 ${escapeHtml(c.title ?? 'Untitled')}
-                <br>
-                <span class="text-xs text-gray-500">${new Date(c.updated_at).toLocaleString()}</span>
+                ${
+                  c.last_message_preview
+                    ? `<span class="block text-xs text-gray-600 truncate">${c.last_message_role === 'ai' ? 'AI: ' : ''}${escapeHtml(c.last_message_preview)}</span>`
+                    : ''
+                }
+                <span class="text-xs text-gray-500">${new Date(c.updated_at).toLocaleString()} · ${c.message_count} messages</span>
               </button>
               <button
                 data-delete-cid="${c.id}"
@@ -520,7 +603,7 @@ function renderMessage(message: Message): string {
     <div class="p-3 rounded ${message.role === 'user' ? 'msg-user' : 'msg-ai'} space-y-2">
       <div class="text-xs text-gray-500">${message.role.toUpperCase()} • ${time}</div>
       <div class="whitespace-pre-wrap">${escapeHtml(message.text)}</div>
-      ${message.role === 'ai' ? renderFeedbackControls(message) : ''}
+      ${message.role === 'ai' && !message.pending ? renderFeedbackControls(message) : ''}
     </div>
   `
 }
@@ -792,6 +875,5 @@ function formatPercent(value: number): string {
   link.href = '/static/app/style.css'
   document.head.appendChild(link)
   await loadConversations()
-  await loadMessages()
-  startPolling()
+  subscribeToMessages()
 })()
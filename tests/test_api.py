@@ -214,3 +214,555 @@ def test_insights_endpoint(client):
     assert isinstance(data["per_conversation"], list)
     assert any(item["conversation_id"] == conv1.id for item in data["per_conversation"])
     assert len(data["recent_feedback"]) <= 10
+
+
+def _parse_sse(body: bytes) -> list:
+    events = []
+    for frame in body.decode().strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.django_db
+@pytest.mark.filterwarnings("ignore:StreamingHttpResponse must consume")
+def test_message_streaming_sends_chunks_then_saves_reply(client, monkeypatch):
+    conv = Conversation.objects.create(title="Stream")
+
+    from chat.services import gemini
+
+    def fake_stream_reply(history, prompt, timeout_s=10):
+        assert prompt == "Hello"
+        yield "Hi "
+        yield "there!"
+
+    monkeypatch.setattr(gemini, "stream_reply", fake_stream_reply)
+
+    url = f"/api/conversations/{conv.id}/messages/?stream=1"
+    resp = client.post(url, data=json.dumps({"text": "Hello"}), content_type="application/json")
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "text/event-stream"
+    events = _parse_sse(b"".join(resp))
+
+    assert [name for name, _ in events] == ["user_message", "chunk", "chunk", "ai_message"]
+    assert events[0][1]["text"] == "Hello"
+    assert [data["text"] for name, data in events if name == "chunk"] == ["Hi ", "there!"]
+    assert events[-1][1]["text"] == "Hi there!"
+    assert events[-1][1]["sequence"] == 2
+    assert Message.objects.get(conversation=conv, role=Message.ROLE_AI).text == "Hi there!"
+
+
+@pytest.mark.django_db
+@pytest.mark.filterwarnings("ignore:StreamingHttpResponse must consume")
+def test_message_streaming_reports_error_without_fallback(client, monkeypatch, settings):
+    settings.DEBUG = False
+    conv = Conversation.objects.create(title="Stream")
+
+    from chat.services import gemini
+
+    def failing_stream(history, prompt, timeout_s=10):
+        raise gemini.GeminiServiceError("service down")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(gemini, "stream_reply", failing_stream)
+
+    url = f"/api/conversations/{conv.id}/messages/?stream=1"
+    resp = client.post(url, data=json.dumps({"text": "Hello"}), content_type="application/json")
+    events = _parse_sse(b"".join(resp))
+
+    assert [name for name, _ in events] == ["user_message", "error"]
+    assert "service down" in events[-1][1]["detail"]
+    assert not Message.objects.filter(conversation=conv, role=Message.ROLE_AI).exists()
+
+
+@pytest.mark.django_db
+def test_async_message_flow_with_mocked_gemini(rf, monkeypatch):
+    from asgiref.sync import async_to_sync
+    from chat.async_views import AsyncMessageListCreateView
+    from chat.services import gemini
+
+    cache.clear()
+    conv = Conversation.objects.create(title="Async")
+
+    async def fake_generate_reply_async(history, prompt, timeout_s=10):
+        # The new message is the prompt, not part of the history
+        assert history == []
+        assert prompt == "Hello"
+        return "Hi there!"
+
+    monkeypatch.setattr(gemini, "generate_reply_async", fake_generate_reply_async)
+    view = AsyncMessageListCreateView.as_view()
+
+    request = rf.post(
+        f"/api/conversations/{conv.id}/messages/",
+        data=json.dumps({"text": "Hello"}),
+        content_type="application/json",
+    )
+    send = async_to_sync(view)(request, pk=conv.id)
+    assert send.status_code == 201
+    payload = json.loads(send.content)
+    assert payload["user_message"]["sequence"] == 1
+    assert payload["ai_message"]["text"] == "Hi there!"
+
+    listing = async_to_sync(view)(rf.get(f"/api/conversations/{conv.id}/messages/?since=1"), pk=conv.id)
+    data = json.loads(listing.content)
+    assert [m["role"] for m in data["results"]] == ["ai"]
+    assert data["results"][0]["feedback"] is None
+    assert data["lastSeq"] == 2
+
+
+@pytest.mark.django_db
+def test_async_message_view_validates_and_throttles(rf, monkeypatch, settings):
+    from asgiref.sync import async_to_sync
+    from chat.async_views import AsyncMessageListCreateView
+    from chat.services import gemini
+
+    cache.clear()
+    settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]["message"] = "1/minute"
+    conv = Conversation.objects.create(title="Async")
+
+    async def fake_generate_reply_async(history, prompt, timeout_s=10):
+        return "ok"
+
+    monkeypatch.setattr(gemini, "generate_reply_async", fake_generate_reply_async)
+    view = async_to_sync(AsyncMessageListCreateView.as_view())
+    url = f"/api/conversations/{conv.id}/messages/"
+
+    invalid = view(rf.post(url, data=json.dumps({"text": "  "}), content_type="application/json"), pk=conv.id)
+    assert invalid.status_code == 400
+    assert "text" in json.loads(invalid.content)
+
+    throttled = view(rf.post(url, data=json.dumps({"text": "Hello"}), content_type="application/json"), pk=conv.id)
+    assert throttled.status_code == 429
+    assert "throttled" in json.loads(throttled.content)["detail"].lower()
+
+
+@pytest.mark.django_db
+def test_async_message_view_errors_match_sync_views(client, rf, monkeypatch, settings):
+    from asgiref.sync import async_to_sync
+    from chat.async_views import AsyncMessageListCreateView
+
+    monkeypatch.setitem(settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "message", None)
+    conv = Conversation.objects.create(title="Async")
+    view = async_to_sync(AsyncMessageListCreateView.as_view())
+    missing = "/api/conversations/999/messages/"
+    url = f"/api/conversations/{conv.id}/messages/"
+
+    cases = [
+        (rf.get(missing), client.get(missing), 999),
+        (rf.post(missing, data="{}", content_type="application/json"),
+         client.post(missing, data="{}", content_type="application/json"), 999),
+        (rf.post(url, data="{bad", content_type="application/json"),
+         client.post(url, data="{bad", content_type="application/json"), conv.id),
+        (rf.post(url, data="[1]", content_type="application/json"),
+         client.post(url, data="[1]", content_type="application/json"), conv.id),
+    ]
+    for request, expected, pk in cases:
+        resp = view(request, pk=pk)
+        assert resp.status_code == expected.status_code
+        assert resp["Content-Type"] == "application/json"
+        assert json.loads(resp.content) == expected.json()
+
+
+@pytest.mark.django_db
+def test_async_insights_views_match_sync_payload(client, rf, monkeypatch, settings):
+    from asgiref.sync import async_to_sync
+    from chat.async_views import AsyncActionableInsightsView, AsyncInsightsView
+    from chat.services import gemini
+
+    cache.clear()
+    settings.DEBUG = False
+    conv = Conversation.objects.create(title="Data")
+    msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="Answer")
+    MessageFeedback.objects.create(message=msg, is_helpful=True, comment="Nice")
+
+    summary = async_to_sync(AsyncInsightsView.as_view())(rf.get("/api/insights/"))
+    assert json.loads(summary.content) == client.get("/api/insights/").json()
+
+    async def boom(summary, timeout_s=15):
+        raise gemini.GeminiServiceError("nope")
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights_async", boom)
+    resp = async_to_sync(AsyncActionableInsightsView.as_view())(rf.post("/api/insights/actionable/"))
+    assert resp.status_code == 502
+
+
+@pytest.mark.django_db
+def test_message_events_sends_backlog_after_last_event_id(client):
+    conv = Conversation.objects.create(title="Live")
+    for text in ("one", "two", "three"):
+        Message.objects.create(conversation=conv, role=Message.ROLE_USER, text=text)
+
+    url = f"/api/conversations/{conv.id}/events/"
+    resp = client.get(url, HTTP_ACCEPT="text/event-stream", HTTP_LAST_EVENT_ID="1")
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "text/event-stream"
+    body = b"".join(resp).decode()
+    assert body.startswith("retry: ")
+    events = _parse_sse(body.split("\n\n", 1)[1].encode())
+    assert [data["text"] for _, data in events] == ["two", "three"]
+    assert "id: 3\n" in body
+
+    missing = client.get("/api/conversations/999999/events/", HTTP_ACCEPT="text/event-stream")
+    assert missing.status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_message_event_stream_wakes_on_publish(settings, monkeypatch):
+    import asyncio
+    import threading
+
+    from asgiref.sync import async_to_sync, sync_to_async
+    from chat import views
+    from chat.events import conversation_events
+    from chat.views import _message_event_stream
+
+    settings.CHAT_EVENTS_HEARTBEAT_S = 5
+    read_threads = set()
+    messages_after = views._messages_after
+
+    def recording_messages_after(conversation_id, since):
+        read_threads.add(threading.get_ident())
+        return messages_after(conversation_id, since)
+
+    monkeypatch.setattr(views, "_messages_after", recording_messages_after)
+    conv = Conversation.objects.create(title="Live")
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="backlog")
+
+    async def consume():
+        stream = _message_event_stream(conv.id, since=0)
+        frames = [await stream.__anext__(), await stream.__anext__()]
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        assert conversation_events.subscriber_count(conv.id) == 1
+
+        def write():
+            Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="pushed")
+            conversation_events.publish(conv.id)
+
+        await sync_to_async(write)()
+        frames.append(await asyncio.wait_for(pending, timeout=2))
+        await stream.aclose()
+        return frames
+
+    frames = async_to_sync(consume)()
+    assert frames[0].startswith("retry: ")
+    assert '"backlog"' in frames[1] and frames[1].startswith("id: 1\n")
+    assert '"pushed"' in frames[2] and frames[2].startswith("id: 2\n")
+    assert conversation_events.subscriber_count(conv.id) == 0
+    # Reads run on pool threads, not the thread sync work for this request is pinned to
+    assert read_threads and threading.get_ident() not in read_threads
+
+
+@pytest.mark.django_db
+def test_import_transcript_json_appends_in_order(client):
+    conv = Conversation.objects.create(title="Import")
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="existing")
+    transcript = {
+        "messages": [
+            {"role": "user", "text": "Hi", "created_at": "2023-05-01T10:00:00Z"},
+            {"role": "ai", "text": "Hello!", "created_at": "2023-05-01T10:00:05Z"},
+        ]
+    }
+
+    resp = client.post(
+        f"/api/conversations/{conv.id}/messages/import/",
+        data=json.dumps(transcript),
+        content_type="application/json",
+    )
+    assert resp.status_code == 201
+    assert resp.json() == {"imported": 2, "last_sequence": 3}
+    rows = list(conv.messages.order_by("sequence").values_list("sequence", "role", "text"))
+    assert rows == [(1, "user", "existing"), (2, "user", "Hi"), (3, "ai", "Hello!")]
+    assert conv.messages.get(sequence=2).created_at.year == 2023
+
+
+@pytest.mark.django_db
+def test_import_transcript_ndjson_is_all_or_nothing(client):
+    conv = Conversation.objects.create(title="Import")
+    url = f"/api/conversations/{conv.id}/messages/import/"
+    good = '{"role": "user", "text": "one"}\n\n{"role": "ai", "text": "two"}\n'
+
+    resp = client.post(url, data=good, content_type="application/x-ndjson")
+    assert resp.status_code == 201
+    assert resp.json()["imported"] == 2
+
+    bad = '{"role": "user", "text": "three"}\n{"role": "robot", "text": "four"}\n'
+    resp = client.post(url, data=bad, content_type="application/x-ndjson")
+    assert resp.status_code == 400
+    assert "role" in resp.json()["detail"]
+
+    latin1 = '{"role": "user", "text": "five"}\n{"role": "user", "text": "caf\xe9"}\n'.encode("latin-1")
+    resp = client.post(url, data=latin1, content_type="application/x-ndjson")
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Line 2: not valid UTF-8"
+    conv.refresh_from_db()
+    assert conv.messages.count() == 2
+    assert conv.last_sequence == 2
+
+
+@pytest.mark.django_db
+def test_import_transcript_command_batches_ndjson(tmp_path):
+    from django.core.management import call_command
+
+    path = tmp_path / "history.ndjson"
+    path.write_text(
+        "\n".join(json.dumps({"role": "user" if i % 2 == 0 else "ai", "text": f"m{i}"}) for i in range(25))
+    )
+
+    call_command("import_transcript", str(path), "--title", "Archive", "--batch-size", "10")
+
+    conv = Conversation.objects.get(title="Archive")
+    assert list(conv.messages.values_list("sequence", flat=True)) == list(range(1, 26))
+    assert conv.last_sequence == 25
+
+
+@pytest.mark.django_db
+def test_insights_summary_is_cached_and_invalidated_by_feedback(client, django_assert_num_queries):
+    cache.clear()
+    conv = Conversation.objects.create(title="Cached")
+    ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="Assistant reply")
+    feedback_url = f"/api/conversations/{conv.id}/messages/{ai_msg.id}/feedback/"
+
+    client.post(feedback_url, data=json.dumps({"is_helpful": True}), content_type="application/json")
+    first = client.get("/api/insights/").json()
+    assert (first["total_feedback"], first["helpful_count"]) == (1, 1)
+
+    with django_assert_num_queries(0):
+        assert client.get("/api/insights/").json() == first
+
+    client.post(feedback_url, data=json.dumps({"is_helpful": False}), content_type="application/json")
+    updated = client.get("/api/insights/").json()
+    assert (updated["total_feedback"], updated["helpful_count"], updated["not_helpful_count"]) == (1, 0, 1)
+    assert updated["per_conversation"][0]["helpful_rate"] == 0.0
+
+    conv.refresh_from_db()
+    assert (conv.feedback_count, conv.helpful_feedback_count) == (1, 0)
+    assert conv.last_feedback_at == MessageFeedback.objects.get(message=ai_msg).created_at
+
+
+@pytest.mark.django_db
+def test_actionable_insights_are_memoized_per_summary(client, monkeypatch):
+    cache.clear()
+    conv = Conversation.objects.create(title="Data")
+    msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="Answer")
+    MessageFeedback.objects.create(message=msg, is_helpful=False, comment="Too short")
+
+    from chat.services import gemini
+
+    calls = []
+
+    def fake_insights(summary, timeout_s=15):
+        calls.append(summary["total_feedback"])
+        return f"- Review {summary['total_feedback']} items"
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights", fake_insights)
+
+    first = client.post("/api/insights/actionable/").json()
+    second = client.post("/api/insights/actionable/").json()
+    assert first == second == {"insights": "- Review 1 items"}
+    assert calls == [1]
+
+    other = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="Another")
+    MessageFeedback.objects.create(message=other, is_helpful=True)
+    assert client.post("/api/insights/actionable/").json() == {"insights": "- Review 2 items"}
+    assert calls == [1, 2]
+
+
+@pytest.mark.django_db
+def test_conversation_list_keyset_pagination(client):
+    from django.utils import timezone
+
+    same_time = timezone.now()
+    convs = [Conversation.objects.create(title=f"c{i}") for i in range(5)]
+    Conversation.objects.filter(pk__in=[c.pk for c in convs[:3]]).update(updated_at=same_time)
+    expected = list(Conversation.objects.order_by("-updated_at", "id").values_list("id", flat=True))
+
+    first = client.get("/api/conversations/?limit=2").json()
+    assert "count" not in first
+    assert [c["id"] for c in first["results"]] == expected[:2]
+
+    # A conversation touched mid-walk moves ahead of the cursor instead of shifting pages
+    Message.objects.create(conversation_id=expected[0], role=Message.ROLE_USER, text="bump")
+
+    seen = [c["id"] for c in first["results"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(f"/api/conversations/?limit=2&cursor={cursor}").json()
+        seen.extend(c["id"] for c in page["results"])
+        cursor = page["next_cursor"]
+    assert seen == expected
+
+    counted = client.get("/api/conversations/?limit=2&count=1").json()
+    assert counted["count"] == 5
+    assert client.get("/api/conversations/?cursor=not-a-cursor").status_code == 400
+
+
+@pytest.mark.django_db
+def test_conversation_list_offset_mode_still_counts(client):
+    for i in range(3):
+        Conversation.objects.create(title=f"c{i}")
+    data = client.get("/api/conversations/?offset=1&limit=1").json()
+    assert data["count"] == 3
+    assert data["offset"] == 1
+    assert len(data["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_message_list_query_count_is_constant(client, django_assert_num_queries):
+    conv = Conversation.objects.create(title="Busy")
+    for i in range(30):
+        ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text=f"reply {i}")
+        if i % 2:
+            MessageFeedback.objects.create(message=ai_msg, is_helpful=True)
+
+    url = f"/api/conversations/{conv.id}/messages/?limit=200"
+    # The conversation's validator row, then one joined query for the page
+    with django_assert_num_queries(2):
+        data = client.get(url).json()
+    assert len(data["results"]) == 30
+    assert sum(1 for m in data["results"] if m["feedback"]) == 15
+
+    with django_assert_num_queries(2):
+        assert client.get(f"{url}&since=30").json() == {"results": [], "lastSeq": 30}
+    assert client.get("/api/conversations/999999/messages/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_message_create_does_not_query_feedback(client, monkeypatch, django_assert_num_queries):
+    cache.clear()
+    conv = Conversation.objects.create(title="Send")
+    from chat.services import gemini
+
+    monkeypatch.setattr(gemini, "generate_reply", lambda history, prompt, timeout_s=10: "ok")
+
+    # conversation, history, and per message: savepoint, sequence, insert, release
+    with django_assert_num_queries(10):
+        resp = client.post(
+            f"/api/conversations/{conv.id}/messages/",
+            data=json.dumps({"text": "Hello"}),
+            content_type="application/json",
+        )
+    assert resp.json()["ai_message"]["feedback"] is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_list_payloads_match_drf_serializers(client, monkeypatch, use_orjson):
+    from rest_framework.renderers import JSONRenderer
+    from chat.serializers import ConversationSerializer, MessageSerializer
+
+    if not use_orjson:
+        monkeypatch.setattr("chat.renderers.orjson", None)
+
+    conv = Conversation.objects.create(title="Fast   path")
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="café \"quoted\"  ")
+    ai = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="reply\nline")
+    Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="no\u2028feedback")
+    MessageFeedback.objects.create(message=ai, is_helpful=False, comment="meh  ")
+
+    messages = Message.objects.filter(conversation=conv).select_related("feedback").order_by("sequence")
+    expected = JSONRenderer().render({
+        "results": MessageSerializer(messages, many=True).data,
+        "lastSeq": 3,
+    })
+    resp = client.get(f"/api/conversations/{conv.id}/messages/")
+    assert resp.status_code == 200
+    assert resp.content == expected
+
+    conv.refresh_from_db()
+    expected = JSONRenderer().render({
+        "results": ConversationSerializer([conv], many=True).data,
+        "count": 1,
+        "offset": 0,
+        "limit": 20,
+    })
+    resp = client.get("/api/conversations/?offset=0")
+    assert resp.content == expected
+
+
+@pytest.mark.django_db
+def test_message_list_answers_if_none_match_with_304(client, django_assert_num_queries):
+    conv = Conversation.objects.create(title="Poll")
+    ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="first")
+    url = f"/api/conversations/{conv.id}/messages/?since=0"
+
+    first = client.get(url)
+    etag = first["ETag"]
+    assert first["Cache-Control"] == "private, no-cache"
+
+    # Only the conversation row is read; no message rows, no serialization
+    with django_assert_num_queries(1):
+        resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp["ETag"] == etag
+
+    assert client.get(f"{url}&limit=10", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    feedback = MessageFeedback.objects.create(message=ai_msg, is_helpful=True)
+    after_feedback = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert after_feedback.status_code == 200
+    feedback.comment = "edited"
+    feedback.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=after_feedback["ETag"]).status_code == 200
+
+    latest = client.get(url)["ETag"]
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="second")
+    resp = client.get(url, HTTP_IF_NONE_MATCH=latest)
+    assert resp.status_code == 200
+    assert [m["text"] for m in resp.json()["results"]] == ["first", "second"]
+
+
+@pytest.mark.django_db
+def test_async_message_list_answers_if_none_match_with_304(rf):
+    from asgiref.sync import async_to_sync
+    from chat.async_views import AsyncMessageListCreateView
+
+    conv = Conversation.objects.create()
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="hi")
+    view = AsyncMessageListCreateView.as_view()
+    url = f"/api/conversations/{conv.id}/messages/"
+
+    etag = async_to_sync(view)(rf.get(url), pk=conv.id)["ETag"]
+    resp = async_to_sync(view)(rf.get(url, HTTP_IF_NONE_MATCH=etag), pk=conv.id)
+    assert resp.status_code == 304
+
+
+@pytest.mark.django_db
+def test_conversation_reads_answer_if_none_match_with_304(client):
+    conv = Conversation.objects.create(title="Before")
+    detail_url = f"/api/conversations/{conv.id}/"
+
+    for url in ("/api/conversations/", "/api/conversations/?offset=0", detail_url):
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    list_etag = client.get("/api/conversations/")["ETag"]
+    detail_etag = client.get(detail_url)["ETag"]
+    conv.title = "After"
+    conv.save()
+    assert client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).json()["title"] == "After"
+    assert client.get("/api/conversations/", HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+    list_etag = client.get("/api/conversations/")["ETag"]
+    Conversation.objects.create(title="New")
+    assert client.get("/api/conversations/", HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_conversation_list_includes_read_model_in_one_query(client, django_assert_num_queries):
+    for i in range(5):
+        conv = Conversation.objects.create(title=f"Chat {i}")
+        for j in range(i + 1):
+            Message.objects.create(conversation=conv, role=Message.ROLE_USER, text=f"msg {j} of {i}")
+
+    with django_assert_num_queries(1):
+        data = client.get("/api/conversations/?limit=50").json()
+
+    newest = data["results"][0]
+    assert newest["title"] == "Chat 4"
+    assert newest["message_count"] == 5
+    assert newest["last_sequence"] == 5
+    assert newest["last_message_preview"] == "msg 4 of 4"
+    assert newest["last_message_role"] == Message.ROLE_USER
@@ -0,0 +1,118 @@
+import pytest
+
+from chat.models import Conversation, Message
+from chat.services import context, gemini
+
+
+def _add(conv, count, text="x" * 40):
+    for i in range(count):
+        role = Message.ROLE_USER if i % 2 == 0 else Message.ROLE_AI
+        Message.objects.create(conversation=conv, role=role, text=f"{i}:{text}")
+
+
+@pytest.fixture
+def small_budget(settings):
+    # _add messages are 11 tokens each; the budget fits 4 of them next to a short prompt
+    settings.CHAT_CONTEXT_TOKEN_BUDGET = 50
+    settings.CHAT_CONTEXT_MAX_TURN_TOKENS = 20
+    settings.CHAT_CONTEXT_SUMMARY_TOKENS = 10
+    settings.CHAT_CONTEXT_SUMMARY_BATCH = 4
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    calls = []
+
+    def fake_summarize(previous, messages, max_words=200, timeout_s=10):
+        calls.append((previous, [m["text"][:2] for m in messages]))
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(gemini, "summarize_conversation", fake_summarize)
+    return calls
+
+
+@pytest.mark.django_db
+def test_history_keeps_recent_turns_within_budget(small_budget, summaries):
+    conv = Conversation.objects.create()
+    _add(conv, 3)
+    Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="y" * 1000)
+
+    history = context.build_history(conv, "hi", before_sequence=5)
+
+    # The huge reply is clipped to the per-turn limit, and only the newest turns fit
+    assert [m["text"][:2] for m in history] == ["1:", "2:", "yy"]
+    assert history[-1]["text"].endswith("…")
+    total = sum(context.estimate_tokens(m["text"]) for m in history) + context.estimate_tokens("hi")
+    assert total <= 50
+    assert summaries == []
+
+
+@pytest.mark.django_db
+def test_summary_is_refreshed_incrementally(small_budget, summaries):
+    conv = Conversation.objects.create()
+    _add(conv, 8)
+
+    # Building the reply context never waits on a summary call
+    history = context.build_history(conv, "hi", before_sequence=9)
+    assert summaries == []
+    assert [m["text"][:2] for m in history] == ["4:", "5:", "6:", "7:"]
+
+    assert context.refresh_summary_if_due(conv.id)
+    conv.refresh_from_db()
+    history = context.build_history(conv, "hi", before_sequence=9)
+    assert summaries == [("", ["0:", "1:", "2:", "3:"])]
+    assert history[0] == {"role": gemini.SUMMARY_ROLE, "text": "summary 1"}
+    assert [m["text"][:2] for m in history[1:]] == ["4:", "5:", "6:", "7:"]
+    conv.refresh_from_db()
+    assert (conv.context_summary, conv.context_summary_sequence) == ("summary 1", 4)
+
+    # Two more turns push two messages out: below the batch size, no new call
+    _add(conv, 2)
+    assert not context.refresh_summary_if_due(conv.id)
+    assert len(summaries) == 1
+
+    _add(conv, 2)
+    assert context.refresh_summary_if_due(conv.id)
+    assert summaries[1] == ("summary 1", ["4:", "5:", "6:", "7:"])
+    conv.refresh_from_db()
+    assert (conv.context_summary, conv.context_summary_sequence) == ("summary 2", 8)
+
+
+@pytest.mark.django_db
+def test_summary_failure_keeps_previous_summary(small_budget, monkeypatch):
+    conv = Conversation.objects.create()
+    _add(conv, 8)
+
+    def failing(previous, messages, max_words=200, timeout_s=10):
+        raise gemini.GeminiServiceError("down")
+
+    monkeypatch.setattr(gemini, "summarize_conversation", failing)
+    context.refresh_summary_if_due(conv.id)
+    conv.refresh_from_db()
+    history = context.build_history(conv, "hi", before_sequence=9)
+
+    assert [m["text"][:2] for m in history] == ["4:", "5:", "6:", "7:"]
+    conv.refresh_from_db()
+    assert (conv.context_summary, conv.context_summary_sequence) == ("", 0)
+
+
+@pytest.mark.django_db
+def test_reply_schedules_summary_refresh_after_commit(
+    client, settings, monkeypatch, django_capture_on_commit_callbacks
+):
+    import json
+
+    monkeypatch.setitem(settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "message", None)
+    monkeypatch.setattr(gemini, "generate_reply", lambda history, prompt, timeout_s=10: "Sure")
+    refreshed = []
+    monkeypatch.setattr(context, "_submit_refresh", refreshed.append)
+    conv = Conversation.objects.create()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.post(
+            f"/api/conversations/{conv.id}/messages/", data=json.dumps({"text": "hi"}), content_type="application/json"
+        )
+        assert resp.status_code == 201
+        assert refreshed == []
+
+    assert refreshed == [conv.id]
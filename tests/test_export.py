@@ -0,0 +1,120 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chat.models import Conversation, Message, MessageFeedback
+
+
+def _conversation(title, turns=2):
+    conv = Conversation.objects.create(title=title)
+    for i in range(turns):
+        Message.objects.create(conversation=conv, role=Message.ROLE_USER, text=f"{title} question {i}")
+        ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text=f"{title} answer, \"quoted\"\n{i}")
+        if i == 0:
+            MessageFeedback.objects.create(message=ai_msg, is_helpful=True, comment="thanks")
+    return conv
+
+
+@pytest.mark.django_db
+def test_ndjson_export_streams_messages_with_feedback_in_one_query(client):
+    conv = _conversation("Audit", turns=3)
+    _conversation("Other")
+
+    resp = client.get("/api/export/", {"conversation": conv.id})
+    assert resp.status_code == 200
+    assert resp.streaming
+    assert resp["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    assert resp["Content-Disposition"] == f'attachment; filename="conversation-{conv.id}.ndjson"'
+    with CaptureQueriesContext(connection) as ctx:
+        body = b"".join(resp.streaming_content)
+    assert len(ctx.captured_queries) == 1
+
+    records = [json.loads(line) for line in body.decode().splitlines()]
+    assert [record["sequence"] for record in records] == list(range(1, 7))
+    assert {record["conversation_id"] for record in records} == {conv.id}
+    assert records[1]["text"] == 'Audit answer, "quoted"\n0'
+    assert records[1]["feedback_is_helpful"] is True
+    assert records[1]["feedback_comment"] == "thanks"
+    assert records[1]["created_at"].endswith("Z")
+    assert records[3]["feedback_is_helpful"] is None
+
+    # The records are valid transcript lines for the importer
+    copy = Conversation.objects.create()
+    resp = client.post(f"/api/conversations/{copy.id}/messages/import/", data=body, content_type="application/x-ndjson")
+    assert resp.json()["imported"] == 6
+
+
+@pytest.mark.django_db
+def test_gzipped_csv_export_of_a_date_range(client):
+    old = _conversation("Old")
+    recent = _conversation("Recent")
+    Conversation.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=10))
+    since = (timezone.now() - timedelta(days=1)).date().isoformat()
+
+    resp = client.get("/api/export/", {"format": "csv", "gzip": "1", "since": since})
+    assert resp["Content-Type"] == "application/gzip"
+    assert resp["Content-Disposition"] == 'attachment; filename="conversations.csv.gz"'
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(b"".join(resp.streaming_content)).decode())))
+    header, rows = rows[0], rows[1:]
+    assert header[:3] == ["conversation_id", "conversation_title", "message_id"]
+    assert len(rows) == 4
+    assert {row[0] for row in rows} == {str(recent.id)}
+    record = dict(zip(header, rows[1]))
+    assert record["text"] == 'Recent answer, "quoted"\n0'
+    assert record["feedback_is_helpful"] == "true"
+    assert dict(zip(header, rows[3]))["feedback_is_helpful"] == ""
+
+
+@pytest.mark.django_db
+def test_export_validates_parameters(client):
+    assert client.get("/api/export/", {"since": "last week"}).status_code == 400
+    assert client.get("/api/export/", {"conversation": "abc"}).status_code == 400
+    assert client.get("/api/export/", {"conversation": 999}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_export_command_writes_file(tmp_path):
+    conv = _conversation("Archive")
+    path = tmp_path / "archive.ndjson.gz"
+
+    call_command("export_conversations", "--conversation", str(conv.id), "--gzip", "-o", str(path), "--chunk-size", "1")
+
+    lines = gzip.decompress(path.read_bytes()).decode().splitlines()
+    assert [json.loads(line)["role"] for line in lines] == ["user", "ai", "user", "ai"]
+
+
+@pytest.mark.django_db
+def test_export_under_asgi_streams_block_by_block():
+    import warnings
+
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+
+    from chat.services.export import BLOCK_SIZE
+    from chat.services.transcripts import import_transcript
+
+    conv = Conversation.objects.create(title="Large")
+    import_transcript(conv, ({"role": "user", "text": f"{i} " + "x" * 4000} for i in range(60)))
+
+    async def download():
+        resp = await AsyncClient().get("/api/export/", {"conversation": conv.id})
+        assert resp.is_async
+        return [chunk async for chunk in resp.streaming_content]
+
+    with warnings.catch_warnings():
+        # Django warns when it has to buffer a sync iterator for ASGI
+        warnings.simplefilter("error")
+        chunks = async_to_sync(download)()
+
+    assert len(chunks) > 1
+    assert all(len(chunk) < 2 * BLOCK_SIZE for chunk in chunks)
+    assert len(b"".join(chunks).splitlines()) == 60
@@ -0,0 +1,299 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from chat.services import gemini
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    calls = {"configure": [], "models": []}
+
+    class FakeModel:
+        def __init__(self, name):
+            self.name = name
+            calls["models"].append(name)
+
+    genai = types.SimpleNamespace(
+        configure=lambda api_key: calls["configure"].append(api_key),
+        GenerativeModel=FakeModel,
+    )
+    google = types.ModuleType("google")
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    monkeypatch.setenv("GEMINI_API_KEY", "key-1")
+    monkeypatch.setenv("GEMINI_MODEL", "models/a")
+    gemini.invalidate_client_cache()
+    yield calls
+    gemini.invalidate_client_cache()
+
+
+def test_client_is_reused_across_calls(fake_genai):
+    first = gemini._get_client()
+    second = gemini._get_client()
+
+    assert first is second
+    assert fake_genai["configure"] == ["key-1"]
+    assert fake_genai["models"] == ["models/a"]
+
+
+def test_client_cache_follows_model_and_key_changes(fake_genai, monkeypatch):
+    original = gemini._get_client()
+
+    monkeypatch.setenv("GEMINI_MODEL", "models/b")
+    other_model = gemini._get_client()
+    assert other_model is not original
+    assert other_model.name == "models/b"
+    assert fake_genai["configure"] == ["key-1"]
+
+    monkeypatch.setenv("GEMINI_API_KEY", "key-2")
+    rotated = gemini._get_client()
+    assert rotated is not other_model
+    assert fake_genai["configure"] == ["key-1", "key-2"]
+
+    gemini.invalidate_client_cache()
+    assert gemini._get_client() is not rotated
+    assert fake_genai["configure"] == ["key-1", "key-2", "key-2"]
+
+
+def test_client_cache_builds_one_model_under_concurrency(fake_genai):
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def worker():
+        barrier.wait()
+        seen.append(gemini._get_client())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(model) for model in seen}) == 1
+    assert fake_genai["models"] == ["models/a"]
+
+
+def test_missing_api_key_raises(fake_genai, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY")
+    with pytest.raises(gemini.GeminiServiceError):
+        gemini._get_client()
+
+
+def test_summary_history_entry_is_sent_as_context():
+    messages = gemini._build_messages(
+        [{"role": gemini.SUMMARY_ROLE, "text": "Talked about cats."}, {"role": "ai", "text": "Meow"}],
+        "And dogs?",
+    )
+
+    assert messages == [
+        {"role": "user", "parts": ["Summary of the earlier conversation:\nTalked about cats."]},
+        {"role": "model", "parts": ["Meow"]},
+        {"role": "user", "parts": ["And dogs?"]},
+    ]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_opens_then_probes_for_recovery():
+    clock = FakeClock()
+    breaker = gemini.CircuitBreaker(failure_threshold=2, reset_timeout_s=10, clock=clock)
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "opened_total": 2,
+        "rejected_total": 2,
+    }
+
+
+def test_aimd_limiter_rejects_over_limit_and_adapts():
+    limiter = gemini.AIMDLimiter(initial=2, minimum=1, maximum=3, latency_threshold_s=1)
+
+    assert limiter.acquire() and limiter.acquire()
+    assert not limiter.acquire()
+
+    # Fast successes add about one slot per round of calls
+    limiter.release(0.1, ok=True)
+    limiter.release(0.1, ok=True)
+    assert limiter.limit == 2
+    assert limiter.acquire()
+    limiter.release(0.1, ok=True)
+    assert limiter.limit == 3
+
+    # Slow calls and failures halve it, down to the minimum
+    for latency, ok in ((5.0, True), (0.1, False)):
+        assert limiter.acquire()
+        limiter.release(latency, ok=ok)
+    assert limiter.limit == 1
+    assert limiter.snapshot() == {"limit": 1, "in_flight": 0, "rejected_total": 1}
+
+
+def test_generate_reply_fails_fast_while_circuit_is_open(monkeypatch):
+    calls = []
+
+    class FailingModel:
+        def generate_content(self, messages, request_options=None):
+            calls.append(messages)
+            raise TimeoutError("deadline exceeded")
+
+    monkeypatch.setattr(gemini, "_get_client", lambda: FailingModel())
+    monkeypatch.setattr(gemini, "circuit_breaker", gemini.CircuitBreaker(failure_threshold=2, reset_timeout_s=60))
+    monkeypatch.setattr(gemini, "concurrency_limiter", gemini.AIMDLimiter())
+
+    for _ in range(2):
+        with pytest.raises(gemini.GeminiServiceError, match="deadline exceeded"):
+            gemini.generate_reply([], "hi", retries=0)
+    with pytest.raises(gemini.GeminiUnavailableError, match="circuit open"):
+        gemini.generate_reply([], "hi", retries=0)
+
+    assert len(calls) == 2
+    assert gemini.upstream_metrics()["circuit"]["state"] == "open"
+    assert gemini.upstream_metrics()["concurrency"]["in_flight"] == 0
+
+
+def test_blocked_responses_are_not_retried_or_counted_as_upstream_failures(monkeypatch):
+    calls = []
+
+    class BlockedResponse:
+        @property
+        def text(self):
+            # What google-generativeai does when a safety filter blocks the candidate
+            raise ValueError("The response.text quick accessor requires a valid Part")
+
+    class BlockingModel:
+        def generate_content(self, messages, request_options=None):
+            calls.append(messages)
+            return BlockedResponse()
+
+    monkeypatch.setattr(gemini, "_get_client", lambda: BlockingModel())
+    monkeypatch.setattr(gemini, "circuit_breaker", gemini.CircuitBreaker(failure_threshold=2, reset_timeout_s=60))
+    monkeypatch.setattr(gemini, "concurrency_limiter", gemini.AIMDLimiter())
+
+    for _ in range(2):
+        with pytest.raises(gemini.GeminiEmptyResponseError, match="Empty response"):
+            gemini.generate_reply([], "hi", retries=2)
+    with pytest.raises(gemini.GeminiEmptyResponseError):
+        gemini.generate_actionable_insights({"totals": {}})
+
+    assert len(calls) == 3
+    assert gemini.upstream_metrics()["circuit"]["state"] == "closed"
+    assert gemini.upstream_metrics()["concurrency"]["in_flight"] == 0
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    """Fresh breaker/limiter/latency state and a FakeGeminiModel installed as the client."""
+    from chat import testing
+
+    monkeypatch.setenv("GEMINI_RETRY_BASE_S", "0.01")
+    monkeypatch.setattr(gemini, "circuit_breaker", gemini.CircuitBreaker(failure_threshold=100))
+    monkeypatch.setattr(gemini, "concurrency_limiter", gemini.AIMDLimiter())
+    monkeypatch.setattr(gemini, "reply_latency", gemini.LatencyTracker(min_samples=5))
+
+    def install(**kwargs):
+        model = testing.FakeGeminiModel(seed=1, **kwargs)
+        monkeypatch.setattr(gemini, "_get_client", lambda: model)
+        return model
+
+    return install
+
+
+def test_generate_reply_retries_transient_failures(fake_upstream):
+    model = fake_upstream(fail_first=2, reply="recovered")
+
+    assert gemini.generate_reply([], "hi", retries=2) == "recovered"
+    assert model.calls == 3
+
+    model = fake_upstream(fail_first=2)
+    with pytest.raises(gemini.GeminiServiceError, match="503"):
+        gemini.generate_reply([], "hi", retries=1)
+    assert model.calls == 2
+
+
+def test_retries_stop_at_the_overall_deadline(fake_upstream):
+    from chat.testing import fixed
+
+    model = fake_upstream(latency=fixed(0.15), failure_rate=1.0)
+
+    start = time.monotonic()
+    with pytest.raises(gemini.GeminiServiceError):
+        gemini.generate_reply([], "hi", timeout_s=0.4, retries=10)
+    assert time.monotonic() - start < 0.6
+    assert model.calls < 4
+
+
+def test_hedged_request_beats_a_slow_first_attempt(fake_upstream):
+    from chat.testing import sequence
+
+    for _ in range(5):
+        gemini.reply_latency.record(0.02)
+    # The first request stalls; the hedge sent at p95 (20ms) answers quickly
+    model = fake_upstream(latency=sequence([1.0, 0.01]), reply="hedged")
+
+    start = time.monotonic()
+    assert gemini.generate_reply([], "hi", timeout_s=5, hedge=True) == "hedged"
+    assert time.monotonic() - start < 0.5
+    assert model.calls == 2
+
+
+def test_hedging_waits_for_latency_history(fake_upstream):
+    model = fake_upstream(latency=0.01)
+
+    assert gemini.generate_reply([], "hi", hedge=True) == "fake reply"
+    assert model.calls == 1
+
+
+def test_async_hedged_request_cancels_the_loser(fake_upstream):
+    import asyncio
+    from chat.testing import sequence
+
+    for _ in range(5):
+        gemini.reply_latency.record(0.02)
+    model = fake_upstream(latency=sequence([1.0, 0.01]), reply="hedged")
+
+    start = time.monotonic()
+    assert asyncio.run(gemini.generate_reply_async([], "hi", timeout_s=5, hedge=True)) == "hedged"
+    assert time.monotonic() - start < 0.5
+    assert model.calls == 2
+    assert gemini.concurrency_limiter.snapshot()["in_flight"] == 0
+
+
+def test_fake_upstream_latency_distribution_is_skewed():
+    import random
+    from chat.testing import lognormal
+
+    draw = lognormal(0.2, 1.0)
+    rng = random.Random(7)
+    samples = sorted(draw(rng) for _ in range(5000))
+
+    assert samples[2500] == pytest.approx(0.2, rel=0.1)
+    assert samples[4750] == pytest.approx(1.0, rel=0.15)
@@ -0,0 +1,186 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+
+from chat.services import gemini, insights
+
+
+SUMMARY = {"total_feedback": 3, "helpful_count": 1, "per_conversation": [], "recent_feedback": []}
+
+
+def test_summary_fingerprint_ignores_key_order():
+    reordered = dict(reversed(list(SUMMARY.items())))
+    assert insights.summary_fingerprint(reordered) == insights.summary_fingerprint(SUMMARY)
+    assert insights.summary_fingerprint({**SUMMARY, "helpful_count": 2}) != insights.summary_fingerprint(SUMMARY)
+
+
+def test_concurrent_requests_share_one_generation(monkeypatch):
+    cache.clear()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_insights(summary, timeout_s=15):
+        calls.append(summary)
+        started.set()
+        release.wait(5)
+        return "- Ship it"
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights", slow_insights)
+    results = []
+
+    def request():
+        results.append(insights.get_actionable_insights(SUMMARY))
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=request) for _ in range(4)]
+    for t in followers:
+        t.start()
+    release.set()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert results == ["- Ship it"] * 5
+    assert len(calls) == 1
+
+
+def test_failures_propagate_and_are_not_cached(monkeypatch):
+    cache.clear()
+
+    def boom(summary, timeout_s=15):
+        raise gemini.GeminiServiceError("down")
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights", boom)
+    with pytest.raises(gemini.GeminiServiceError):
+        insights.get_actionable_insights(SUMMARY)
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights", lambda summary, timeout_s=15: "- Recovered")
+    assert insights.get_actionable_insights(SUMMARY) == "- Recovered"
+
+
+def test_cancelled_async_follower_does_not_cancel_the_generation(monkeypatch):
+    import asyncio
+
+    cache.clear()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_insights(summary, timeout_s=15):
+        started.set()
+        release.wait(5)
+        return "- Ship it"
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights", slow_insights)
+    results, errors = [], []
+
+    def request():
+        try:
+            results.append(insights.get_actionable_insights(SUMMARY))
+        except BaseException as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    assert started.wait(5)
+
+    async def disconnecting_follower():
+        task = asyncio.ensure_future(insights.get_actionable_insights_async(SUMMARY))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(disconnecting_follower())
+    follower = threading.Thread(target=request)
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert errors == []
+    assert results == ["- Ship it", "- Ship it"]
+
+
+def test_cancelled_async_leader_still_answers_its_followers(monkeypatch):
+    import asyncio
+
+    cache.clear()
+    calls = []
+
+    async def slow_insights(summary, timeout_s=15):
+        calls.append(summary)
+        await asyncio.sleep(0.2)
+        return "- Ship it"
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights_async", slow_insights)
+    results, errors = [], []
+
+    def follower():
+        try:
+            results.append(insights.get_actionable_insights(SUMMARY))
+        except BaseException as e:
+            errors.append(e)
+
+    async def disconnecting_leader():
+        leader = asyncio.ensure_future(insights.get_actionable_insights_async(SUMMARY))
+        while not calls:
+            await asyncio.sleep(0.01)
+        thread = threading.Thread(target=follower)
+        thread.start()
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        # The generation carries on without the leader
+        await asyncio.to_thread(thread.join, 5)
+
+    asyncio.run(disconnecting_leader())
+
+    assert errors == []
+    assert results == ["- Ship it"]
+    assert len(calls) == 1
+    assert cache.get(insights._actionable_cache_key(insights.summary_fingerprint(SUMMARY))) == "- Ship it"
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def test_follower_takes_over_from_an_interrupted_leader(monkeypatch):
+    cache.clear()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def insights_once_interrupted(summary, timeout_s=15):
+        calls.append(summary)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+            raise Interrupted
+        return "- Retried"
+
+    monkeypatch.setattr(gemini, "generate_actionable_insights", insights_once_interrupted)
+    results, interrupted = [], []
+
+    def interrupted_leader():
+        try:
+            insights.get_actionable_insights(SUMMARY)
+        except Interrupted as e:
+            interrupted.append(e)
+
+    leader = threading.Thread(target=interrupted_leader)
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(insights.get_actionable_insights(SUMMARY)))
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(interrupted) == 1
+    assert results == ["- Retried"]
+    assert len(calls) == 2
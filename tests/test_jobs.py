@@ -0,0 +1,131 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from chat.models import Conversation, Message, ReplyJob
+from chat.services import gemini, jobs
+
+
+@pytest.fixture(autouse=True)
+def no_worker_threads(settings):
+    # Jobs run on the test thread through run_pending()
+    settings.CHAT_JOB_WORKERS = 0
+    settings.DEBUG = False
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_queued_message_returns_202_and_worker_writes_reply(client, monkeypatch):
+    conv = Conversation.objects.create(title="Queued")
+    prompts = []
+
+    def fake_generate_reply(history, prompt, timeout_s=10):
+        prompts.append(prompt)
+        return "Later!"
+
+    monkeypatch.setattr(gemini, "generate_reply", fake_generate_reply)
+
+    resp = client.post(
+        f"/api/conversations/{conv.id}/messages/?async=1",
+        data=json.dumps({"text": "Hello"}),
+        content_type="application/json",
+    )
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["user_message"]["text"] == "Hello"
+    assert body["job"]["status"] == "pending"
+    assert resp["Location"] == f"/api/conversations/{conv.id}/jobs/{body['job']['id']}/"
+    assert prompts == []
+
+    assert jobs.run_pending() == 1
+    assert prompts == ["Hello"]
+
+    listing = client.get(f"/api/conversations/{conv.id}/messages/?since={body['user_message']['sequence']}").json()
+    assert [(m["role"], m["text"]) for m in listing["results"]] == [("ai", "Later!")]
+    job = client.get(resp["Location"]).json()
+    assert job["status"] == "done"
+    assert job["reply"] == listing["results"][0]["id"]
+
+
+@pytest.mark.django_db
+def test_async_view_honours_prefer_respond_async(rf, monkeypatch):
+    from asgiref.sync import async_to_sync
+    from chat.async_views import AsyncMessageListCreateView
+
+    conv = Conversation.objects.create(title="Async queued")
+    request = rf.post(
+        f"/api/conversations/{conv.id}/messages/",
+        data=json.dumps({"text": "Hello"}),
+        content_type="application/json",
+        HTTP_PREFER="respond-async",
+    )
+    resp = async_to_sync(AsyncMessageListCreateView.as_view())(request, pk=conv.id)
+
+    assert resp.status_code == 202
+    assert json.loads(resp.content)["job"]["status"] == "pending"
+    assert ReplyJob.objects.filter(conversation=conv, status=ReplyJob.STATUS_PENDING).count() == 1
+
+
+@pytest.mark.django_db
+def test_failed_generation_is_retried_with_backoff_then_marked_failed(settings, monkeypatch):
+    settings.CHAT_JOB_MAX_ATTEMPTS = 2
+    conv = Conversation.objects.create()
+    job = jobs.enqueue_reply(Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="Hi"))
+
+    def failing(history, prompt, timeout_s=10):
+        raise gemini.GeminiServiceError("service down")
+
+    monkeypatch.setattr(gemini, "generate_reply", failing)
+
+    assert jobs.run_pending() == 1
+    job.refresh_from_db()
+    assert (job.status, job.attempts, job.error) == ("pending", 1, "service down")
+    assert job.available_at > timezone.now()
+    # Not due yet
+    assert jobs.run_pending() == 0
+
+    ReplyJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+    assert jobs.run_pending() == 1
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == ("failed", 2)
+    assert not Message.objects.filter(conversation=conv, role=Message.ROLE_AI).exists()
+
+
+@pytest.mark.django_db
+def test_blocked_reply_fails_the_job_without_retrying(settings, monkeypatch):
+    settings.CHAT_JOB_MAX_ATTEMPTS = 3
+    conv = Conversation.objects.create()
+    job = jobs.enqueue_reply(Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="Hi"))
+
+    def blocked(history, prompt, timeout_s=10):
+        raise gemini.GeminiEmptyResponseError("Empty response from Gemini")
+
+    monkeypatch.setattr(gemini, "generate_reply", blocked)
+
+    assert jobs.run_pending() == 1
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == ("failed", 1)
+
+
+@pytest.mark.django_db
+def test_expired_lease_is_reclaimed_and_stale_worker_cannot_finish(settings, monkeypatch):
+    monkeypatch.setattr(gemini, "generate_reply", lambda history, prompt, timeout_s=10: "reply")
+    conv = Conversation.objects.create()
+    jobs.enqueue_reply(Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="Hi"))
+
+    stale = jobs.claim_next_job()
+    assert jobs.claim_next_job() is None
+
+    ReplyJob.objects.filter(pk=stale.pk).update(
+        claimed_at=timezone.now() - timedelta(seconds=settings.CHAT_JOB_LEASE_S + 1)
+    )
+    fresh = jobs.claim_next_job()
+    assert fresh.pk == stale.pk and fresh.attempts == 2
+
+    jobs.run_job(stale)
+    assert not Message.objects.filter(conversation=conv, role=Message.ROLE_AI).exists()
+    jobs.run_job(fresh)
+    assert Message.objects.filter(conversation=conv, role=Message.ROLE_AI).count() == 1
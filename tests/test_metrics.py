@@ -0,0 +1,151 @@
+import json
+
+import pytest
+
+from chat import metrics, testing
+from chat.models import Conversation, Message
+from chat.services import gemini
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(settings, monkeypatch):
+    monkeypatch.setitem(settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "message", None)
+    monkeypatch.setenv("GEMINI_RETRY_BASE_S", "0.01")
+    monkeypatch.setattr(gemini, "circuit_breaker", gemini.CircuitBreaker(failure_threshold=100))
+    monkeypatch.setattr(gemini, "concurrency_limiter", gemini.AIMDLimiter())
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _install(monkeypatch, **kwargs):
+    model = testing.FakeGeminiModel(seed=1, **kwargs)
+    monkeypatch.setattr(gemini, "_get_client", lambda: model)
+    return model
+
+
+def _series(text, name, **labels):
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    for line in text.splitlines():
+        if line.startswith(f"{name}{{{wanted}}} "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+@pytest.mark.django_db
+def test_request_histograms_cover_queries_and_serialization(client):
+    conv = Conversation.objects.create()
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="hi")
+
+    assert client.get(f"/api/conversations/{conv.id}/messages/").status_code == 200
+    assert client.get("/api/conversations/missing/").status_code == 404
+
+    text = client.get("/metrics").content.decode()
+    labels = {"endpoint": "message-list-create", "method": "GET"}
+    assert _series(text, "chat_request_duration_seconds_count", **labels, status="200") == 1
+    assert _series(text, "chat_request_duration_seconds_count", endpoint="unmatched", method="GET", status="404") == 1
+    assert _series(text, "chat_request_db_queries_sum", **labels) >= 1
+    assert _series(text, "chat_request_db_seconds_sum", **labels) > 0
+    assert _series(text, "chat_request_serializer_seconds_sum", **labels) > 0
+    assert 'chat_request_db_queries_bucket{endpoint="message-list-create",method="GET",le="+Inf"} 1' in text
+    assert "chat_gemini_circuit_open 0" in text
+
+
+@pytest.mark.django_db
+def test_gemini_calls_are_split_by_function_and_outcome(client, settings, monkeypatch):
+    _install(monkeypatch, latency=0.0)
+    gemini.generate_reply([], "hi", retries=0)
+    gemini.generate_actionable_insights({"totals": {}})
+
+    _install(monkeypatch, latency=0.5)
+    with pytest.raises(gemini.GeminiServiceError):
+        gemini.generate_reply([], "hi", timeout_s=0.05, retries=0)
+
+    _install(monkeypatch, failure_rate=1.0)
+    settings.DEBUG = True
+    conv = Conversation.objects.create()
+    resp = client.post(
+        f"/api/conversations/{conv.id}/messages/",
+        data=json.dumps({"text": "hello"}),
+        content_type="application/json",
+    )
+    assert resp.json()["ai_message"]["text"].startswith("(Gemini unavailable)")
+
+    assert metrics.gemini_seconds.count("generate_reply", "success") == 1
+    assert metrics.gemini_seconds.count("generate_actionable_insights", "success") == 1
+    assert metrics.gemini_seconds.count("generate_reply", "timeout") == 1
+    assert metrics.gemini_seconds.count("generate_reply", "error") == 1
+    text = metrics.render()
+    assert _series(text, "chat_gemini_fallbacks_total", function="generate_reply") == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.filterwarnings("ignore:StreamingHttpResponse must consume")
+def test_streamed_replies_are_timed_until_the_body_ends(client, settings, monkeypatch):
+    settings.DEBUG = False
+    _install(monkeypatch, latency=0.1, reply="streamed reply")
+    conv = Conversation.objects.create()
+    url = f"/api/conversations/{conv.id}/messages/?stream=1"
+    labels = ("message-list-create", "POST", "200")
+
+    resp = client.post(url, data=json.dumps({"text": "hello"}), content_type="application/json")
+    assert resp.streaming
+    assert metrics.request_seconds.count(*labels) == 0
+    assert b"streamed reply" in b"".join(resp)
+    resp.close()
+
+    assert metrics.request_seconds.count(*labels) == 1
+    assert _series(metrics.render(), "chat_request_duration_seconds_sum", endpoint=labels[0], method="POST", status="200") >= 0.1
+    assert metrics.gemini_seconds.count("stream_reply", "success") == 1
+
+    _install(monkeypatch, failure_rate=1.0)
+    resp = client.post(url, data=json.dumps({"text": "hello"}), content_type="application/json")
+    assert b"event: error" in b"".join(resp)
+    assert metrics.gemini_seconds.count("stream_reply", "error") == 1
+    assert metrics.request_seconds.count(*labels) == 2
+
+
+@pytest.mark.django_db
+def test_slow_requests_leave_a_folded_profile(client, settings, monkeypatch, tmp_path):
+    settings.CHAT_PROFILE_SLOW_MS = 20
+    settings.CHAT_PROFILE_INTERVAL_MS = 1
+    settings.CHAT_PROFILE_DIR = str(tmp_path)
+    _install(monkeypatch, latency=0.1)
+    conv = Conversation.objects.create()
+
+    client.get(f"/api/conversations/{conv.id}/messages/")
+    assert list(tmp_path.iterdir()) == []
+
+    client.post(
+        f"/api/conversations/{conv.id}/messages/",
+        data=json.dumps({"text": "hello"}),
+        content_type="application/json",
+    )
+    [profile] = tmp_path.iterdir()
+    assert "message-list-create" in profile.name
+    lines = profile.read_text().splitlines()
+    assert any("generate_content (testing.py" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_can_be_disabled(client, settings):
+    settings.CHAT_METRICS = False
+    assert client.get("/metrics").status_code == 404
+    assert metrics.request_seconds.count("metrics", "GET", "404") == 0
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("demo_seconds", "Demo.", ("kind",), (0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, 'a"b')
+
+    assert histogram.render() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{kind="a\\"b",le="0.1"} 1',
+        'demo_seconds_bucket{kind="a\\"b",le="1.0"} 3',
+        'demo_seconds_bucket{kind="a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{kind="a\\"b"} 4.05',
+        'demo_seconds_count{kind="a\\"b"} 4',
+    ]
@@ -31,3 +31,193 @@ def test_feedback_rejects_user_message(db):
 
     with pytest.raises(ValueError):
         MessageFeedback.objects.create(message=user_msg, is_helpful=False)
+
+
+def test_message_save_publishes_after_commit(db, django_capture_on_commit_callbacks, monkeypatch):
+    from chat.events import conversation_events
+
+    published = []
+    monkeypatch.setattr(conversation_events, "publish", published.append)
+    conv = Conversation.objects.create(title=None)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="hi")
+        assert published == []
+
+    assert published == [conv.id]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_writers_get_gapless_unique_sequences():
+    import threading
+    import time
+
+    from django.db import OperationalError, connection
+
+    conv = Conversation.objects.create(title=None)
+    writers, per_writer = 8, 10
+    max_attempts = 500
+    barrier = threading.Barrier(writers)
+    errors = []
+
+    def write():
+        try:
+            barrier.wait(10)
+            for i in range(per_writer):
+                # SQLite's shared-cache test database reports lock contention
+                # instead of waiting on it (busy_timeout does not apply), so
+                # retry, but only so often: the allocator itself never collides.
+                for _ in range(max_attempts):
+                    try:
+                        Message.objects.create(conversation=conv, role=Message.ROLE_USER, text=str(i))
+                        break
+                    except OperationalError:
+                        time.sleep(0.001)
+                else:
+                    raise AssertionError(f"Message {i} still locked out after {max_attempts} attempts")
+        except Exception as e:  # pragma: no cover - surfaced by the assertion below
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(60)
+
+    assert not any(t.is_alive() for t in threads)
+    assert errors == []
+    sequences = sorted(Message.objects.filter(conversation=conv).values_list("sequence", flat=True))
+    assert sequences == list(range(1, writers * per_writer + 1))
+    conv.refresh_from_db()
+    assert conv.last_sequence == writers * per_writer
+
+
+def test_sequence_allocation_without_update_returning(db, monkeypatch):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # e.g. SQLite older than 3.35
+    monkeypatch.setattr(connection.features, "can_return_columns_from_insert", False)
+    conv = Conversation.objects.create(title=None)
+    with CaptureQueriesContext(connection) as ctx:
+        first = Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="hi")
+        second = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="hello")
+
+    assert (first.sequence, second.sequence) == (1, 2)
+    assert not any("RETURNING" in query["sql"] for query in ctx.captured_queries if query["sql"].startswith("UPDATE"))
+    conv.refresh_from_db()
+    assert (conv.last_sequence, conv.message_count, conv.last_message_preview) == (2, 2, "hello")
+
+
+def test_explicit_sequence_keeps_allocator_ahead(db):
+    conv = Conversation.objects.create(title=None)
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="imported", sequence=5)
+    msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="next")
+
+    assert msg.sequence == 6
+
+
+def test_feedback_counters_follow_create_update_and_delete(db):
+    conv = Conversation.objects.create(title=None)
+    first = MessageFeedback.objects.create(
+        message=Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="a"), is_helpful=True
+    )
+    second = MessageFeedback.objects.create(
+        message=Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="b"), is_helpful=False
+    )
+    conv.refresh_from_db()
+    assert (conv.feedback_count, conv.helpful_feedback_count) == (2, 1)
+    assert conv.last_feedback_at == second.created_at
+
+    reloaded = MessageFeedback.objects.get(pk=second.pk)
+    reloaded.is_helpful = True
+    reloaded.save()
+    reloaded.save()
+    conv.refresh_from_db()
+    assert (conv.feedback_count, conv.helpful_feedback_count) == (2, 2)
+
+    first.delete()
+    conv.refresh_from_db()
+    assert (conv.feedback_count, conv.helpful_feedback_count) == (1, 1)
+
+
+def test_feedback_counters_follow_message_deletes(db):
+    from chat.services import insights
+
+    def counters(conv):
+        conv.refresh_from_db()
+        return conv.feedback_count, conv.helpful_feedback_count, conv.feedback_revision
+
+    conv = Conversation.objects.create()
+    messages = [Message.objects.create(conversation=conv, role=Message.ROLE_AI, text=str(i)) for i in range(4)]
+    for i, msg in enumerate(messages):
+        MessageFeedback.objects.create(message=msg, is_helpful=i % 2 == 0)
+    assert counters(conv) == (4, 2, 4)
+    insights.get_feedback_summary()
+
+    # Feedback removed by cascade from its message
+    messages[0].delete()
+    assert counters(conv) == (3, 1, 5)
+    assert insights.get_feedback_summary()["total_feedback"] == 3
+
+    Message.objects.filter(pk__in=[messages[1].pk, messages[2].pk]).delete()
+    assert counters(conv) == (1, 0, 6)
+
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="no feedback").delete()
+    assert counters(conv) == (1, 0, 6)
+    assert insights.get_feedback_summary()["total_feedback"] == 1
+
+
+def test_conversation_read_model_follows_message_writes(db):
+    from chat.models import MESSAGE_PREVIEW_LENGTH
+    from chat.services.transcripts import import_transcript
+
+    def read_model(conv):
+        conv.refresh_from_db()
+        return conv.message_count, conv.last_message_preview, conv.last_message_role
+
+    conv = Conversation.objects.create()
+    assert read_model(conv) == (0, "", "")
+
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="question")
+    ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text="x" * 500)
+    assert read_model(conv) == (2, "x" * MESSAGE_PREVIEW_LENGTH, Message.ROLE_AI)
+
+    # A backfilled older message counts but does not become the preview
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="old", sequence=0)
+    assert read_model(conv)[0] == 3
+    assert read_model(conv)[2] == Message.ROLE_AI
+
+    import_transcript(conv, [{"role": "ai", "text": "a"}, {"role": "user", "text": "imported last"}])
+    assert read_model(conv) == (5, "imported last", Message.ROLE_USER)
+
+    Message.objects.filter(conversation=conv, text__in=["a", "imported last"]).delete()
+    assert read_model(conv) == (3, "x" * MESSAGE_PREVIEW_LENGTH, Message.ROLE_AI)
+
+    ai_msg.delete()
+    assert read_model(conv) == (2, "question", Message.ROLE_USER)
+
+    Message.objects.filter(conversation=conv).delete()
+    assert read_model(conv) == (0, "", "")
+
+
+def test_sqlite_connections_get_the_configured_pragmas(settings, tmp_path, django_db_blocker):
+    from django.db import connections
+
+    settings.SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 1234}
+    # A real Django connection to a file database, so the pragmas arrive through
+    # the connection_created handler registered in ChatConfig.ready()
+    default = connections["default"]
+    conn = type(default)({**default.settings_dict, "NAME": str(tmp_path / "pragmas.sqlite3")}, "pragmas")
+    try:
+        with django_db_blocker.unblock(), conn.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            assert cursor.fetchone()[0] == "wal"
+            cursor.execute("PRAGMA synchronous")
+            assert cursor.fetchone()[0] == 1
+            cursor.execute("PRAGMA busy_timeout")
+            assert cursor.fetchone()[0] == 1234
+    finally:
+        conn.close()
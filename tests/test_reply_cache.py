@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from django.core.cache import cache
+
+from chat.models import Conversation
+from chat.services import gemini, reply_cache
+from chat.services.reply_cache import ReplyCache
+
+
+@pytest.fixture(autouse=True)
+def unthrottled(settings, monkeypatch):
+    # Several sends per test; other tests lower this rate in place
+    monkeypatch.setitem(settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "message", None)
+
+
+@pytest.fixture
+def enabled_cache(settings):
+    settings.CHAT_REPLY_CACHE = True
+    settings.CHAT_REPLY_CACHE_SIMILARITY = 0
+    reply_cache.reset_reply_cache()
+    cache.clear()
+    yield
+    reply_cache.reset_reply_cache()
+
+
+@pytest.mark.django_db
+def test_repeated_first_messages_reuse_the_cached_reply(client, monkeypatch, enabled_cache):
+    calls = []
+
+    def fake_generate_reply(history, prompt, timeout_s=10):
+        calls.append(prompt)
+        return "Hi there!"
+
+    monkeypatch.setattr(gemini, "generate_reply", fake_generate_reply)
+
+    replies = []
+    for text in ("Hello!", "  hello ", "HELLO"):
+        conv = Conversation.objects.create()
+        resp = client.post(
+            f"/api/conversations/{conv.id}/messages/",
+            data=json.dumps({"text": text}),
+            content_type="application/json",
+        )
+        replies.append(resp.json()["ai_message"]["text"])
+
+    assert replies == ["Hi there!"] * 3
+    assert calls == ["Hello!"]
+    stats = reply_cache.get_reply_cache().snapshot()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+
+
+@pytest.mark.django_db
+def test_reply_cache_is_off_by_default(client, monkeypatch, settings):
+    assert settings.CHAT_REPLY_CACHE is False
+    calls = []
+    monkeypatch.setattr(gemini, "generate_reply", lambda history, prompt, timeout_s=10: calls.append(prompt) or "ok")
+
+    for _ in range(2):
+        conv = Conversation.objects.create()
+        client.post(
+            f"/api/conversations/{conv.id}/messages/",
+            data=json.dumps({"text": "Hello"}),
+            content_type="application/json",
+        )
+
+    assert len(calls) == 2
+    assert reply_cache.get_reply_cache() is None
+
+
+def test_history_is_part_of_the_key():
+    rc = ReplyCache()
+    rc.set([], "hello", "first")
+
+    assert rc.get([{"role": "ai", "text": "Earlier"}], "hello") is None
+    assert rc.get([], "Hello.") == "first"
+
+
+def test_ttl_and_lru_eviction():
+    rc = ReplyCache(max_entries=2, ttl_s=60)
+    rc.set([], "a", "A")
+    rc.set([], "b", "B")
+    assert rc.get([], "a") == "A"
+    # "b" is least recently used now
+    rc.set([], "c", "C")
+    assert rc.get([], "b") is None
+    assert rc.get([], "a") == "A"
+    assert rc.snapshot()["evictions"] == 1
+
+    expired = ReplyCache(ttl_s=0)
+    expired.set([], "a", "A")
+    assert expired.get([], "a") is None
+    assert expired.snapshot()["size"] == 0
+
+
+def test_nearest_neighbour_lookup_matches_similar_prompts_only():
+    rc = ReplyCache(similarity=0.8)
+    rc.set([], "What are your opening hours?", "9 to 5")
+
+    assert rc.get([], "what are your opening hours please") == "9 to 5"
+    assert rc.get([], "How do I reset my password?") is None
+    # Same prompt under a different history is never a neighbour
+    assert rc.get([{"role": "user", "text": "hi"}], "What are your opening hours") is None
+    stats = rc.snapshot()
+    assert (stats["hits"], stats["similar_hits"], stats["misses"]) == (0, 1, 2)
+
+
+def test_numpy_and_python_similarity_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    query = reply_cache.vectorize("opening hours")
+    vectors = [reply_cache.vectorize(text) for text in ("reset password", "opening hours today")]
+
+    with_numpy = reply_cache._best_match(query, vectors)
+    monkeypatch.setattr(reply_cache, "np", None)
+    without = reply_cache._best_match(query, vectors)
+
+    assert with_numpy[0] == without[0] == 1
+    assert with_numpy[1] == pytest.approx(without[1])
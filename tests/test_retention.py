@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chat.models import Conversation, Message, MessageFeedback, ReplyJob
+from chat.services import retention
+
+
+def _conversation_with_history(title="Chat", turns=5):
+    conv = Conversation.objects.create(title=title)
+    for i in range(turns):
+        user_msg = Message.objects.create(conversation=conv, role=Message.ROLE_USER, text=f"question {i}")
+        ai_msg = Message.objects.create(conversation=conv, role=Message.ROLE_AI, text=f"answer {i}")
+        MessageFeedback.objects.create(message=ai_msg, is_helpful=i % 2 == 0)
+        ReplyJob.objects.create(conversation=conv, message=user_msg, reply=ai_msg, status=ReplyJob.STATUS_DONE)
+    return conv
+
+
+@pytest.mark.django_db
+def test_purge_deletes_in_set_based_chunks_without_loading_rows():
+    conv = _conversation_with_history(turns=5)
+    other = _conversation_with_history(title="Kept", turns=1)
+
+    with CaptureQueriesContext(connection) as ctx:
+        removed = retention.purge_conversation(conv.id, chunk_size=4)
+
+    assert removed == 10
+    assert not Conversation.all_objects.filter(pk=conv.id).exists()
+    assert not Message.objects.filter(conversation_id=conv.id).exists()
+    assert not MessageFeedback.objects.filter(conversation_id=conv.id).exists()
+    assert not ReplyJob.objects.filter(conversation_id=conv.id).exists()
+    assert Message.objects.filter(conversation=other).count() == 2
+
+    statements = [query["sql"] for query in ctx.captured_queries]
+    assert all(sql.startswith(("DELETE", "SAVEPOINT", "RELEASE")) for sql in statements)
+    # 10 messages in chunks of 4: three chunk deletes, plus the final sweep
+    assert sum(sql.startswith('DELETE FROM "chat_message" WHERE') for sql in statements) == 4
+
+
+@pytest.mark.django_db
+def test_purge_without_limited_subqueries_deletes_by_id_lists(monkeypatch):
+    # MySQL cannot LIMIT a subquery under IN
+    monkeypatch.setattr(connection.features, "allow_sliced_subqueries_with_in", False)
+    conv = _conversation_with_history(turns=3)
+
+    assert retention.purge_conversation(conv.id, chunk_size=4) == 6
+    assert not Conversation.all_objects.filter(pk=conv.id).exists()
+    assert not MessageFeedback.objects.filter(conversation_id=conv.id).exists()
+
+
+@pytest.mark.django_db
+def test_delete_endpoint_purges_immediately_by_default(client):
+    conv = _conversation_with_history(turns=2)
+
+    assert client.delete(f"/api/conversations/{conv.id}/").status_code == 204
+    assert not Conversation.all_objects.filter(pk=conv.id).exists()
+    assert not Message.objects.filter(conversation_id=conv.id).exists()
+    assert client.delete(f"/api/conversations/{conv.id}/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_soft_delete_hides_then_background_purge_removes(client, settings, django_capture_on_commit_callbacks):
+    settings.CHAT_SOFT_DELETE = True
+    cache.clear()
+    conv = _conversation_with_history(title="Secret", turns=2)
+    kept = _conversation_with_history(title="Kept", turns=1)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        assert client.delete(f"/api/conversations/{conv.id}/").status_code == 204
+    assert retention.purger.notify in callbacks
+
+    # Hidden everywhere, though the rows are still there
+    assert Message.objects.filter(conversation_id=conv.id).count() == 4
+    assert client.get(f"/api/conversations/{conv.id}/").status_code == 404
+    assert client.get(f"/api/conversations/{conv.id}/messages/").status_code == 404
+    assert client.delete(f"/api/conversations/{conv.id}/").status_code == 404
+    assert [row["id"] for row in client.get("/api/conversations/").json()["results"]] == [kept.id]
+    assert client.get("/api/search/", {"q": "question"}).json()["results"][0]["conversation"] == kept.id
+    assert len(client.get("/api/search/", {"q": "question"}).json()["results"]) == 1
+    summary = client.get("/api/insights/").json()
+    assert summary["total_feedback"] == 1
+    assert {row["conversation_id"] for row in summary["recent_feedback"]} == {kept.id}
+
+    assert retention.purge_deleted() == 1
+    assert not Conversation.all_objects.filter(pk=conv.id).exists()
+    assert not Message.objects.filter(conversation_id=conv.id).exists()
+    assert Conversation.objects.filter(pk=kept.id).exists()
+
+
+@pytest.mark.django_db
+def test_retention_command_expires_idle_conversations(capsys):
+    old = _conversation_with_history(title="Old", turns=3)
+    recent = _conversation_with_history(title="Recent", turns=1)
+    Conversation.objects.filter(pk=old.pk).update(updated_at=timezone.now() - timedelta(days=45))
+
+    call_command("purge_conversations", "--older-than-days", "30", "--chunk-size", "2")
+
+    assert list(Conversation.all_objects.values_list("id", flat=True)) == [recent.id]
+    assert Message.objects.count() == 2
+    out = capsys.readouterr().out
+    assert "Expired 1 conversations" in out
+    assert "Purged 1 conversations." in out
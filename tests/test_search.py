@@ -0,0 +1,110 @@
+import pytest
+
+from chat.models import Conversation, Message
+from chat.services import search
+from chat.services.transcripts import import_transcript
+
+
+@pytest.fixture(params=["auto", "python"])
+def backend(request, settings):
+    # "auto" is FTS5 on the test database; "python" is the in-process index
+    settings.CHAT_SEARCH_BACKEND = request.param
+    search.reset_fallback_index()
+    yield request.param
+    search.reset_fallback_index()
+
+
+def _search(client, **params):
+    resp = client.get("/api/search/", params)
+    assert resp.status_code == 200, resp.content
+    return resp.json()
+
+
+@pytest.mark.django_db
+def test_search_ranks_matches_with_snippets(client, backend):
+    conv = Conversation.objects.create(title="Travel")
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="What should I pack for Lisbon?")
+    best = Message.objects.create(
+        conversation=conv, role=Message.ROLE_AI, text="Lisbon is hilly, so pack walking shoes for Lisbon."
+    )
+    Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="And for Porto?")
+
+    data = _search(client, q="lisbon PACK")
+
+    assert [r["id"] for r in data["results"]][0] == best.id
+    assert len(data["results"]) == 2
+    assert data["next_cursor"] is None
+    top = data["results"][0]
+    assert top["conversation"] == conv.id
+    assert top["conversation_title"] == "Travel"
+    assert top["role"] == Message.ROLE_AI
+    assert top["snippet"].startswith("[Lisbon] is hilly, so [pack]")
+    assert top["score"] > data["results"][1]["score"]
+
+
+@pytest.mark.django_db
+def test_search_ignores_case_accents_and_query_syntax(client, backend):
+    conv = Conversation.objects.create()
+    msg = Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="Un café crème, s'il vous plaît")
+
+    assert [r["id"] for r in _search(client, q='CAFE "creme" OR')["results"]] == []
+    assert [r["id"] for r in _search(client, q='CAFE "creme"')["results"]] == [msg.id]
+    assert _search(client, q="*:()")["results"] == []
+
+
+@pytest.mark.django_db
+def test_search_cursor_pages_without_repeats(client, backend):
+    conv = Conversation.objects.create()
+    other = Conversation.objects.create()
+    expected = [
+        Message.objects.create(conversation=conv, role=Message.ROLE_USER, text="budget " * (i % 3 + 1) + f"item {i}").id
+        for i in range(7)
+    ]
+    Message.objects.create(conversation=other, role=Message.ROLE_USER, text="budget elsewhere")
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "budget", "conversation": conv.id, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        data = _search(client, **params)
+        seen.extend(r["id"] for r in data["results"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(expected)
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.django_db
+def test_index_follows_imports_and_deletes(client, backend):
+    conv = Conversation.objects.create()
+    assert _search(client, q="harbour")["results"] == []
+
+    import_transcript(conv, [
+        {"role": "user", "text": "Where is the harbour?"},
+        {"role": "ai", "text": "Down by the old harbour."},
+    ])
+    assert len(_search(client, q="harbour")["results"]) == 2
+
+    Message.objects.filter(conversation=conv, role=Message.ROLE_AI).delete()
+    assert len(_search(client, q="harbour")["results"]) == 1
+
+    conv.delete()
+    assert _search(client, q="harbour")["results"] == []
+
+
+@pytest.mark.django_db
+def test_search_rejects_missing_query_and_bad_cursor(client):
+    assert client.get("/api/search/").status_code == 400
+    assert client.get("/api/search/", {"q": "x", "cursor": "nope"}).status_code == 400
+    assert client.get("/api/search/", {"q": "x", "conversation": "abc"}).status_code == 400
+
+
+def test_make_snippet_marks_hits_and_trims():
+    text = " ".join(f"w{i}" for i in range(30)) + " needle, then " + " ".join(f"v{i}" for i in range(30))
+    snippet = search.make_snippet(text, ["needle"])
+    assert snippet.startswith("…")
+    assert "[needle], then" in snippet
+    assert snippet.endswith("…")
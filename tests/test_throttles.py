@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from chat.throttles import (
+    CacheCounterStore,
+    DatabaseCounterStore,
+    FileCounterStore,
+    SlidingWindowRateThrottle,
+    get_counter_store,
+)
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_throttle(cache, clock, rate="4/m"):
+    class Throttle(SlidingWindowRateThrottle):
+        def get_cache_key(self, request, view):
+            return "throttle:test:1.2.3.4"
+
+    Throttle.rate = rate
+    Throttle.cache = cache
+    Throttle.timer = clock
+    return Throttle
+
+
+def test_sliding_window_weights_the_previous_window():
+    clock = Clock(600.0)
+    Throttle = make_throttle(LocMemCache("throttle-window", {}), clock)
+
+    assert [Throttle().allow_request(None, None) for _ in range(5)] == [True] * 4 + [False]
+
+    # Halfway through the next window the 4 earlier requests still weigh 2
+    clock.now = 690.0
+    assert [Throttle().allow_request(None, None) for _ in range(3)] == [True, True, False]
+    throttle = Throttle()
+    assert throttle.allow_request(None, None) is False
+    assert 0 < throttle.wait() <= 30
+
+    # Rejections were not counted: one window later only the 2 accepted weigh in
+    clock.now = 750.0
+    assert Throttle().allow_request(None, None) is True
+
+
+@pytest.mark.parametrize("backend", ["locmem", "file"])
+def test_counter_increments_are_atomic_across_threads(backend, tmp_path):
+    if backend == "locmem":
+        cache = LocMemCache(f"throttle-{tmp_path.name}", {})
+    else:
+        cache = FileBasedCache(str(tmp_path / "cache"), {})
+    store = get_counter_store(cache)
+    assert isinstance(store, FileCounterStore if backend == "file" else CacheCounterStore)
+
+    def hammer():
+        for _ in range(50):
+            store.incr("throttle:count", 1, 60)
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert store.get("throttle:count") == 400
+
+
+@pytest.mark.django_db
+def test_database_counter_store():
+    store = get_counter_store(DatabaseCache("chat_cache_table", {}))
+    assert isinstance(store, DatabaseCounterStore)
+
+    assert store.get("throttle:db") == 0
+    assert [store.incr("throttle:db", 1, 60) for _ in range(3)] == [1, 2, 3]
+    assert store.incr("throttle:db", -1, 60) == 2
+    assert store.get("throttle:db") == 2
+
+    clock = Clock(1200.0)
+    Throttle = make_throttle(DatabaseCache("chat_cache_table", {}), clock, rate="2/m")
+    assert [Throttle().allow_request(None, None) for _ in range(3)] == [True, True, False]